@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+
+'''
+Measure how quickly MayaRenderJob generates its task data.
+
+    python benchmarks/bench_maya_tasks.py [--sizes 1000 10000 100000] [--chunk-size 1]
+'''
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import cioseq.sequence
+
+import conductor_job
+
+
+def build_job(frame_count, chunk_size):
+
+    job = conductor_job.MayaRenderJob(scene_path="X:/projects/show/shot/scenes/shot_v001.ma",
+                                      project_path="X:/projects/show/shot")
+    job.renderer = "arnold-maya"
+    job.output_path = "X:/projects/show/shot/images"
+    job.frames = cioseq.sequence.Sequence.create("1-{}".format(frame_count))
+    job.chunk_size = chunk_size
+
+    return job
+
+
+def run(sizes, chunk_size, repeat):
+
+    print("{:>10} {:>10} {:>12} {:>14}".format("frames", "tasks", "seconds", "tasks/sec"))
+
+    for frame_count in sizes:
+        best = None
+
+        for _ in range(repeat):
+            job = build_job(frame_count, chunk_size)
+
+            start_time = time.perf_counter()
+            task_count = sum(1 for _ in job.iter_task_data())
+            duration = time.perf_counter() - start_time
+
+            best = duration if best is None else min(best, duration)
+
+        print("{:>10} {:>10} {:>12.4f} {:>14.0f}".format(frame_count, task_count, best, task_count / best))
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--chunk-size", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    run(args.sizes, args.chunk_size, args.repeat)
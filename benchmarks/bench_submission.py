@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+
+'''
+Submit job payloads concurrently to a local stand-in for the Conductor jobs
+endpoint. The stand-in adds latency and fails a share of the requests with
+429 and 503.
+
+The ciocore ApiClient (a new connection per request, no retries on an HTTP
+error) is run alongside the PooledApiClient (a shared connection pool,
+retries with backoff and a rate limiter) for comparison. That the pooled
+client gets every job through is covered by tests/test_transport.py.
+
+    python benchmarks/bench_submission.py [--jobs 200] [--workers 16] [--latency 0.02] [--failure-rate 0.1] [--json results.json]
+'''
+
+import argparse
+import concurrent.futures
+import http.server
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import ciocore.api_client
+
+from conductor_job import transport
+
+
+class StandInServer(http.server.ThreadingHTTPServer):
+    '''
+    Accepts POSTs to /jobs/ and answers like Conductor would, after a delay.
+    Some requests fail with 429 or 503.
+    '''
+
+    daemon_threads = True
+
+    def __init__(self, latency, failure_rate, seed=0):
+
+        super(StandInServer, self).__init__(("127.0.0.1", 0), StandInHandler)
+
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.random = random.Random(seed)
+
+        self.connections = 0
+        self.requests = 0
+        self.failures = 0
+        self.job_count = 0
+        self.lock = threading.Lock()
+
+    @property
+    def url(self):
+        return "http://127.0.0.1:{}/jobs/".format(self.server_address[1])
+
+
+class StandInHandler(http.server.BaseHTTPRequestHandler):
+
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+
+        super(StandInHandler, self).setup()
+
+        with self.server.lock:
+            self.server.connections += 1
+
+    def do_POST(self):
+
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        time.sleep(self.server.latency)
+
+        with self.server.lock:
+            self.server.requests += 1
+            fail = self.server.random.random() < self.server.failure_rate
+
+            if fail:
+                self.server.failures += 1
+                status = self.server.random.choice((429, 503))
+                body = json.dumps({"error": "try again"})
+
+            else:
+                self.server.job_count += 1
+                status = 201
+                body = json.dumps({"jobid": "{:05d}".format(self.server.job_count), "status": "success"})
+
+        body = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def run(mode, job_count, workers, latency, failure_rate, rate):
+
+    server = StandInServer(latency, failure_rate)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    if mode == "legacy":
+        api_client = ciocore.api_client.ApiClient()
+    else:
+        api_client = transport.PooledApiClient(rate_limiter=transport.RateLimiter(rate=rate, burst=workers),
+                                               retry_policy=transport.RetryPolicy(attempts=5, backoff=0.01),
+                                               pool_size=workers)
+
+    payload = json.dumps({"tasks_data": [{"command": "render", "frames": str(frame)} for frame in range(100)]})
+    headers = {"Content-Type": "application/json", "Accept": "application/json"}
+
+    def _submit(_):
+
+        start_time = time.perf_counter()
+        response = api_client._make_request("POST", server.url, dict(headers), None, payload, raise_on_error=False)
+        return response.status_code, time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(_submit, number) for number in range(job_count)]
+        responses = [future.result() for future in futures]
+
+    duration = time.perf_counter() - start_time
+
+    server.shutdown()
+    server.server_close()
+
+    latencies = sorted([latency for _, latency in responses])
+
+    return {"mode": mode,
+            "jobs": job_count,
+            "workers": workers,
+            "duration": round(duration, 4),
+            "submitted": len([status for status, _ in responses if status == 201]),
+            "failed": len([status for status, _ in responses if status != 201]),
+            "requests": server.requests,
+            "connections": server.connections,
+            "p50": round(latencies[len(latencies) // 2], 4),
+            "p95": round(latencies[int(len(latencies) * 0.95)], 4),
+            "jobs_per_second": round(job_count / duration, 1)}
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--latency", type=float, default=0.02, help="Seconds the stand-in waits before answering")
+    parser.add_argument("--failure-rate", type=float, default=0.1, help="The share of requests answered with 429/503")
+    parser.add_argument("--rate", type=float, default=0, help="Requests per second for the pooled client (0: no limit)")
+    parser.add_argument("--json", help="Write the results to this file")
+    args = parser.parse_args()
+
+    # Every retry is logged as a warning
+    logging.getLogger("conductor_job.transport").setLevel(logging.ERROR)
+
+    results = [run(mode, args.jobs, args.workers, args.latency, args.failure_rate, args.rate) for mode in ("legacy", "pooled")]
+
+    for result in results:
+        print("{mode:>7}: {submitted}/{jobs} submitted in {duration}s ({jobs_per_second} jobs/s), "
+              "{requests} requests over {connections} connections, p50 {p50}s, p95 {p95}s".format(**result))
+
+    if args.json:
+        with open(args.json, 'w') as fh:
+            json.dump(results, fh, indent=2)
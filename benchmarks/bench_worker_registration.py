@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+
+'''
+Stress the ConductorWorker registration against a fake RepositoryUtils and
+count the repository writes.
+
+Every simulated worker registers from its own WorkerRegistrar, as it would
+from its own Deadline Worker process. The previous registration (save the
+worker settings and the job for every worker) is run alongside for
+comparison. The behaviour itself (one job save per job, unique worker
+names) is covered by tests/test_registration.py.
+
+    python benchmarks/bench_worker_registration.py [--jobs 10] [--workers 300] [--json results.json]
+'''
+
+import argparse
+import concurrent.futures
+import json
+import time
+
+import fakes
+
+from conductor_deadline import registration
+
+
+def legacy_register(repository, worker_name, job_id):
+    '''
+    The registration the ConductorWorker event plugin used to do
+    '''
+
+    worker_settings = repository.GetSlaveSettings(worker_name, True)
+    deadline_job = repository.GetJob(job_id, False)
+    group_name = "conductorautogroup_{}".format(job_id)
+
+    worker_settings.SlaveDescription = "Conductor instance for job {}".format(job_id)
+    worker_settings.SlaveName = "Conductor_{}_{}".format(job_id, "000")
+    worker_settings.SetSlaveGroups([group_name])
+    repository.SaveSlaveSettings(worker_settings)
+
+    deadline_job.JobPostTaskScript = '/opt/Thinkbox/Deadline10/bin/shutdown_conductor_instance.py'
+    repository.SaveJob(deadline_job)
+
+
+def register(repository, worker_name, job_id, task_id):
+
+    registrar = registration.WorkerRegistrar(repository)
+    return registrar.register(worker_name, job_id, environ={"CONDUCTOR_TASK_ID": str(task_id)})
+
+
+def run(job_count, worker_count, threads, legacy):
+
+    repository = fakes.FakeRepositoryUtils()
+    workers = []
+
+    for job_number in range(job_count):
+        job_id = "job{:04d}".format(job_number)
+        # The job isn't in its group yet so the first worker has to move it
+        repository.add_job(job_id, "none")
+
+        for task_id in range(worker_count):
+            workers.append(("ip-10-0-{}-{}".format(job_number, task_id), job_id, task_id))
+
+    start_time = time.perf_counter()
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=threads) as executor:
+
+        if legacy:
+            list(executor.map(lambda worker: legacy_register(repository, worker[0], worker[1]), workers))
+
+        else:
+            list(executor.map(lambda worker: register(repository, *worker), workers))
+
+            # A worker that restarts shouldn't write anything
+            list(executor.map(lambda worker: register(repository, "Conductor_{}_{:03d}".format(worker[1], worker[2]), *worker[1:]),
+                              workers))
+
+    duration = time.perf_counter() - start_time
+
+    return {"mode": "legacy" if legacy else "coalesced",
+            "jobs": job_count,
+            "workers_per_job": worker_count,
+            "duration": round(duration, 4),
+            "calls": dict(repository.calls),
+            "writes": repository.writes,
+            "writes_per_worker": round(repository.writes / float(len(workers)), 3),
+            "max_job_saves_per_job": max(repository.job_saves.values()) if repository.job_saves else 0,
+            "unique_worker_names": len(set(repository.worker_names)),
+            "workers": len(workers)}
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=300, help="The number of workers per job")
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--json", help="Write the results to this file")
+    args = parser.parse_args()
+
+    results = [run(args.jobs, args.workers, args.threads, legacy=True),
+               run(args.jobs, args.workers, args.threads, legacy=False)]
+
+    for result in results:
+        print("{mode:>10}: {workers} workers, {writes} writes ({writes_per_worker}/worker), "
+              "at most {max_job_saves_per_job} job save(s) per job, {unique_worker_names} unique worker names".format(**result))
+
+    if args.json:
+        with open(args.json, 'w') as fh:
+            json.dump(results, fh, indent=2)
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+
+'''
+Time the Conductor job cleanup against a fake Conductor API.
+
+Simulates Deadline jobs finishing, failing, being suspended and being
+deleted, and reports how many kill requests were made. The behaviour itself
+(one request per Deadline job, pool and native jobs left alone) is covered by
+tests/test_cleanup.py.
+
+    python benchmarks/check_job_cleanup.py [--jobs 1000]
+'''
+
+import argparse
+import time
+
+import fakes
+
+from conductor_deadline import cleanup
+
+
+def run(job_count):
+
+    api = fakes.FakeConductorApi()
+    killer = cleanup.ConductorJobKiller(kill_jobs=api.kill_jobs)
+
+    deadline_jobs = []
+
+    for number in range(job_count):
+
+        pooled = number % 10 == 0
+        group = "conductorpool_abc" if pooled else "conductorautogroup_job{}".format(number)
+        deadline_job = fakes.FakeDeadlineJob("job{}".format(number), group=group)
+
+        # Some Deadline jobs were split into several Conductor jobs
+        for part in range(1 + number % 3):
+            conductor_job_id = "{:05d}".format(number * 3 + part)
+            cleanup.add_conductor_job_id(deadline_job, conductor_job_id)
+
+        deadline_jobs.append(deadline_job)
+
+    reasons = ("has finished", "has failed", "has been suspended", "has been deleted")
+    start_time = time.perf_counter()
+
+    for number, deadline_job in enumerate(deadline_jobs):
+        killer.kill_for(deadline_job, reasons[number % len(reasons)])
+
+    duration = time.perf_counter() - start_time
+
+    print("{} Deadline jobs, {} kill requests for {} Conductor jobs in {:.4f}s".format(job_count,
+                                                                                      len(api.requests),
+                                                                                      len(api.killed),
+                                                                                      duration))
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=1000)
+    args = parser.parse_args()
+
+    run(args.jobs)
@@ -0,0 +1,560 @@
+'''
+Offline stand-ins for Deadline and Conductor, shared by the benchmarks.
+
+    FakeDeadlineJob         A Deadline.Jobs.Job with job, plugin and extra info
+    FakeWorkerInfo          A worker's state, as returned by GetSlaveInfo()
+    FakeRepositoryUtils     Just enough of Deadline.Scripting.RepositoryUtils. Every call is counted
+    install_deadline()      Makes 'import Deadline.Scripting' and 'import Deadline.Jobs' work
+    FakeConductorApi        Records kill requests instead of sending them
+    FakeSubmit              A ciocore Submit that returns a job id without uploading or sending anything
+    make_catalog_packages() A software catalog with thousands of packages
+    install_catalog()       Makes conductor_job.catalog.get_catalog() use those packages
+    make_maya_job()         A MayaCmd Deadline job that maps to a package in that catalog
+    write_sidecar()         A .cdepends sidecar with duplicate paths
+'''
+
+import collections
+import json
+import os
+import sys
+import threading
+import types
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from conductor_job import catalog
+
+
+class FakeDeadlineJob(object):
+    '''
+    Every read of the job, plugin or extra info is counted in reads.
+    '''
+
+    def __init__(self, job_id, name=None, group="none", plugin="MayaCmd", job_info=None, plugin_info=None,
+                 extra_info=None, task_count=1, status="Active"):
+
+        self.JobId = job_id
+        self.JobName = name or job_id
+        self.JobGroup = group
+        self.JobPool = "none"
+        self.JobPlugin = plugin
+        self.JobUserName = "artist"
+        self.JobStatus = status
+        self.JobPriority = 50
+        self.TaskCount = task_count
+        self.JobQueuedTasks = task_count if status == "Active" else 0
+        self.JobPendingTasks = 0
+        self.JobRenderingTasks = 0
+        self.JobCompletedTasks = 0
+        self.JobFailedTasks = 0
+        self.JobFrames = (job_info or {}).get("Frames", "")
+        self.JobPostTaskScript = ""
+
+        self.job_info = dict(job_info or {})
+        self.job_info.setdefault("Plugin", plugin)
+        self.plugin_info = dict(plugin_info or {})
+        self.extra_info = dict(extra_info or {})
+
+        self.reads = 0
+
+    def copy(self):
+
+        deadline_job = FakeDeadlineJob(self.JobId, self.JobName, self.JobGroup, self.JobPlugin, self.job_info,
+                                       self.plugin_info, self.extra_info, self.TaskCount, self.JobStatus)
+        deadline_job.JobPostTaskScript = self.JobPostTaskScript
+
+        for name in ("JobQueuedTasks", "JobPendingTasks", "JobRenderingTasks", "JobCompletedTasks", "JobFailedTasks"):
+            setattr(deadline_job, name, getattr(self, name))
+
+        return deadline_job
+
+    def GetJobInfoKeyValue(self, key):
+        self.reads += 1
+        return self.job_info.get(key, "")
+
+    def GetJobPluginInfoKeyValue(self, key):
+        self.reads += 1
+        return self.plugin_info.get(key, "")
+
+    def GetJobExtraInfoKeyValue(self, key):
+        self.reads += 1
+        return self.extra_info.get(key, "")
+
+    def SetJobExtraInfoKeyValue(self, key, value):
+        self.extra_info[key] = value
+
+    def GetJobInfoKeys(self):
+        return list(self.job_info)
+
+    def GetJobPluginInfoKeys(self):
+        return list(self.plugin_info)
+
+    def GetJobExtraInfoKeys(self):
+        return list(self.extra_info)
+
+
+class FakeWorkerSettings(object):
+
+    def __init__(self, name):
+
+        self.SlaveName = name
+        self.SlaveDescription = ""
+        self.SlaveGroups = []
+
+    def SetSlaveGroups(self, groups):
+        self.SlaveGroups = list(groups)
+
+    def copy(self):
+
+        settings = FakeWorkerSettings(self.SlaveName)
+        settings.SlaveDescription = self.SlaveDescription
+        settings.SlaveGroups = list(self.SlaveGroups)
+
+        return settings
+
+
+class FakeWorkerInfo(object):
+
+    def __init__(self, name, state="Idle"):
+
+        self.SlaveName = name
+        self.SlaveState = state
+
+    def copy(self):
+        return FakeWorkerInfo(self.SlaveName, self.SlaveState)
+
+
+class FakeRepositoryUtils(object):
+    '''
+    Just enough of RepositoryUtils for the submitter, worker registration,
+    group management and drain checks. Every call is counted in calls.
+
+    Jobs and worker settings are returned as copies, as Deadline would, so a
+    change is only seen by others once it's saved.
+    '''
+
+    def __init__(self):
+
+        self.calls = collections.Counter()
+        self.job_saves = collections.Counter()
+        self.worker_names = []
+
+        self._jobs = {}
+        self._groups = set(["none"])
+        self._workers = {}
+        self._worker_states = {}
+        self._lock = threading.Lock()
+
+    def add_job(self, deadline_job_or_id, group="none"):
+        '''
+        Add a job to the repository
+
+        :param deadline_job_or_id: A job, or the id of a new job in the given group
+        '''
+
+        if isinstance(deadline_job_or_id, FakeDeadlineJob):
+            deadline_job = deadline_job_or_id
+        else:
+            deadline_job = FakeDeadlineJob(deadline_job_or_id, group=group)
+
+        self._jobs[deadline_job.JobId] = deadline_job
+
+        return deadline_job
+
+    def _count(self, name):
+        self.calls[name] += 1
+
+    def add_worker(self, name, groups=(), state="Idle"):
+        '''
+        Add a worker in the given groups, without counting it as a write
+        '''
+
+        settings = FakeWorkerSettings(name)
+        settings.SetSlaveGroups(groups)
+        self._workers[name] = settings
+        self._worker_states[name] = state
+
+    def set_worker_state(self, name, state):
+        '''
+        Set the state GetSlaveInfo() reports for a worker (ex: 'Rendering')
+        '''
+        self._worker_states[name] = state
+
+    # Jobs
+
+    def GetJob(self, job_id, invalidate):
+
+        with self._lock:
+            self._count("GetJob")
+            stored = self._jobs.get(job_id)
+
+            return stored.copy() if stored is not None else None
+
+    def SaveJob(self, deadline_job):
+
+        with self._lock:
+            self._count("SaveJob")
+            self.job_saves[deadline_job.JobId] += 1
+            self._jobs[deadline_job.JobId] = deadline_job.copy()
+
+    def GetJobsInState(self, state):
+
+        with self._lock:
+            self._count("GetJobsInState")
+            return [deadline_job.copy() for deadline_job in self._jobs.values() if deadline_job.JobStatus == state]
+
+    def GetJobs(self, invalidate):
+
+        with self._lock:
+            self._count("GetJobs")
+            return [deadline_job.copy() for deadline_job in self._jobs.values()]
+
+    # Groups
+
+    def GetGroupNames(self):
+
+        with self._lock:
+            self._count("GetGroupNames")
+            return sorted(self._groups)
+
+    def AddGroup(self, group_name):
+
+        with self._lock:
+            self._count("AddGroup")
+            self._groups.add(group_name)
+
+    def DeleteGroup(self, group_name):
+
+        with self._lock:
+            self._count("DeleteGroup")
+            self._groups.discard(group_name)
+
+    # Workers
+
+    def GetSlaveSettings(self, name, invalidate):
+
+        with self._lock:
+            self._count("GetSlaveSettings")
+            return (self._workers.get(name) or FakeWorkerSettings(name)).copy()
+
+    def SaveSlaveSettings(self, settings):
+
+        with self._lock:
+            self._count("SaveSlaveSettings")
+            self._workers[settings.SlaveName] = settings.copy()
+            self.worker_names.append(settings.SlaveName)
+
+    def GetSlaveInfo(self, name, invalidate):
+
+        with self._lock:
+            self._count("GetSlaveInfo")
+
+            if name not in self._workers and name not in self._worker_states:
+                return None
+
+            return FakeWorkerInfo(name, self._worker_states.get(name, "Idle"))
+
+    def GetSlaveNamesInGroup(self, group_name):
+
+        with self._lock:
+            self._count("GetSlaveNamesInGroup")
+            return [name for name, settings in self._workers.items() if group_name in settings.SlaveGroups]
+
+    @property
+    def writes(self):
+        return self.calls["SaveSlaveSettings"] + self.calls["SaveJob"] + self.calls["AddGroup"] + self.calls["DeleteGroup"]
+
+
+def install_deadline(repository=None):
+    '''
+    Register fake Deadline, Deadline.Scripting and Deadline.Jobs modules so
+    code that imports them runs outside of Deadline.
+
+    :returns: The RepositoryUtils the fake Deadline.Scripting uses
+    :rtype: :py:class:`~FakeRepositoryUtils`
+    '''
+
+    repository = repository or FakeRepositoryUtils()
+
+    deadline = sys.modules.get("Deadline") or types.ModuleType("Deadline")
+    scripting = types.ModuleType("Deadline.Scripting")
+    jobs = types.ModuleType("Deadline.Jobs")
+
+    scripting.RepositoryUtils = repository
+    jobs.Job = FakeDeadlineJob
+    deadline.Scripting = scripting
+    deadline.Jobs = jobs
+
+    sys.modules["Deadline"] = deadline
+    sys.modules["Deadline.Scripting"] = scripting
+    sys.modules["Deadline.Jobs"] = jobs
+
+    return repository
+
+
+class FakeConductorApi(object):
+    '''
+    Records the kill requests instead of sending them to Conductor
+    '''
+
+    def __init__(self):
+
+        self.requests = []
+        self.killed = set()
+
+    def kill_jobs(self, *job_ids):
+
+        self.requests.append(list(job_ids))
+        self.killed.update(job_ids)
+
+        return {'body': 'success', 'message': "Jobs {} have been kill.".format(list(job_ids))}
+
+
+class FakeSubmit(object):
+    '''
+    Stands in for :py:class:`~ciocore.conductor_submit.Submit`. The payload is
+    serialised, as it would be before being sent, and a new job id is
+    returned.
+    '''
+
+    _next_id = 0
+    _lock = threading.Lock()
+
+    def __init__(self, args):
+
+        self.upload_paths = list(args.get("upload_paths", []))
+        self.payload = dict(args, upload_files=[], upload_size=0)
+        self.payload.pop("upload_paths", None)
+        self.payload_size = 0
+
+    def main(self):
+
+        self.payload_size = len(json.dumps(self.payload))
+
+        with FakeSubmit._lock:
+            FakeSubmit._next_id += 1
+            job_id = "{:05d}".format(FakeSubmit._next_id)
+
+        return {"jobid": job_id, "status": "success"}, 201
+
+
+MAYA_VERSIONS = ["2018.SP6", "2019.SP2", "2020.SP4", "2022.SP3", "2023.SP3", "2024 SP1"]
+RENDERERS = ["arnold-maya", "v-ray-maya", "renderman-maya", "redshift-maya"]
+
+
+def _package(package_id, product, version, host=None, plugins=None, environment=None):
+
+    # Versions with a space (ex: 2024 SP1) are kept whole so the package
+    # name matches the MayaCmd mapper's names
+    if " " in version:
+        parts = [version, "", "", ""]
+    else:
+        parts = (version.split(".") + ["", "", "", ""])[:4]
+
+    package = {"package_id": package_id,
+               "product": product,
+               "major_version": parts[0],
+               "minor_version": parts[1],
+               "release_version": parts[2],
+               "build_version": parts[3],
+               "platform": "linux",
+               "package": "{} {}".format(product, version),
+               "plugins": list(plugins or []),
+               "environment": environment or [],
+               "updated_at": "2024-01-01T00:00:00"}
+
+    if host:
+        package["plugin_host_product"] = host["product"]
+        package["plugin_host_version"] = host["major_version"]
+
+    return package
+
+
+def make_catalog_packages(plugin_versions=40, extra_products=200, extra_versions=10):
+    '''
+    Get a software catalog in the format of the Conductor packages endpoint.
+
+    Every Maya version in the MayaCmd mapper has plugin_versions versions of
+    each renderer. extra_products * extra_versions unrelated host packages
+    pad the catalog to a realistic size.
+
+    :rtype: list of dict
+    '''
+
+    packages = []
+
+    for maya_version in MAYA_VERSIONS:
+
+        host = _package("maya-{}".format(maya_version), "maya-io", maya_version,
+                        environment=[{"name": "PATH", "value": "/opt/autodesk/maya{}/bin".format(maya_version),
+                                      "merge_policy": "prepend"},
+                                     {"name": "MAYA_LOCATION", "value": "/opt/autodesk/maya{}".format(maya_version),
+                                      "merge_policy": "exclusive"}])
+        packages.append(host)
+
+        for renderer in RENDERERS:
+            for number in range(plugin_versions):
+
+                version = "{}.{}.{}.0".format(4 + number // 20, number % 20, number % 3)
+                plugin = _package("{}-{}-{}".format(renderer, maya_version, version), renderer, version, host=host,
+                                  environment=[{"name": "MAYA_MODULE_PATH",
+                                                "value": "/opt/{}/{}/modules".format(renderer, version),
+                                                "merge_policy": "append"}])
+                host["plugins"].append(plugin["package_id"])
+                packages.append(plugin)
+
+    packages.append(_package("mtoa-4.0.3.0", "arnold-maya", "4.0.3.0"))
+
+    for major in range(10, 13):
+        packages.append(_package("deadline-{}".format(major), "deadline", "{}.3.1.4".format(major)))
+
+    for product_number in range(extra_products):
+        for number in range(extra_versions):
+            packages.append(_package("product{}-{}".format(product_number, number), "product{}".format(product_number),
+                                     "{}.{}".format(1 + number, product_number % 7)))
+
+    return packages
+
+
+def install_catalog(packages=None):
+    '''
+    Make the process-wide software catalog use the given packages (or
+    make_catalog_packages()). Nothing is read from or written to disk.
+
+    :rtype: :py:class:`~conductor_job.catalog.SoftwareCatalog`
+    '''
+
+    packages = packages if packages is not None else make_catalog_packages()
+    software_catalog = catalog.SoftwareCatalog(ttl=0, fetch=lambda: packages)
+    catalog.set_catalog(software_catalog)
+
+    return software_catalog
+
+
+def make_maya_job(job_id, frames="1-100", version="2024", renderer="arnold", scene_path=None, task_count=None):
+    '''
+    Get a MayaCmd Deadline job for the fake catalog
+    '''
+
+    scene_path = scene_path or "/projects/show/{}/scenes/{}.ma".format(job_id, job_id)
+
+    return FakeDeadlineJob(job_id,
+                           name="{} render".format(job_id),
+                           plugin="MayaCmd",
+                           job_info={"Plugin": "MayaCmd", "Frames": frames, "Name": "{} render".format(job_id)},
+                           plugin_info={"SceneFile": scene_path,
+                                        "ProjectPath": os.path.dirname(os.path.dirname(scene_path)),
+                                        "Version": version,
+                                        "Renderer": renderer,
+                                        "OutputFilePath": "/projects/show/{}/images".format(job_id),
+                                        "RenderLayer": ""},
+                           task_count=task_count or 1)
+
+
+def write_sidecar(path, count, duplicate_ratio=0.3, files_per_directory=50):
+    '''
+    Write a dependency sidecar with count entries, some of them duplicates
+    with backslashes.
+
+    :returns: The path to the sidecar
+    :rtype: str
+    '''
+
+    unique_count = max(1, int(count * (1 - duplicate_ratio)))
+
+    with open(path, 'w') as fh:
+        fh.write('{"dependencies": [')
+
+        for number in range(count):
+            index = number % unique_count
+            dependency = "/projects/show/assets/dir{}/texture_{}.exr".format(index // files_per_directory, index)
+
+            if number >= unique_count:
+                dependency = dependency.replace("/", "\\")
+
+            fh.write("{}{}".format(", " if number else "", json.dumps(dependency)))
+
+        fh.write(']}')
+
+    return path
+
+
+def write_maya_ascii(path, node_count, mesh_lines=20, asset_directory=None, reference_path=None):
+    '''
+    Write a Maya ASCII scene with node_count nodes. One in ten is a file
+    texture (with a UDIM token every so often), every 50th an aiStandIn,
+    every 100th an AlembicNode and the rest are meshes with mesh_lines lines
+    of vertex data each.
+
+    :param asset_directory: If given, the files the scene depends on are
+                            created there
+    :type asset_directory: str
+
+    :param reference_path: A scene to reference
+    :type reference_path: str
+
+    :returns: The paths the scene depends on
+    :rtype: list of str
+    '''
+
+    asset_directory = asset_directory or "/projects/show/assets"
+    dependencies = []
+
+    def _add(dependency_path, create=True):
+
+        dependencies.append(dependency_path)
+
+        if create and os.path.isdir(asset_directory):
+            open(dependency_path, 'w').close()
+
+    with open(path, 'w') as fh:
+        fh.write('//Maya ASCII 2024 scene\n//Name: {}\n'.format(os.path.basename(path)))
+
+        if reference_path:
+            fh.write('file -rdi 1 -ns "asset" -rfn "assetRN" -op "v=0;" -typ "mayaAscii"\n\t\t "{}";\n'.format(reference_path))
+            fh.write('file -r -ns "asset" -dr 1 -rfn "assetRN" -op "v=0;" -typ "mayaAscii" "{}";\n'.format(reference_path))
+            dependencies.append(reference_path)
+
+        fh.write('requires maya "2024";\nrequires -nodeType "aiStandIn" "mtoa" "5.3.0";\ncurrentUnit -l centimeter;\n')
+
+        for number in range(node_count):
+
+            if number % 100 == 99:
+                fh.write('createNode AlembicNode -n "alembic{0}";\n\tsetAttr ".fn" -type "string" "{1}/cache_{0}.abc";\n'.format(
+                    number, asset_directory))
+                _add("{}/cache_{}.abc".format(asset_directory, number))
+
+            elif number % 50 == 49:
+                fh.write('createNode aiStandIn -n "standIn{0}";\n\tsetAttr ".dso" -type "string" "{1}/standin_{0}.ass";\n'.format(
+                    number, asset_directory))
+                _add("{}/standin_{}.ass".format(asset_directory, number))
+
+            elif number % 10 == 9:
+                fh.write('createNode file -n "file{0}";\n\tsetAttr ".ftn" -type "string" "{1}/texture_{0}.<UDIM>.exr";\n'
+                         '\tsetAttr ".cs" -type "string" "sRGB";\n'.format(number, asset_directory)
+                         if number % 20 == 19 else
+                         'createNode file -n "file{0}";\n\tsetAttr ".ftn" -type "string" \n\t\t"{1}/texture_{0}.exr";\n'.format(
+                             number, asset_directory))
+
+                if number % 20 == 19:
+                    for tile in (1001, 1002):
+                        _add("{}/texture_{}.{}.exr".format(asset_directory, number, tile))
+
+                else:
+                    _add("{}/texture_{}.exr".format(asset_directory, number))
+
+            else:
+                fh.write('createNode mesh -n "meshShape{0}" -p "mesh{0}";\n\tsetAttr -k off ".v";\n'
+                         '\tsetAttr -s {1} ".vt[0:{2}]"'.format(number, mesh_lines * 3, mesh_lines * 3 - 1))
+
+                for _ in range(mesh_lines):
+                    fh.write('  -0.5 -0.5 0.5 0.5 -0.5 0.5 -0.5 0.5 0.5')
+
+                    fh.write("\n\t\t")
+
+                fh.write(';\n')
+
+        fh.write('select -ne :defaultRenderGlobals;\n\tsetAttr ".ftn" -type "string" "not/a/dependency.exr";\n')
+        fh.write('connectAttr "file9.oc" "lambert1.c";\n// End of {}\n'.format(os.path.basename(path)))
+
+    return dependencies
@@ -0,0 +1,412 @@
+#!/usr/bin/env python3
+
+'''
+Time the submission pipeline offline, at several sizes, and store the
+results as JSON so releases can be compared.
+
+Deadline and Conductor are replaced by the fakes in benchmarks/fakes.py:
+a fake RepositoryUtils and Deadline jobs, a catalog of thousands of packages
+and a Submit that serialises the payload without sending it.
+
+    python benchmarks/run_benchmarks.py                        # everything, saved to ~/.conductor/benchmarks/<version>.json
+    python benchmarks/run_benchmarks.py --only maya_task_data sidecar_load --quick
+    python benchmarks/run_benchmarks.py --compare ~/.conductor/benchmarks/1.0.0.json
+    python benchmarks/run_benchmarks.py --list
+
+A benchmark is a function registered with @benchmark. It's called with a
+size and a Context for its setup and returns the function to time.
+'''
+
+import argparse
+import collections
+import datetime
+import json
+import logging
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Outside the checkout so a run doesn't leave untracked files behind.
+# $CONDUCTOR_DEADLINE_BENCHMARK_DIR overrides it
+DEFAULT_RESULTS_DIR = os.path.join(os.path.expanduser("~"), ".conductor", "benchmarks")
+sys.path.insert(0, BENCHMARKS_DIR)
+
+import fakes
+
+import cioseq.sequence
+
+import conductor_job
+import conductor_job.maya_ascii
+from conductor_deadline import package_mapper
+from conductor_deadline import snapshot
+from conductor_deadline import submitter
+
+
+BENCHMARKS = collections.OrderedDict()
+
+
+def benchmark(name, sizes, unit):
+    '''
+    Register a benchmark
+
+    :param sizes: The default sizes to run it at
+    :param unit: What the size counts (ex: frames)
+    '''
+
+    def register(function):
+        BENCHMARKS[name] = {"function": function, "sizes": sizes, "unit": unit, "doc": (function.__doc__ or "").strip()}
+        return function
+
+    return register
+
+
+class Context(object):
+    '''
+    Shared by the benchmarks of a run. The catalog is built once, and
+    temporary files go in a directory that's removed at the end of the run.
+    '''
+
+    def __init__(self):
+
+        self.packages = fakes.make_catalog_packages()
+        self.directory = tempfile.mkdtemp(prefix="conductor_deadline_bench_")
+
+        # Anything the timed function wants to report (ex: a count)
+        self.extra = {}
+
+    def install_catalog(self):
+        return fakes.install_catalog(self.packages)
+
+    def path(self, name):
+        return os.path.join(self.directory, name)
+
+    def close(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+def make_maya_render_job(frame_count, upload_count=0):
+
+    job = conductor_job.MayaRenderJob(scene_path="/projects/show/shot/scenes/shot_v001.ma",
+                                      project_path="/projects/show/shot")
+    job.renderer = "arnold-maya"
+    job.output_path = "/projects/show/shot/images"
+    job.frames = cioseq.sequence.Sequence.create("1-{}".format(frame_count))
+    job.upload_paths = ["/projects/show/assets/texture_{}.exr".format(number) for number in range(upload_count)]
+    job.preflight_enabled = False
+    job._dependency_scan_enabled = False
+    job._dependencies = []
+
+    return job
+
+
+def make_deadline_jobs(count):
+
+    versions = [version for version in package_mapper.DeadlineToConductorPackageMapper.get_mapping_class(
+        fakes.make_maya_job("probe")).product_version_map]
+    renderers = ["arnold", "vray", "renderman", "redshift"]
+
+    return [fakes.make_maya_job("job{:05d}".format(number),
+                                version=versions[number % len(versions)],
+                                renderer=renderers[(number // len(versions)) % len(renderers)])
+            for number in range(count)]
+
+
+@benchmark("maya_task_data", sizes=[1000, 10000, 100000], unit="frames")
+def bench_maya_task_data(size, context):
+    '''
+    MayaRenderJob._get_task_data()
+    '''
+
+    job = make_maya_render_job(size)
+
+    def run():
+        context.extra["tasks"] = len(job._get_task_data())
+
+    return run
+
+
+@benchmark("job_environment", sizes=[10, 100, 1000], unit="packages")
+def bench_job_environment(size, context):
+    '''
+    Job._get_environment() merging the environment of the software packages
+    '''
+
+    job = conductor_job.Job()
+    job.software_packages = [package for package in context.packages if package.get("environment")][:size]
+    job.environment = {"DEADLINE_JOBID": "job00000"}
+
+    def run():
+        context.extra["variables"] = len(job._get_environment())
+
+    return run
+
+
+@benchmark("mapping_class", sizes=[100, 1000, 10000], unit="jobs")
+def bench_mapping_class(size, context):
+    '''
+    DeadlineToConductorPackageMapper.get_mapping_class() for Deadline job snapshots
+    '''
+
+    job_snapshots = [snapshot.DeadlineJobSnapshot.from_job(deadline_job) for deadline_job in make_deadline_jobs(size)]
+
+    def run():
+        for job_snapshot in job_snapshots:
+            package_mapper.DeadlineToConductorPackageMapper.get_mapping_class(job_snapshot)
+
+    return run
+
+
+@benchmark("map", sizes=[100, 1000, 10000], unit="jobs")
+def bench_map(size, context):
+    '''
+    DeadlineToConductorPackageMapper.map() for Deadline jobs with a mix of
+    Maya versions and renderers, starting from an empty plan cache
+    '''
+
+    context.install_catalog().packages
+    deadline_jobs = make_deadline_jobs(size)
+    package_mapper.DeadlineToConductorPackageMapper.clear_plans()
+
+    def run():
+
+        package_count = 0
+
+        for deadline_job in deadline_jobs:
+            package_count += len(package_mapper.DeadlineToConductorPackageMapper.map(deadline_job))
+
+        context.extra["packages"] = package_count
+        context.extra["plans"] = package_mapper.DeadlineToConductorPackageMapper.plan_stats()
+
+    return run
+
+
+@benchmark("sidecar_load", sizes=[10000, 100000, 500000], unit="entries")
+def bench_sidecar_load(size, context):
+    '''
+    conductor_job.sidecar.load_dependencies() on a sidecar with 30% duplicates
+    '''
+
+    sidecar_path = context.path("scene_{}.ma.cdepends".format(size))
+
+    if not os.path.exists(sidecar_path):
+        fakes.write_sidecar(sidecar_path, size)
+
+    def run():
+        context.extra["dependencies"] = len(conductor_job.sidecar.load_dependencies(sidecar_path))
+
+    return run
+
+
+@benchmark("maya_ascii_scan", sizes=[1000, 10000, 100000], unit="nodes")
+def bench_maya_ascii_scan(size, context):
+    '''
+    conductor_job.maya_ascii.collect_dependencies() on a Maya ASCII scene
+    with no cached scan
+    '''
+
+    scene_path = context.path("scene_{}.ma".format(size))
+    asset_directory = context.path("assets")
+
+    if not os.path.exists(asset_directory):
+        os.makedirs(asset_directory)
+
+    if not os.path.exists(scene_path):
+        fakes.write_maya_ascii(scene_path, size, asset_directory=asset_directory)
+
+    def run():
+        dependencies = conductor_job.maya_ascii.collect_dependencies(scene_path,
+                                                                     cache=conductor_job.maya_ascii.ScanCache(""))
+        context.extra["dependencies"] = len(dependencies)
+        context.extra["scene_mb"] = round(os.path.getsize(scene_path) / (1024.0 * 1024), 1)
+
+    return run
+
+
+@benchmark("payload_assembly", sizes=[1000, 10000, 100000], unit="frames")
+def bench_payload_assembly(size, context):
+    '''
+    MayaRenderJob.submit_job() with 1000 upload paths, up to the request
+    that would be sent (the payload is serialised but not sent)
+    '''
+
+    job = make_maya_render_job(size, upload_count=1000)
+    submitters = []
+
+    def _get_submitter(data):
+        submitters.append(fakes.FakeSubmit(data))
+        return submitters[-1]
+
+    job._get_submitter = _get_submitter
+
+    def run():
+        job.submit_job()
+        context.extra["submissions"] = len(submitters)
+        context.extra["payload_bytes"] = sum([fake_submit.payload_size for fake_submit in submitters])
+
+    return run
+
+
+@benchmark("build_job", sizes=[10, 100, 1000], unit="jobs")
+def bench_build_job(size, context):
+    '''
+    DeadlineJobSubmitter.build_job() in native mode for Deadline jobs with a
+    1000 entry sidecar each
+    '''
+
+    context.install_catalog().packages
+    sidecar_path = context.path("shared.cdepends")
+
+    if not os.path.exists(sidecar_path):
+        fakes.write_sidecar(sidecar_path, 1000)
+
+    repository = fakes.FakeRepositoryUtils()
+    job_submitter = submitter.DeadlineJobSubmitter(repository=repository)
+    settings = submitter.SubmissionSettings(native=True, instance_type="n1-standard-8", sidecar_path=sidecar_path)
+
+    deadline_jobs = make_deadline_jobs(size)
+
+    for deadline_job in deadline_jobs:
+        repository.add_job(deadline_job)
+
+    def run():
+
+        for deadline_job in deadline_jobs:
+            job_submitter.build_job(deadline_job, settings)
+
+        context.extra["deadline_reads"] = sum([deadline_job.reads for deadline_job in deadline_jobs])
+        context.extra["repository_calls"] = dict(repository.calls)
+
+    return run
+
+
+def run_benchmark(name, size, repeat, context):
+
+    durations = []
+
+    for _ in range(repeat):
+
+        context.extra = {}
+        timed = BENCHMARKS[name]["function"](size, context)
+
+        start_time = time.perf_counter()
+        timed()
+        durations.append(time.perf_counter() - start_time)
+
+    return {"benchmark": name,
+            "size": size,
+            "unit": BENCHMARKS[name]["unit"],
+            "repeat": repeat,
+            "best": round(min(durations), 6),
+            "median": round(statistics.median(durations), 6),
+            "per_item_us": round(min(durations) / size * 1e6, 3),
+            "extra": context.extra}
+
+
+def get_version():
+
+    version_path = os.path.join(BENCHMARKS_DIR, "..", "VERSION")
+
+    if os.path.exists(version_path):
+        with open(version_path, 'r') as fh:
+            return fh.read().strip() or "dev"
+
+    return "unknown"
+
+
+def compare(results, previous):
+    '''
+    Print the change in the best time for every benchmark and size that's in
+    both runs
+    '''
+
+    previous_results = {(result["benchmark"], result["size"]): result for result in previous["results"]}
+
+    print("\nCompared with {} ({}):".format(previous.get("version"), previous.get("timestamp")))
+
+    for result in results:
+        old = previous_results.get((result["benchmark"], result["size"]))
+
+        if old is None or not old["best"]:
+            continue
+
+        ratio = result["best"] / old["best"]
+        print("  {:<18} {:>8} {:<9} {:>10.4f}s -> {:>10.4f}s  x{:.2f}{}".format(result["benchmark"], result["size"],
+                                                                              result["unit"], old["best"],
+                                                                              result["best"], ratio,
+                                                                              "  SLOWER" if ratio > 1.2 else ""))
+
+
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS), help="Only run these benchmarks")
+    parser.add_argument("--sizes", type=int, nargs="+", help="Run every benchmark at these sizes")
+    parser.add_argument("--quick", action="store_true", help="Only run the smallest size of each benchmark")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", help="Where to write the results (default: ~/.conductor/benchmarks/<version>.json)")
+    parser.add_argument("--compare", help="A previous results file to compare with")
+    parser.add_argument("--list", action="store_true", help="List the benchmarks")
+    parser.add_argument("--log-file", default=os.devnull,
+                        help="Where the log goes. It's written, not shown, so its cost is part of the timings")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for name, details in BENCHMARKS.items():
+            print("{:<18} {}  (sizes: {} {})".format(name, details["doc"].splitlines()[0], details["sizes"], details["unit"]))
+        return 0
+
+    logging.basicConfig(filename=args.log_file, level=logging.WARNING)
+
+    fakes.install_deadline()
+    context = Context()
+    results = []
+
+    try:
+        for name in (args.only or list(BENCHMARKS)):
+
+            sizes = args.sizes or BENCHMARKS[name]["sizes"]
+            if args.quick:
+                sizes = sizes[:1]
+
+            for size in sizes:
+                result = run_benchmark(name, size, args.repeat, context)
+                results.append(result)
+
+                print("{benchmark:<18} {size:>8} {unit:<9} best {best:>10.4f}s  median {median:>10.4f}s  "
+                      "{per_item_us:>10.3f}us/item".format(**result))
+
+    finally:
+        context.close()
+
+    output = {"version": get_version(),
+              "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+              "python": platform.python_version(),
+              "platform": platform.platform(),
+              "results": results}
+
+    results_dir = os.environ.get("CONDUCTOR_DEADLINE_BENCHMARK_DIR", DEFAULT_RESULTS_DIR)
+    json_path = args.json or os.path.join(results_dir, "{}.json".format(output["version"]))
+
+    if os.path.dirname(json_path) and not os.path.exists(os.path.dirname(json_path)):
+        os.makedirs(os.path.dirname(json_path))
+
+    with open(json_path, 'w') as fh:
+        json.dump(output, fh, indent=2)
+
+    print("\nResults written to {}".format(json_path))
+
+    if args.compare:
+        with open(args.compare, 'r') as fh:
+            compare(results, json.load(fh))
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
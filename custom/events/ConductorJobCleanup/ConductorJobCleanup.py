@@ -0,0 +1,60 @@
+import traceback
+
+from Deadline.Events import *
+from Deadline.Scripting import *
+
+import conductor_deadline.cleanup
+
+def GetDeadlineEventListener():
+    return ConductorJobCleanup()
+
+
+def CleanupDeadlineEventListener(eventListener):
+    eventListener.Cleanup()
+
+
+###############################################################
+# The event listener class.
+###############################################################
+class ConductorJobCleanup(DeadlineEventListener):
+    '''
+    Kills the Conductor jobs of a Deadline job as soon as the Deadline job is
+    finished, failed, suspended or deleted.
+    '''
+
+    def __init__(self):
+        self.OnJobFinishedCallback += self.OnJobFinished
+        self.OnJobFailedCallback += self.OnJobFailed
+        self.OnJobSuspendedCallback += self.OnJobSuspended
+        self.OnJobDeletedCallback += self.OnJobDeleted
+
+    def Cleanup(self):
+        del self.OnJobFinishedCallback
+        del self.OnJobFailedCallback
+        del self.OnJobSuspendedCallback
+        del self.OnJobDeletedCallback
+
+    def OnJobFinished(self, job):
+        self.killConductorJobs(job, "has finished")
+
+    def OnJobFailed(self, job):
+        self.killConductorJobs(job, "has failed")
+
+    def OnJobSuspended(self, job):
+        
+        if self.GetBooleanConfigEntryWithDefault("KillOnSuspend", True):
+            self.killConductorJobs(job, "has been suspended")
+
+    def OnJobDeleted(self, job):
+        self.killConductorJobs(job, "has been deleted")
+        
+    def killConductorJobs(self, job, reason):
+        
+        try:
+            killed = conductor_deadline.cleanup.ConductorJobKiller().kill_for(job, reason)
+            
+            if killed:
+                self.LogInfo("Killed Conductor job(s) {} for Deadline job {}".format(", ".join(killed), job.JobId))
+                
+        except Exception:
+            self.LogWarning("Unable to kill the Conductor jobs for Deadline job {}:\n{}".format(job.JobId, traceback.format_exc()))
@@ -3,6 +3,13 @@ import os
 from Deadline.Events import *
 from Deadline.Scripting import *
 
+import conductor_deadline.registration
+import conductor_deadline.shutdown
+
+# Used when the drain watch can't be started, as it was before workers were
+# kept alive between tasks
+FALLBACK_POST_TASK_SCRIPT = '/opt/Thinkbox/Deadline10/bin/shutdown_conductor_instance.py'
+
 def GetDeadlineEventListener():
     return OnConductorWorkerStart()
 
@@ -20,27 +27,53 @@ class OnConductorWorkerStart(DeadlineEventListener):
         self.OnSlaveStartedCallback += self.OnSlaveStarted
 
     def Cleanup(self):
-        del self.OnSlaveStalledCallback
+        del self.OnSlaveStartedCallback
 
     def OnSlaveStarted(self, slave_name):
 
-        slaveSettings = RepositoryUtils.GetSlaveSettings(slave_name, True)
-        
         if os.environ.get('CONDUCTOR', False):
             
             jobId = str(os.environ['DEADLINE_JOBID'])
             
-            deadlineJob = RepositoryUtils.GetJob(jobId, False)
-
-            groupName = "conductorautogroup_{}".format(jobId)
-
-            slaveSettings.SlaveDescription = "Conductor instance for job {}".format(jobId)
-            slaveSettings.SlaveName = "Conductor_{}_{}".format(jobId, "000")
-            slaveSettings.SetSlaveGroups([groupName])
-            RepositoryUtils.SaveSlaveSettings(slaveSettings)
+            # Workers in a warm pool join the pool's group
+            groupName = os.environ.get('CONDUCTOR_DEADLINE_GROUP_NAME') or "conductorautogroup_{}".format(jobId)
             
-            print "Adding Slave to group {}".format(groupName)
-            print "Slave Groups: {}".format( slaveSettings.SlaveGroups)
-
-            deadlineJob.JobPostTaskScript = '/opt/Thinkbox/Deadline10/bin/shutdown_conductor_instance.py'
-            RepositoryUtils.SaveJob(deadlineJob)
\ No newline at end of file
+            # Only writes to the repository if the worker or job isn't already
+            # set up, so many workers starting together don't all save the job
+            writes = conductor_deadline.registration.WorkerRegistrar(RepositoryUtils).register(slave_name, jobId, groupName)
+            
+            print("Worker {} is in group {} ({} repository writes)".format(
+                conductor_deadline.registration.get_worker_name(jobId), groupName, writes))
+            
+            self.StartDrainWatch(slave_name, jobId, groupName)
+            
+    def StartDrainWatch(self, slave_name, jobId, groupName):
+        '''
+        The worker isn't shut down after each task. It's kept alive while its
+        group has work and stopped once it's been idle for a while.
+        
+        The listener doesn't live long enough to watch the worker itself, so
+        the watch runs in a process of its own. If that process can't be
+        started, the job falls back to shutting the instance down after each
+        task.
+        '''
+        
+        idleWindow = os.environ.get('CONDUCTOR_DEADLINE_IDLE_WINDOW') or self.GetConfigEntryWithDefault("IdleWindow", str(conductor_deadline.shutdown.DEFAULT_IDLE_WINDOW))
+        pollInterval = self.GetConfigEntryWithDefault("PollInterval", str(conductor_deadline.shutdown.DEFAULT_POLL_INTERVAL))
+        deadlineCommand = os.path.join(ClientUtils.GetBinDirectory(), "deadlinecommand")
+        scriptPath = os.path.join(RepositoryUtils.GetEventPluginDirectory("ConductorWorker"), "drain_conductor_worker.py")
+        
+        try:
+            pid = conductor_deadline.shutdown.start_watch_process(scriptPath, slave_name, jobId, groupName,
+                                                                  float(idleWindow), float(pollInterval), deadlineCommand)
+            
+            print("Worker is watched by process {}. It's stopped once group {} has had no work for {:.0f}s".format(pid, groupName, float(idleWindow)))
+            
+        except Exception as errMsg:
+            print("Unable to start the drain watch ({}). Shutting the instance down after each task instead".format(errMsg))
+            
+            deadlineJob = RepositoryUtils.GetJob(jobId, True)
+            
+            if deadlineJob is not None and deadlineJob.JobPostTaskScript != FALLBACK_POST_TASK_SCRIPT:
+                deadlineJob.JobPostTaskScript = FALLBACK_POST_TASK_SCRIPT
+                RepositoryUtils.SaveJob(deadlineJob)
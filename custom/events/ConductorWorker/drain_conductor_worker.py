@@ -0,0 +1,31 @@
+'''
+Keep a Deadline Worker on Conductor alive until its group has been drained,
+then stop it. Started by the ConductorWorker event plugin when the worker
+starts, in a process of its own:
+
+    deadlinecommand -ExecuteScript drain_conductor_worker.py <worker name> <job id> <group> <idle window> <poll interval>
+'''
+
+import logging
+import os
+
+from Deadline.Scripting import *
+
+import conductor_deadline.registration
+import conductor_deadline.shutdown
+
+def __main__(*args):
+    
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    
+    workerName, jobId, groupName, idleWindow, pollInterval = args[:5]
+    
+    # An autogroup only has its job, so only that job needs to be read. A
+    # pool's jobs aren't known in advance.
+    jobIds = [jobId] if groupName == conductor_deadline.registration.AUTOGROUP_TEMPLATE.format(job_id=jobId) else None
+    
+    conductor_deadline.shutdown.watch_worker(workerName, groupName, RepositoryUtils,
+                                             idle_window=float(idleWindow),
+                                             poll_interval=float(pollInterval),
+                                             job_ids=jobIds,
+                                             deadline_command=os.path.join(ClientUtils.GetBinDirectory(), "deadlinecommand"))
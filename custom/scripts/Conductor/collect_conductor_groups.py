@@ -0,0 +1,23 @@
+#!/usr/bin/env python3
+
+'''
+Delete the conductorautogroup groups of Deadline jobs that have completed,
+failed or been deleted, and the conductorpool groups with no live jobs and
+no workers. Suitable for running from cron.
+
+    deadlinecommand -ExecuteScript collect_conductor_groups.py [--dry-run]
+
+See conductor_deadline.groups for details.
+'''
+
+import sys
+
+import conductor_deadline.groups
+
+
+def __main__(*args):
+
+    exit_code = conductor_deadline.groups.main([str(arg) for arg in args])
+
+    if exit_code:
+        sys.exit(exit_code)
@@ -0,0 +1,21 @@
+#!/usr/bin/env python3
+
+'''
+Headless entry point for submitting Deadline jobs to Conductor.
+
+    deadlinecommand -ExecuteScript submit_to_conductor_cli.py <job id> [<job id> ...] [options]
+
+See conductor_deadline.cli for the available options.
+'''
+
+import sys
+
+import conductor_deadline.cli
+
+
+def __main__(*args):
+
+    exit_code = conductor_deadline.cli.main([str(arg) for arg in args])
+
+    if exit_code:
+        sys.exit(exit_code)
@@ -1,22 +1,30 @@
 #!/usr/bin/env python3
 
 import conductor_deadline.package_mapper
+import conductor_deadline.submitter
 import conductor_job as conductorjob
-import cioseq.sequence
+import conductor_job.catalog
+import conductor_job.sizing
 import ciocore.package_tree
 import ciocore
-import ciocore.data
+import ciocore.api_client
+import ciocore.hardware_set
 from DeadlineUI.Controls.Scripting.DeadlineScriptDialog import DeadlineScriptDialog
 import Deadline.Scripting
+import concurrent.futures
 import os
 import operator
-import json
 import logging
+import PyQt5.QtCore
 import PyQt5.QtWidgets
+import time
 import traceback
 
 logging.basicConfig()
 
+LOG = logging.getLogger("conductor_deadline.send_to_conductor")
+LOG.setLevel(logging.INFO)
+
 
 class ConductorErrorDialog(PyQt5.QtWidgets.QMessageBox):
 
@@ -33,13 +41,60 @@ class ConductorErrorDialog(PyQt5.QtWidgets.QMessageBox):
         self.setDetailedText(traceback.format_exc())
 
 
+class ConductorFetchNotifier(PyQt5.QtCore.QObject):
+    '''
+    Forwards the result of a background fetch to the UI thread
+    '''
+
+    fetched = PyQt5.QtCore.pyqtSignal(str, object, object)
+
+    def notify(self, name):
+
+        def callback(future):
+            try:
+                self.fetched.emit(name, future.result(), None)
+            except Exception as errMsg:
+                self.fetched.emit(name, None, errMsg)
+
+        return callback
+
+
+class ConductorBatchNotifier(PyQt5.QtCore.QObject):
+    '''
+    Forwards the progress of a background batch submission to the UI thread
+    '''
+
+    # The SubmissionResult of each job, as soon as it's done
+    submitted = PyQt5.QtCore.pyqtSignal(object)
+
+    # The results of every job, or the error that stopped the batch
+    finished = PyQt5.QtCore.pyqtSignal(object, object)
+
+    def notify(self):
+
+        def callback(future):
+            try:
+                self.finished.emit(future.result(), None)
+            except Exception as errMsg:
+                self.finished.emit(None, errMsg)
+
+        return callback
+
+
 class ConductorSubmitDialog(DeadlineScriptDialog):
 
+    # The data that must be fetched before a job can be submitted
+    REQUIRED_FETCHES = ("instance_types", "projects", "packages")
+
     def __init__(self, deadlineJob, *args, **kwargs):
 
+        deadlineJobs = kwargs.pop("deadlineJobs", None)
+
         super(ConductorSubmitDialog, self).__init__(*args, **kwargs)
 
         self.deadlineJob = deadlineJob
+        self.deadlineJobs = list(deadlineJobs or [deadlineJob])
+        self.submitter = conductor_deadline.submitter.DeadlineJobSubmitter()
 
         self.selectedInstanceType = None
         self.jobTitle = ""
@@ -49,6 +104,7 @@ class ConductorSubmitDialog(DeadlineScriptDialog):
         self.conductorJob = None
         self.cloudProvider = None
 
+        self._startTime = time.time()
         self._buildUI()
 
     def _buildUI(self):
@@ -61,7 +117,7 @@ class ConductorSubmitDialog(DeadlineScriptDialog):
         self.AddControlToGrid("JobOptionsSeparator",
                               "SeparatorControl", "Job", 0, 0, colSpan=2)
 
-        self.AddControlToGrid("NameLabel", "LabelControl",
+        self.jobNameLabel = self.AddControlToGrid("NameLabel", "LabelControl",
                               "Job Name", 1, 0, "The name of your job.", False)
         self.jobNameTextBox = self.AddControlToGrid(
             "NameBox", "TextControl", "[DEADLINE WORKER] {}".format(self.deadlineJob.JobName), 1, 1)
@@ -70,7 +126,7 @@ class ConductorSubmitDialog(DeadlineScriptDialog):
                               "Project", 2, 0, "The Conductor project", False)
         self.projectBox = self.AddControlToGrid(
             "ProjectBox", "ComboControl", "default", 2, 1)
-        self.AddControlToGrid("DependencyLabel", "LabelControl", "Dependency Sidecar",
+        self.dependencyLabel = self.AddControlToGrid("DependencyLabel", "LabelControl", "Dependency Sidecar",
                               3, 0, "JSON file with all the dependencies", False)
         self.dependencyBox = self.AddControlToGrid(
             "DependencyBox", "TextControl", "", 3, 1)
@@ -88,6 +144,29 @@ class ConductorSubmitDialog(DeadlineScriptDialog):
             "InstanceBox", "ComboControl", "", 1, 1)
         self.spotCheckBox = self.AddSelectionControlToGrid(
             "IsSpot", "CheckBoxControl", True, "Spot", 1, 2, "The machine may get preempted")
+
+        # Fleet sizing. 0 means unknown/no limit
+        self.AddControlToGrid("TaskDurationLabel", "LabelControl", "Task Minutes",
+                              2, 0, "Estimated minutes to render one Deadline task (0 launches an instance per task)", False)
+        self.taskDurationBox = self.AddRangeControlToGrid(
+            "TaskDurationBox", "RangeControl", 0, 0, 1440, 1, 1, 2, 1)
+        self.AddControlToGrid("TargetWallClockLabel", "LabelControl", "Target Hours",
+                              3, 0, "How long the job should take (0 for as fast as the boot overhead allows)", False)
+        self.targetWallClockBox = self.AddRangeControlToGrid(
+            "TargetWallClockBox", "RangeControl", 0, 0, 168, 1, 0.5, 3, 1)
+        self.AddControlToGrid("MaxInstancesLabel", "LabelControl", "Max Instances",
+                              4, 0, "Never launch more than this many instances per job (0 for no limit)", False)
+        self.maxInstancesBox = self.AddRangeControlToGrid(
+            "MaxInstancesBox", "RangeControl", 0, 0, 10000, 0, 1, 4, 1)
+        self.poolCheckBox = self.AddSelectionControlToGrid(
+            "UsePool", "CheckBoxControl", False, "Warm Pool", 4, 2,
+            "Run on workers shared with other jobs that use the same packages and instance type")
+        self.fleetPlanLabel = self.AddControlToGrid("FleetPlanLabel", "LabelControl", "",
+                              5, 0, "The number of instances that will be launched", False, colSpan=3)
+
+        for rangeControl in (self.taskDurationBox, self.targetWallClockBox, self.maxInstancesBox):
+            rangeControl.valueChanged.connect(self.updateFleetPlan)
+
         self.EndGrid()
 
         self.AddGrid()
@@ -114,20 +193,103 @@ class ConductorSubmitDialog(DeadlineScriptDialog):
 
         self.EndGrid()
 
+        self._buildJobControls()
+
         # Add control buttons
         self.AddGrid()
         self.AddHorizontalSpacerToGrid("HSpacer", 0, 0)
-        okButton = self.AddControlToGrid(
+        self.okButton = self.AddControlToGrid(
             "OkButton", "ButtonControl", "Submit", 0, 1, expand=False)
-        okButton.clicked.connect(self.onOKButtonClicked)
-        cancelButton = self.AddControlToGrid(
+        self.okButton.clicked.connect(self.onOKButtonClicked)
+        self.okButton.setEnabled(False)
+        self.cancelButton = self.AddControlToGrid(
             "CancelButton", "ButtonControl", "Cancel", 0, 2, expand=False)
-        cancelButton.clicked.connect(self.onCancelButtonClicked)
+        self.cancelButton.clicked.connect(self.onCancelButtonClicked)
         self.EndGrid()
 
-        self.instanceTypes = self.getInstances()
+        # Set the sidecar dependency (if it exists)
+        dependencySidecarFile = self.getDependencySidecarFileFromPath()
+
+        if os.path.exists(dependencySidecarFile):
+            self.dependencyBox.setText(dependencySidecarFile)
+
+        self.updateFleetPlan()
+        self._startFetches()
+
+    def _buildJobControls(self):
+        '''
+        Add any controls that are specific to the Deadline jobs being submitted
+        '''
+        pass
+
+    def _startFetches(self):
+        '''
+        Request the instance types, projects and software packages from
+        Conductor in the background. Each control is populated as its data
+        arrives and the Submit button is enabled once everything is in. A
+        fetch that fails can be retried from its error dialog.
+        '''
+
+        self._fetchNotifier = ConductorFetchNotifier(self)
+        self._fetchNotifier.fetched.connect(self._onFetched)
+        self._pendingFetches = set(self.REQUIRED_FETCHES)
+
+        self._fetches = {"instance_types": self.fetchInstanceTypes,
+                         "projects": ciocore.api_client.request_projects,
+                         "packages": self.fetchPackages}
+
+        self._runFetches(list(self._fetches))
+
+    def _runFetches(self, names):
+
+        fetchExecutor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=len(names))
+
+        for name in names:
+            future = fetchExecutor.submit(self._fetches[name])
+            future.add_done_callback(self._fetchNotifier.notify(name))
+
+        fetchExecutor.shutdown(wait=False)
+
+    def _onFetched(self, name, result, error):
+
+        LOG.debug("Fetched '%s' after %.2fs", name,
+                  time.time() - self._startTime)
 
-        projects = ciocore.api_client.request_projects()
+        if error is not None:
+
+            # The Submit button stays disabled until every fetch is in, so
+            # offer to try again rather than leave the dialog unusable
+            error_dialog = ConductorErrorDialog(error)
+            error_dialog.setStandardButtons(PyQt5.QtWidgets.QMessageBox.Retry | PyQt5.QtWidgets.QMessageBox.Cancel)
+
+            if error_dialog.exec_() == PyQt5.QtWidgets.QMessageBox.Retry:
+                LOG.info("Retrying the '%s' fetch", name)
+                self._runFetches([name])
+
+            return
+
+        if name == "instance_types":
+            self.populateInstanceTypes(*result)
+
+        elif name == "projects":
+            self.populateProjects(result)
+
+        elif name == "packages":
+            self.populatePackages(result)
+
+        self._pendingFetches.discard(name)
+
+        if not self._pendingFetches:
+            self.okButton.setEnabled(True)
+            LOG.info("Submit to Conductor dialog interactive after %.2fs",
+                     time.time() - self._startTime)
+
+    def populateInstanceTypes(self, instanceTypes, cloudProvider):
+
+        self.instanceTypes = instanceTypes
+        self.cloudProvider = cloudProvider
+        self.spotCheckBox.setVisible(not self.isCoreweave(self.cloudProvider))
 
         # Populate the instance Combo box
         for instanceType in self.instanceTypes:
@@ -137,24 +299,32 @@ class ConductorSubmitDialog(DeadlineScriptDialog):
         self.instanceTypeCombo.currentIndexChanged.connect(
             self.onInstanceTypeChanged)
 
+    def populateProjects(self, projects):
+
         # sort alphabetically. may be unicode, so can't use str.lower directly
         for project in sorted(projects, key=lambda x: x.lower()):
             self.projectBox.addItem(project)
 
-        # Set the sidecar dependency (if it exists)
-        dependencySidecarFile = self.getDependencySidecarFileFromPath()
+    def fetchPackages(self):
+        '''
+        Load the software catalog and run the package mapper for the job. This
+        is called from a worker thread so it must not touch any controls.
+        '''
 
-        if os.path.exists(dependencySidecarFile):
-            self.dependencyBox.setText(dependencySidecarFile)
+        software_catalog = conductor_job.catalog.get_catalog()
+        mapping_class = conductor_deadline.package_mapper.DeadlineToConductorPackageMapper.get_mapping_class(
+            self.submitter.snapshot(self.deadlineJob))
+        host_package, plugins = self.submitter.default_packages(self.deadlineJob)
 
-        # Add packages to the controls
-        packages = ciocore.api_client.request_software_packages()
+        return {"worker_names": software_catalog.host_names("deadline"),
+                "host_names": software_catalog.host_names(mapping_class.PRODUCT_NAME),
+                "host": host_package,
+                "plugins": plugins}
+
+    def populatePackages(self, packages):
 
         # Deadline worker
-        deadline_packages = ciocore.package_tree.PackageTree(
-            packages, product="deadline")
-        self.deadlinePackageCombo.insertItems(
-            0, deadline_packages.supported_host_names())
+        self.deadlinePackageCombo.insertItems(0, packages["worker_names"])
 
         if os.environ.get('CONDUCTOR_DEADLINE_WORKER_VERSION'):
             self.deadlinePackageCombo.setCurrentText("deadline {} linux".format(
@@ -164,15 +334,9 @@ class ConductorSubmitDialog(DeadlineScriptDialog):
             os.environ.get('CONDUCTOR_DEADLINE_WORKER_VERSION'))))
 
         # DCC Host
-        product_name = conductor_deadline.package_mapper.DeadlineToConductorPackageMapper.get_mapping_class(
-            self.deadlineJob).PRODUCT_NAME
-        host_packages = ciocore.package_tree.PackageTree(
-            packages, product=product_name)
-        self.dccPackageCombo.insertItems(
-            0, host_packages.supported_host_names())
+        self.dccPackageCombo.insertItems(0, packages["host_names"])
 
-        dcc_host = conductor_deadline.package_mapper.DeadlineToConductorPackageMapper.get_mapping_class(
-            self.deadlineJob).get_host_package(self.deadlineJob)
+        dcc_host = packages["host"]
 
         if dcc_host:
             dcc_package_name = ciocore.package_tree.to_name(dcc_host)
@@ -188,10 +352,8 @@ class ConductorSubmitDialog(DeadlineScriptDialog):
             # DCC Plugins
             self.pluginPackagesCombo.insertItems(0, plugin_package_names)
 
-            plugins = conductor_deadline.package_mapper.DeadlineToConductorPackageMapper.get_mapping_class(
-                self.deadlineJob).get_plugins(self.deadlineJob, dcc_host)
             default_plugin_package_names = [ciocore.package_tree.to_name(
-                plugin_package) for plugin_package in plugins]
+                plugin_package) for plugin_package in packages["plugins"]]
 
             self.SetValue("PluginPackageBox", default_plugin_package_names)
 
@@ -208,7 +370,7 @@ class ConductorSubmitDialog(DeadlineScriptDialog):
 
         else:
             openDir = os.path.dirname(
-                self.deadlineJob.GetJobPluginInfoKeyValue('SceneFile'))
+                self.submitter.snapshot(self.deadlineJob).GetJobPluginInfoKeyValue('SceneFile'))
 
         selectedSidecarFile, _ = PyQt5.QtWidgets.QFileDialog.getOpenFileName(
             self, "Select sidecar dependency file", openDir, "Conductor dependency files (*.cdepends);;JSON files (*.json);;All files (*.*)")
@@ -216,94 +378,78 @@ class ConductorSubmitDialog(DeadlineScriptDialog):
         if selectedSidecarFile:
             self.dependencyBox.setText(selectedSidecarFile)
 
-    def onOKButtonClicked(self):
-
-        try:
-
-            if self.nativeJobCheckBox.isChecked():
-
-                deadline_mapper = conductor_deadline.package_mapper.DeadlineToConductorPackageMapper.get_mapping_class(
-                    self.deadlineJob)
-
-                host_package = deadline_mapper.get_host_package(
-                    self.deadlineJob)
-                renderer_package = deadline_mapper.get_renderer_package(
-                    self.deadlineJob, host_package)
-                self.conductorJob = conductorjob.MayaRenderJob()
-                self.conductorJob.renderer = renderer_package['product']
-                self.conductorJob.scene_path = self.deadlineJob.GetJobPluginInfoKeyValue(
-                    "SceneFile")
-                self.conductorJob.project_path = self.deadlineJob.GetJobPluginInfoKeyValue(
-                    "ProjectPath")
-                self.conductorJob.frames = cioseq.sequence.Sequence.create(
-                    self.deadlineJob.GetJobInfoKeyValue("Frames"))
-                self.conductorJob.render_layer = self.deadlineJob.GetJobPluginInfoKeyValue(
-                    "RenderLayer") or self.conductorJob.render_layer
-                self.conductorJob.chunk_size = 1
-                self.conductorJob.local_upload = False
-
-            else:
-
-                self.conductorJob = conductorjob.DeadlineWorkerJob()
-                self.conductorJob.deadline_proxy_root = os.environ.get(
-                    'CONDUCTOR_DEADLINE_PROXY')
-                self.conductorJob.set_deadline_ssl_certificate(
-                    os.environ.get('CONDUCTOR_DEADLINE_SSL_CERTIFICATE', ""))
-                self.conductorJob.deadline_use_ssl = self.to_bool(
-                    os.environ.get('CONDUCTOR_DEADLINE_SSL_CERTIFICATE', "false"))
-
-                self.conductorJob.deadline_worker_version = self.GetValue("WorkerBox").split(" ")[1]
-                print ("Using Deadline Worker version: {}".format(self.conductorJob.deadline_worker_version))
-                
-                groupName = "conductorautogroup_{}".format(
-                    self.deadlineJob.JobId)
-                groups = list(
-                    Deadline.Scripting.RepositoryUtils.GetGroupNames())
-
-                if groupName in groups:
-                    Deadline.Scripting.RepositoryUtils.DeleteGroup(groupName)
-
-                Deadline.Scripting.RepositoryUtils.AddGroup(groupName)
+    def getSubmissionSettings(self):
+        '''
+        Get the submission settings from the controls
+        '''
 
-                self.deadlineJob.JobGroup = groupName
-                self.conductorJob.deadline_group_name = groupName
+        return conductor_deadline.submitter.SubmissionSettings(
+            job_title=self.jobNameTextBox.text(),
+            project=self.projectBox.currentText(),
+            instance_type=self.selectedInstanceType,
+            preemptible=(not self.isCoreweave(self.cloudProvider)) and self.spotCheckBox.isChecked(),
+            native=self.nativeJobCheckBox.isChecked(),
+            worker_package_name=self.GetValue("WorkerBox"),
+            host_package_name=self.GetValue("PackageBox"),
+            plugin_package_names=list(self.GetValue("PluginPackageBox")),
+            sidecar_path=self.dependencyBox.text(),
+            use_pool=self.poolCheckBox.isChecked(),
+            **self.getFleetSettings())
+
+    def getFleetSettings(self):
+        '''
+        Get the fleet sizing settings from the controls, in seconds
+        '''
 
-                self.deadlineJob.JobPostTaskScript = self.conductorJob.get_post_task_script_path()
-                Deadline.Scripting.RepositoryUtils.SaveJob(self.deadlineJob)
+        return {"task_duration": (float(self.GetValue("TaskDurationBox")) * 60) or None,
+                "target_wall_clock": (float(self.GetValue("TargetWallClockBox")) * 3600) or None,
+                "max_instances": int(self.GetValue("MaxInstancesBox")) or None}
 
-            self.conductorJob.environment['DEADLINE_JOBID'] = self.deadlineJob.JobId
-            self.conductorJob.instance_type = self.selectedInstanceType
-            self.conductorJob.instance_count = self.deadlineJob.TaskCount
-            self.conductorJob.job_title = self.jobNameTextBox.text()
-            self.conductorJob.preemptible = (
-                (not self.isCoreweave(self.cloudProvider)) and self.spotCheckBox.isChecked())
-            self.conductorJob.project = self.projectBox.currentText()
-            self.conductorJob.software_packages = self.getSoftwarePackages()
+    def updateFleetPlan(self, *args):
+        '''
+        Show how many instances will be launched with the current settings
+        '''
 
-            self.conductorJob.upload_paths.append(
-                self.deadlineJob.GetJobPluginInfoKeyValue('SceneFile'))
+        plans = [conductor_job.sizing.plan_fleet(deadlineJob.TaskCount, **self.getFleetSettings())
+                 for deadlineJob in self.deadlineJobs]
 
-            self.conductorJob.output_path = conductor_deadline.package_mapper.DeadlineToConductorPackageMapper.get_output_path(
-                self.deadlineJob)
+        if len(plans) == 1:
+            self.fleetPlanLabel.setText(plans[0].summary())
 
-            dependencySidecarPath = self.dependencyBox.text()
+        else:
+            self.fleetPlanLabel.setText("{} instance(s) in total for {} job(s)".format(
+                sum([plan.instance_count for plan in plans]), len(plans)))
 
-            dependencies = []
+    def onOKButtonClicked(self):
 
-            # If a command is being executed that doesn't require any files, the submission shouldn't
-            # fail
-            if dependencySidecarPath:
-                with open(dependencySidecarPath, 'r') as fh:
-                    dependencies = json.load(fh).get('dependencies')
+        try:
 
-            self.conductorJob.upload_paths.extend(dependencies)
+            settings = self.getSubmissionSettings()
+            self.conductorJob = self.submitter.build_job(self.deadlineJob, settings)
             conductorJobId = self.conductorJob.submit_job()
+            self.submitter.record_conductor_job(self.deadlineJob, self.conductorJob.conductor_job_ids or conductorJobId,
+                                                native=settings.native)
+
+            if conductorJobId is None:
+                message = "The job will run on the workers already in pool {}".format(self.conductorJob.pool_name)
+            elif len(self.conductorJob.conductor_job_ids) > 1:
+                message = "Job has been successfully submitted to Conductor as jobs {}".format(
+                    ", ".join(self.conductorJob.conductor_job_ids))
+            else:
+                message = "Job {} has been successfully submitted to Conductor".format(conductorJobId)
 
             # This script is present on the Deadline worker
             PyQt5.QtWidgets.QMessageBox.information(
-                self, "Job Submitted", "Job {} has been successfully submitted to Conductor".format(conductorJobId))
+                self, "Job Submitted", message)
 
         except Exception as errMsg:
+
+            # The parts of a split job submitted before the failure are
+            # recorded so they're killed with the Deadline job
+            if isinstance(errMsg, conductorjob.PartialSubmissionError):
+                self.submitter.record_conductor_job(self.deadlineJob, errMsg.conductor_job_ids,
+                                                    native=settings.native)
+
             error_dialog = ConductorErrorDialog(errMsg)
             error_dialog.exec_()
             super(ConductorSubmitDialog, self).reject()
@@ -328,10 +474,7 @@ class ConductorSubmitDialog(DeadlineScriptDialog):
 
     def update_plugin_packages(self, dcc_package_name):
 
-        packages = ciocore.api_client.request_software_packages()
-        package_tree = ciocore.package_tree.PackageTree(packages)
-
-        host_package = package_tree.find_by_name(dcc_package_name)
+        host_package = conductor_job.catalog.get_catalog().find_by_name(dcc_package_name)
 
         self.plugin_packages  = {ciocore.package_tree.to_name(
             plugin_package):plugin_package for plugin_package in host_package['children']}
@@ -344,8 +487,9 @@ class ConductorSubmitDialog(DeadlineScriptDialog):
         self.pluginPackagesCombo.insertItems(0, plugin_package_names)
 
         try:
+            jobSnapshot = self.submitter.snapshot(self.deadlineJob)
             plugins = conductor_deadline.package_mapper.DeadlineToConductorPackageMapper.get_mapping_class(
-                self.deadlineJob).get_plugins(self.deadlineJob, host_package)
+                jobSnapshot).get_plugins(jobSnapshot, host_package)
 
         except Exception as errMsg:
             error_dialog = ConductorErrorDialog(errMsg)
@@ -358,67 +502,251 @@ class ConductorSubmitDialog(DeadlineScriptDialog):
 
         self.SetValue("PluginPackageBox", default_plugin_package_names)
 
-    def getInstances(self):
+    @staticmethod
+    def fetchInstanceTypes():
+        '''
+        Get the linux instance types, sorted by cores and memory, and the cloud
+        provider they belong to.
+        '''
 
-        ciocore.data.init()
-        tree_data = ciocore.data.data()["instance_types"]
+        tree_data = ciocore.hardware_set.HardwareSet(
+            conductor_job.catalog.get_instance_types())
 
         instances = [i for i in tree_data.instance_types.values()
                      if i['operating_system'] == 'linux']
         instances = sorted(instances, key=operator.itemgetter(
             "cores", "memory"), reverse=False)
 
-        self.cloudProvider = tree_data.provider
-        self.spotCheckBox.setVisible(not self.isCoreweave(self.cloudProvider))
-
-        return instances
+        return instances, tree_data.provider
 
     def getDependencySidecarFileFromPath(self):
-        scenePath = self.deadlineJob.GetJobPluginInfoKeyValue('SceneFile')
+        scenePath = self.submitter.snapshot(self.deadlineJob).GetJobPluginInfoKeyValue('SceneFile')
         dependencySideCarFile = "{}.cdepends".format(scenePath)
         return dependencySideCarFile
 
-    def getSoftwarePackages(self):
+    @staticmethod
+    def isCoreweave(provider):
+        '''
+        Returns whether the given provider is CoreWeave
+        '''
+
+        return provider == "cw"
 
-        packages = ciocore.api_client.request_software_packages()
-        package_tree = ciocore.package_tree.PackageTree(packages)
 
-        host_package =  package_tree.find_by_name(self.GetValue("PackageBox"))
-        selected_packages = [host_package]
+class ConductorBatchSubmitDialog(ConductorSubmitDialog):
+    '''
+    Submit many Deadline jobs to Conductor with one set of shared settings.
 
-        for plugin_package_name in self.GetValue("PluginPackageBox"):
-            selected_packages.append(self.plugin_packages[plugin_package_name])
+    The Conductor job name and dependency sidecar can be overridden per job in
+    the table. Unless a different DCC is chosen, every job uses the packages
+    the package mapper provides for it.
+    '''
 
-        # The package for the Deadline Worker is explicit
-        self.conductorJob.deadline_worker_package = package_tree.find_by_name(
-            self.GetValue("WorkerBox"))
-        
-        return selected_packages
+    SUBMIT_COLUMN = 0
+    JOB_COLUMN = 1
+    DCC_COLUMN = 2
+    TITLE_COLUMN = 3
+    SIDECAR_COLUMN = 4
+    COLUMN_LABELS = ("Submit", "Deadline Job", "DCC", "Job Name", "Dependency Sidecar")
 
-    @staticmethod
-    def to_bool(value):
-        return value.lower() not in ('0', 'false', 'no')
+    def __init__(self, deadlineJobs, *args, **kwargs):
 
-    @staticmethod
-    def isCoreweave(provider):
+        deadlineJobs = list(deadlineJobs)
+
+        super(ConductorBatchSubmitDialog, self).__init__(
+            deadlineJobs[0], *args, deadlineJobs=deadlineJobs, **kwargs)
+
+        self.packagesOverridden = False
+
+    def _buildJobControls(self):
+
+        self.resize(1000, 600)
+        self.SetTitle("Conductor Submit ({} jobs)".format(len(self.deadlineJobs)))
+
+        # The job name and sidecar are set per job in the table
+        for control in (self.jobNameLabel, self.jobNameTextBox, self.dependencyLabel,
+                        self.dependencyBox, self.dependencyButton):
+            control.setVisible(False)
+
+        self.jobTable = PyQt5.QtWidgets.QTableWidget(
+            len(self.deadlineJobs), len(self.COLUMN_LABELS), self)
+        self.jobTable.setHorizontalHeaderLabels(self.COLUMN_LABELS)
+        self.jobTable.horizontalHeader().setStretchLastSection(True)
+        self.jobTable.verticalHeader().setVisible(False)
+
+        readOnlyFlags = PyQt5.QtCore.Qt.ItemIsEnabled | PyQt5.QtCore.Qt.ItemIsSelectable
+
+        for row, deadlineJob in enumerate(self.deadlineJobs):
+
+            submitItem = PyQt5.QtWidgets.QTableWidgetItem()
+            submitItem.setFlags(readOnlyFlags | PyQt5.QtCore.Qt.ItemIsUserCheckable)
+            submitItem.setCheckState(PyQt5.QtCore.Qt.Checked)
+            self.jobTable.setItem(row, self.SUBMIT_COLUMN, submitItem)
+
+            jobItem = PyQt5.QtWidgets.QTableWidgetItem(
+                "{} ({})".format(deadlineJob.JobName, deadlineJob.JobId))
+            jobItem.setFlags(readOnlyFlags)
+            self.jobTable.setItem(row, self.JOB_COLUMN, jobItem)
+
+            dccItem = PyQt5.QtWidgets.QTableWidgetItem("")
+            dccItem.setFlags(readOnlyFlags)
+            self.jobTable.setItem(row, self.DCC_COLUMN, dccItem)
+
+            self.jobTable.setItem(row, self.TITLE_COLUMN, PyQt5.QtWidgets.QTableWidgetItem(
+                self.submitter.JOB_TITLE_TEMPLATE.format(job_name=deadlineJob.JobName)))
+
+            sidecarPath = "{}.cdepends".format(self.submitter.snapshot(deadlineJob).GetJobPluginInfoKeyValue('SceneFile'))
+            self.jobTable.setItem(row, self.SIDECAR_COLUMN, PyQt5.QtWidgets.QTableWidgetItem(
+                sidecarPath if os.path.exists(sidecarPath) else ""))
+
+        self.jobTable.resizeColumnsToContents()
+        self.layout().addWidget(self.jobTable)
+
+        self.progressBar = PyQt5.QtWidgets.QProgressBar(self)
+        self.progressBar.setVisible(False)
+        self.layout().addWidget(self.progressBar)
+
+    def fetchPackages(self):
+
+        packages = super(ConductorBatchSubmitDialog, self).fetchPackages()
+
+        # The mapping is shared between jobs with the same plugin, version and
+        # renderer so this is cheap once the first job has been mapped.
+        packages["job_hosts"] = []
+
+        for deadlineJob in self.deadlineJobs:
+
+            try:
+                host_package, _ = self.submitter.default_packages(deadlineJob)
+                packages["job_hosts"].append(
+                    ciocore.package_tree.to_name(host_package) if host_package else "")
+
+            except Exception as errMsg:
+                packages["job_hosts"].append("ERROR: {}".format(errMsg))
+
+        return packages
+
+    def populatePackages(self, packages):
+
+        super(ConductorBatchSubmitDialog, self).populatePackages(packages)
+
+        for row, hostName in enumerate(packages["job_hosts"]):
+            self.jobTable.item(row, self.DCC_COLUMN).setText(hostName)
+
+    def onDCCChanged(self):
+
+        # An explicit choice of DCC applies to every job
+        self.packagesOverridden = True
+        super(ConductorBatchSubmitDialog, self).onDCCChanged()
+
+    def getSubmissionSettings(self):
+
+        settings = super(ConductorBatchSubmitDialog, self).getSubmissionSettings()
+
+        if not self.packagesOverridden:
+            settings.host_package_name = None
+            settings.plugin_package_names = None
+
+        return settings
+
+    def onOKButtonClicked(self):
         '''
-        Returns whether the given provider is CoreWeave
+        Submit the checked jobs in the background. Each row shows whether its
+        job was submitted as soon as it's done and the summary is shown once
+        they all are.
         '''
 
-        return provider == "cw"
+        sharedSettings = self.getSubmissionSettings()
+        jobs = []
+
+        for row, deadlineJob in enumerate(self.deadlineJobs):
+
+            if self.jobTable.item(row, self.SUBMIT_COLUMN).checkState() != PyQt5.QtCore.Qt.Checked:
+                continue
+
+            jobs.append((deadlineJob, sharedSettings.copy(
+                job_title=self.jobTable.item(row, self.TITLE_COLUMN).text(),
+                sidecar_path=self.jobTable.item(row, self.SIDECAR_COLUMN).text())))
+
+        # The jobs are being submitted and can't be taken back
+        self.okButton.setEnabled(False)
+        self.cancelButton.setEnabled(False)
+        self.jobTable.setEnabled(False)
+
+        self.progressBar.setRange(0, len(jobs))
+        self.progressBar.setValue(0)
+        self.progressBar.setVisible(True)
+
+        self._batchNotifier = ConductorBatchNotifier(self)
+        self._batchNotifier.submitted.connect(self._onJobSubmitted)
+        self._batchNotifier.finished.connect(self._onBatchSubmitted)
+
+        batchExecutor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        future = batchExecutor.submit(self.submitter.submit_many, jobs,
+                                      on_result=self._batchNotifier.submitted.emit)
+        future.add_done_callback(self._batchNotifier.notify())
+        batchExecutor.shutdown(wait=False)
+
+    def _onJobSubmitted(self, result):
+
+        self.progressBar.setValue(self.progressBar.value() + 1)
+
+        for row, deadlineJob in enumerate(self.deadlineJobs):
+            if deadlineJob.JobId == result.deadline_job_id:
+                self.jobTable.item(row, self.SUBMIT_COLUMN).setText(
+                    "Submitted" if result.succeeded else "FAILED")
+
+    def _onBatchSubmitted(self, results, error):
+
+        if error is not None:
+            LOG.error("Unable to submit the jobs to Conductor: %s", error)
+            error_dialog = ConductorErrorDialog(error)
+            error_dialog.exec_()
+            super(ConductorSubmitDialog, self).reject()
+            return
+
+        summary = []
+        for result in results:
+            if result.succeeded and result.conductor_job_id is None:
+                summary.append("{} ({}): pool {}".format(
+                    result.job_name, result.deadline_job_id, result.pool_name))
+            elif result.succeeded:
+                summary.append("{} ({}): Conductor job {}".format(
+                    result.job_name, result.deadline_job_id, ", ".join(result.conductor_job_ids or [result.conductor_job_id])))
+            else:
+                summary.append("{} ({}): FAILED - {}".format(
+                    result.job_name, result.deadline_job_id, result.error))
+
+        submittedCount = len([result for result in results if result.succeeded])
+
+        summaryDialog = PyQt5.QtWidgets.QMessageBox(self)
+        summaryDialog.setIcon(PyQt5.QtWidgets.QMessageBox.Information if submittedCount == len(results)
+                              else PyQt5.QtWidgets.QMessageBox.Warning)
+        summaryDialog.setWindowTitle("Jobs Submitted")
+        summaryDialog.setText("{} of {} jobs have been submitted to Conductor".format(
+            submittedCount, len(results)))
+        summaryDialog.setDetailedText("\n".join(summary))
+        summaryDialog.exec_()
+
+        super(ConductorSubmitDialog, self).accept()
 
 
 def __main__(*args):
 
-    selectedJobs = Deadline.Scripting.MonitorUtils.GetSelectedJobs()
+    selectedJobs = list(Deadline.Scripting.MonitorUtils.GetSelectedJobs())
 
     try:
 
-        for deadlineJob in selectedJobs:
-
-            dialog = ConductorSubmitDialog(deadlineJob=deadlineJob)
+        if len(selectedJobs) > 1:
+            dialog = ConductorBatchSubmitDialog(deadlineJobs=selectedJobs)
             dialog.ShowDialog(True)
 
+        else:
+            for deadlineJob in selectedJobs:
+
+                dialog = ConductorSubmitDialog(deadlineJob=deadlineJob)
+                dialog.ShowDialog(True)
+
     except Exception as errMsg:
         error_dialog = ConductorErrorDialog(errMsg)
         error_dialog.exec_()
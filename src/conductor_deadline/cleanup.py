@@ -0,0 +1,105 @@
+'''
+Kill the Conductor jobs of a Deadline job once it no longer needs them.
+
+The ids of the Conductor jobs launched for a Deadline job are stored in the
+Deadline job's extra info when it's submitted. When the Deadline job
+finishes, fails, is suspended or is deleted, the ConductorJobCleanup event
+plugin kills all of them in one call so the instances stop straight away
+rather than when their workers notice there's nothing left to do.
+
+Only Deadline jobs submitted in worker mode, which run in their own
+conductorautogroup group, have their Conductor jobs killed. Jobs that ran on
+a warm pool are left alone since the pool's workers are shared with other
+jobs, and a job sent to Conductor natively is only a placeholder for the
+Conductor job that does the actual rendering.
+'''
+
+import logging
+
+LOG = logging.getLogger(__name__)
+
+CONDUCTOR_JOB_IDS_KEY = "ConductorJobIds"
+AUTOGROUP_PREFIX = "conductorautogroup_"
+POOL_GROUP_PREFIX = "conductorpool_"
+
+
+def get_conductor_job_ids(deadline_job):
+    '''
+    Get the ids of the Conductor jobs launched for the Deadline job
+
+    :rtype: list of str
+    '''
+
+    value = deadline_job.GetJobExtraInfoKeyValue(CONDUCTOR_JOB_IDS_KEY) or ""
+    return [job_id for job_id in value.split(",") if job_id]
+
+
+def set_conductor_job_ids(deadline_job, conductor_job_ids):
+    '''
+    Store the ids of the Conductor jobs launched for the Deadline job. The
+    Deadline job must be saved afterwards.
+    '''
+
+    deadline_job.SetJobExtraInfoKeyValue(CONDUCTOR_JOB_IDS_KEY, ",".join([str(job_id) for job_id in conductor_job_ids]))
+
+
+def add_conductor_job_id(deadline_job, conductor_job_id):
+    '''
+    Add a Conductor job id to the ones stored on the Deadline job. The
+    Deadline job must be saved afterwards.
+    '''
+
+    conductor_job_ids = get_conductor_job_ids(deadline_job)
+
+    if str(conductor_job_id) not in conductor_job_ids:
+        conductor_job_ids.append(str(conductor_job_id))
+
+    set_conductor_job_ids(deadline_job, conductor_job_ids)
+
+
+class ConductorJobKiller(object):
+    '''
+    :param kill_jobs: Called with the Conductor job ids to kill. Defaults to
+                      :py:func:`~ciocore.api_client.kill_jobs`
+    :type kill_jobs: callable
+    '''
+
+    def __init__(self, kill_jobs=None):
+
+        if kill_jobs is None:
+            import ciocore.api_client
+            kill_jobs = ciocore.api_client.kill_jobs
+
+        self.kill_jobs = kill_jobs
+
+    def kill_for(self, deadline_job, reason=""):
+        '''
+        Kill the Conductor jobs of the given Deadline job
+
+        :returns: The ids of the Conductor jobs that were killed
+        :rtype: list of str
+        '''
+
+        group_name = deadline_job.JobGroup or ""
+
+        if group_name.startswith(POOL_GROUP_PREFIX):
+            LOG.debug("Deadline job {} ran on pool '{}'. Leaving it running".format(deadline_job.JobId, group_name))
+            return []
+
+        if not group_name.startswith(AUTOGROUP_PREFIX):
+            LOG.debug("Deadline job {} wasn't submitted in worker mode. Leaving its Conductor job(s) running".format(
+                deadline_job.JobId))
+            return []
+
+        conductor_job_ids = get_conductor_job_ids(deadline_job)
+
+        if not conductor_job_ids:
+            return []
+
+        LOG.info("Deadline job {} {}. Killing Conductor job(s) {}".format(deadline_job.JobId,
+                                                                         reason or "is done",
+                                                                         ", ".join(conductor_job_ids)))
+
+        self.kill_jobs(*conductor_job_ids)
+
+        return conductor_job_ids
@@ -0,0 +1,200 @@
+'''
+Submit Deadline jobs to Conductor without the Monitor UI.
+
+Run it through Deadline so the repository is available:
+
+    deadlinecommand -ExecuteScript custom/scripts/Conductor/submit_to_conductor_cli.py <job id> [<job id> ...] [options]
+
+or, from a Python that can import Deadline.Scripting:
+
+    python -m conductor_deadline.cli <job id> [<job id> ...] [options]
+
+The result of every submission is written as JSON to stdout (or --output).
+'''
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+
+import conductor_job.sizing
+
+from . import submitter
+
+LOG = logging.getLogger(__name__)
+
+
+def build_parser():
+
+    parser = argparse.ArgumentParser(prog="conductor_deadline.cli",
+                                     description="Submit Deadline jobs to Conductor")
+
+    parser.add_argument("job_ids", nargs="+", metavar="JOB_ID",
+                        help="The ids of the Deadline jobs to submit")
+    parser.add_argument("--project", default="default",
+                        help="The Conductor project (default: %(default)s)")
+    parser.add_argument("--instance-type", default=os.environ.get("CONDUCTOR_DEADLINE_INSTANCE_TYPE"),
+                        help="The Conductor instance type (default: $CONDUCTOR_DEADLINE_INSTANCE_TYPE)")
+    parser.add_argument("--worker-version", default=os.environ.get("CONDUCTOR_DEADLINE_WORKER_VERSION"),
+                        help="The Deadline Worker version to use on Conductor (default: $CONDUCTOR_DEADLINE_WORKER_VERSION)")
+    parser.add_argument("--spot", dest="preemptible", action="store_true", default=True,
+                        help="Use preemptible instances (default)")
+    parser.add_argument("--no-spot", dest="preemptible", action="store_false",
+                        help="Use on-demand instances")
+    parser.add_argument("--native", action="store_true",
+                        help="Submit a native Conductor job instead of launching Deadline Workers")
+    parser.add_argument("--title",
+                        help="The Conductor job title. {job_name} and {job_id} are replaced by the Deadline job's values")
+    parser.add_argument("--sidecar",
+                        help="Dependency sidecar to use for every job (default: <scene file>.cdepends if it exists)")
+    parser.add_argument("--collapse-threshold", type=int,
+                        help="Upload a whole directory when more than this many of its files are in the sidecar")
+    parser.add_argument("--host-package",
+                        help="The DCC package to use (ex: 'maya-io 2024 SP1 linux'). Defaults to the mapped package")
+    parser.add_argument("--plugin-package", dest="plugin_packages", action="append",
+                        help="A plugin package to use. Can be repeated. Defaults to the mapped packages")
+    parser.add_argument("--task-duration", type=float,
+                        help="The estimated time to render one Deadline task, in seconds. Used to size the number of instances")
+    parser.add_argument("--boot-overhead", type=float,
+                        help="The time an instance takes to start rendering, in seconds (default: $CONDUCTOR_DEADLINE_BOOT_OVERHEAD or {})".format(conductor_job.sizing.DEFAULT_BOOT_OVERHEAD))
+    parser.add_argument("--target-wall-clock", type=float,
+                        help="The time each job should take, in seconds")
+    parser.add_argument("--max-instances", type=int,
+                        help="Never launch more than this many instances per job (default: $CONDUCTOR_DEADLINE_MAX_INSTANCES)")
+    parser.add_argument("--budget", type=float,
+                        help="The maximum number of instance-hours per job. Only used with --task-duration")
+    parser.add_argument("--idle-window", type=float,
+                        help="Seconds a worker stays up once its group has no more work (default: the ConductorWorker event plugin's setting)")
+    parser.add_argument("--pool", dest="use_pool", action="store_true",
+                        help="Use a warm pool of workers shared with jobs that use the same packages and instance type")
+    parser.add_argument("--max-workers", type=int,
+                        help="The maximum number of concurrent submissions (default: $CONDUCTOR_DEADLINE_SUBMIT_WORKERS or {})".format(submitter.DEFAULT_MAX_WORKERS))
+    parser.add_argument("--output",
+                        help="Write the JSON results to this file instead of stdout")
+    parser.add_argument("--verbose", action="store_true",
+                        help="Log debug messages to stderr")
+
+    return parser
+
+
+def get_settings(args):
+
+    if not args.instance_type:
+        raise submitter.SubmissionError("An instance type must be given with --instance-type or $CONDUCTOR_DEADLINE_INSTANCE_TYPE")
+
+    settings = submitter.SubmissionSettings(project=args.project,
+                                            instance_type=args.instance_type,
+                                            preemptible=args.preemptible,
+                                            native=args.native,
+                                            host_package_name=args.host_package,
+                                            plugin_package_names=args.plugin_packages,
+                                            sidecar_path=args.sidecar,
+                                            sidecar_collapse_threshold=args.collapse_threshold,
+                                            task_duration=args.task_duration,
+                                            boot_overhead=args.boot_overhead,
+                                            target_wall_clock=args.target_wall_clock,
+                                            max_instances=args.max_instances,
+                                            budget=args.budget,
+                                            idle_window=args.idle_window,
+                                            use_pool=args.use_pool)
+
+    if args.worker_version:
+        settings.worker_package_name = "deadline {} linux".format(args.worker_version)
+
+    return settings
+
+
+def submit_jobs(args, job_submitter, settings):
+    '''
+    Submit the Deadline jobs given on the command line
+
+    :returns: A result for every job id, in the same order
+    :rtype: list of :py:class:`~conductor_deadline.submitter.SubmissionResult`
+    '''
+
+    jobs = []
+    missing_results = {}
+
+    for index, job_id in enumerate(args.job_ids):
+
+        deadline_job = job_submitter.repository.GetJob(job_id, True)
+
+        if deadline_job is None:
+            result = submitter.SubmissionResult(job_id, None)
+            result.error = submitter.SubmissionError("Unable to find the Deadline job '{}'".format(job_id))
+            missing_results[index] = result
+            continue
+
+        job_settings = settings
+
+        if args.title:
+            job_settings = settings.copy(job_title=args.title.format(job_name=deadline_job.JobName,
+                                                                     job_id=deadline_job.JobId))
+
+        jobs.append((deadline_job, job_settings))
+
+    # Keep the results in the same order as the given job ids
+    results = job_submitter.submit_many(jobs, max_workers=args.max_workers)
+    for index in sorted(missing_results):
+        results.insert(index, missing_results[index])
+
+    return results
+
+
+def main(argv=None, repository=None):
+    '''
+    Submit the Deadline jobs given on the command line and write the results
+    as JSON.
+
+    :returns: 0 if every job was submitted, 1 otherwise
+    :rtype: int
+    '''
+
+    args = build_parser().parse_args(argv)
+
+    logging.basicConfig(stream=sys.stderr, level=logging.DEBUG if args.verbose else logging.INFO)
+
+    start_time = time.time()
+    job_submitter = submitter.DeadlineJobSubmitter(repository=repository)
+
+    try:
+        settings = get_settings(args)
+
+    except submitter.SubmissionError as errMsg:
+        LOG.error(str(errMsg))
+
+        # Every job fails the same way, so the output looks like it would
+        # for any other failure
+        results = [submitter.SubmissionResult(job_id, None) for job_id in args.job_ids]
+
+        for result in results:
+            result.error = errMsg
+
+    else:
+        results = submit_jobs(args, job_submitter, settings)
+
+    submitted_count = len([result for result in results if result.succeeded])
+
+    output = {"submitted": submitted_count,
+              "failed": len(results) - submitted_count,
+              "duration": round(time.time() - start_time, 3),
+              "results": [result.as_dict() for result in results]}
+
+    if args.output:
+        with open(args.output, 'w') as fh:
+            json.dump(output, fh, indent=2)
+
+    else:
+        json.dump(output, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+
+    if submitted_count == len(results):
+        return 0
+
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,244 @@
+'''
+Manage the Deadline groups created for Conductor workers.
+
+Every Deadline job submitted in worker mode gets its own
+conductorautogroup_<job id> group. The group names are listed once and kept
+in a set, groups are only created when they don't exist yet, and the
+collector removes the autogroups of jobs that have completed, failed or been
+deleted.
+
+Jobs sent to a warm pool share a conductorpool_<key> group instead (see
+:py:mod:`~conductor_deadline.pools`). The collector removes a pool's group
+once none of its jobs are live and none of its workers are left.
+
+The collector can be run from cron through Deadline:
+
+    deadlinecommand -ExecuteScript custom/scripts/Conductor/collect_conductor_groups.py [--dry-run]
+
+or, from a Python that can import Deadline.Scripting:
+
+    python -m conductor_deadline.groups [--dry-run]
+'''
+
+import argparse
+import json
+import logging
+import sys
+import threading
+import time
+
+LOG = logging.getLogger(__name__)
+
+AUTOGROUP_PREFIX = "conductorautogroup_"
+POOL_PREFIX = "conductorpool_"
+DEFAULT_CACHE_TTL = 60
+
+# Jobs in these states may still need their group
+LIVE_JOB_STATES = ("Active", "Pending", "Suspended")
+
+
+class GroupManager(object):
+    '''
+    A cached view of the Deadline group names.
+
+    :param repository: The Deadline RepositoryUtils to use. Defaults to
+                       :py:class:`~Deadline.Scripting.RepositoryUtils`
+
+    :param cache_ttl: The number of seconds the group names are cached for
+    :type cache_ttl: float
+    '''
+
+    def __init__(self, repository=None, cache_ttl=DEFAULT_CACHE_TTL):
+
+        if repository is None:
+            import Deadline.Scripting
+            repository = Deadline.Scripting.RepositoryUtils
+
+        self.repository = repository
+        self.cache_ttl = cache_ttl
+
+        self._names = None
+        self._fetched_at = 0
+        self._lock = threading.RLock()
+
+    def names(self):
+        '''
+        Get the names of all the groups
+
+        :rtype: set of str
+        '''
+
+        with self._lock:
+            if self._names is None or time.time() - self._fetched_at > self.cache_ttl:
+                self.refresh()
+
+            return set(self._names)
+
+    def refresh(self):
+
+        with self._lock:
+            self._names = set(self.repository.GetGroupNames())
+            self._fetched_at = time.time()
+
+    def exists(self, group_name):
+        return group_name in self.names()
+
+    def ensure(self, group_name):
+        '''
+        Create the group unless it already exists
+
+        :returns: True if the group was created
+        :rtype: bool
+        '''
+
+        with self._lock:
+            if self.exists(group_name):
+                return False
+
+            self.repository.AddGroup(group_name)
+            self._names.add(group_name)
+
+        return True
+
+    def delete(self, group_names):
+        '''
+        Delete the given groups. Groups that don't exist are ignored.
+
+        :returns: The names of the groups that were deleted
+        :rtype: list of str
+        '''
+
+        with self._lock:
+            existing = self.names()
+            deleted = [group_name for group_name in group_names if group_name in existing]
+
+            for group_name in deleted:
+                self.repository.DeleteGroup(group_name)
+                self._names.discard(group_name)
+
+        return deleted
+
+    def autogroups(self):
+        '''
+        Get the autogroups, keyed by the id of the Deadline job they belong to
+
+        :rtype: dict
+        '''
+
+        return {group_name[len(AUTOGROUP_PREFIX):]: group_name
+                for group_name in self.names() if group_name.startswith(AUTOGROUP_PREFIX)}
+
+    def pool_groups(self):
+        '''
+        Get the groups of the warm pools
+
+        :rtype: list of str
+        '''
+
+        return sorted([group_name for group_name in self.names() if group_name.startswith(POOL_PREFIX)])
+
+
+class AutogroupCollector(object):
+    '''
+    Deletes the autogroups of Deadline jobs that are no longer live (completed,
+    failed or deleted), and the pool groups that have no live jobs and no
+    workers.
+
+    :param manager: The group manager to use
+    :type manager: :py:class:`~GroupManager`
+    '''
+
+    def __init__(self, manager):
+
+        self.manager = manager
+        self.repository = manager.repository
+
+    def live_jobs(self):
+        '''
+        Get the ids of the live jobs and the groups they're in
+
+        :rtype: tuple of (set of str, set of str)
+        '''
+
+        job_ids = set()
+        group_names = set()
+
+        for state in LIVE_JOB_STATES:
+            for deadline_job in self.repository.GetJobsInState(state):
+                job_ids.add(deadline_job.JobId)
+                group_names.add(deadline_job.JobGroup)
+
+        return job_ids, group_names
+
+    def live_job_ids(self):
+        return self.live_jobs()[0]
+
+    def stale_groups(self):
+        '''
+        Get the autogroups whose job is no longer live and the pool groups
+        with no live jobs and no workers
+
+        :rtype: list of str
+        '''
+
+        # List the groups first. A group created after the jobs were listed
+        # could otherwise look stale.
+        autogroups = self.manager.autogroups()
+        pool_groups = self.manager.pool_groups()
+        live_job_ids, live_group_names = self.live_jobs()
+
+        stale = [group_name for job_id, group_name in autogroups.items() if job_id not in live_job_ids]
+
+        for group_name in pool_groups:
+            if group_name not in live_group_names and not self.repository.GetSlaveNamesInGroup(group_name):
+                stale.append(group_name)
+
+        return sorted(stale)
+
+    def collect(self, dry_run=False):
+        '''
+        Delete the stale autogroups.
+
+        :returns: A summary with the groups that were (or would be) deleted
+        :rtype: dict
+        '''
+
+        start_time = time.time()
+
+        self.manager.refresh()
+        stale_groups = self.stale_groups()
+
+        if dry_run:
+            deleted = []
+        else:
+            deleted = self.manager.delete(stale_groups)
+
+        LOG.info("{} {} stale Conductor group(s)".format("Found" if dry_run else "Deleted",
+                                                             len(stale_groups) if dry_run else len(deleted)))
+
+        return {"dry_run": dry_run,
+                "stale": stale_groups,
+                "deleted": deleted,
+                "duration": round(time.time() - start_time, 3)}
+
+
+def main(argv=None, repository=None):
+
+    parser = argparse.ArgumentParser(prog="conductor_deadline.groups",
+                                     description="Delete the Conductor groups of finished Deadline jobs and idle pools")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="Only list the groups that would be deleted")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(stream=sys.stderr, level=logging.INFO)
+
+    result = AutogroupCollector(GroupManager(repository=repository)).collect(dry_run=args.dry_run)
+
+    json.dump(result, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,7 +1,51 @@
 import logging
+import threading
+
+from . import snapshot
 
 LOG = logging.getLogger(__name__)
-LOG.setLevel(10)
+
+
+class ResolutionPlan(object):
+    '''
+    The packages and output path resolved for a Deadline job.
+
+    :param host_package: The host package. Can be None if the job doesn't need
+                         any packages.
+    :type host_package: dict
+
+    :param plugins: The plugin packages
+    :type plugins: list of dict
+
+    :param output_path: The output path of the job
+    :type output_path: str
+
+    :param cached: Whether the packages came from the plan cache
+    :type cached: bool
+    '''
+
+    def __init__(self, host_package, plugins, output_path=None, cached=False):
+
+        self.host_package = host_package
+        self.plugins = list(plugins)
+        self.output_path = output_path
+        self.cached = cached
+
+    @property
+    def packages(self):
+        '''
+        All the packages, the host package first
+        '''
+
+        if self.host_package:
+            return [self.host_package] + self.plugins
+
+        return list(self.plugins)
+
+    def __repr__(self):
+        return "ResolutionPlan({}, {} plugin(s), cached={})".format(
+            (self.host_package or {}).get('package'), len(self.plugins), self.cached)
+
 
 class DeadlineToConductorPackageMapper(object):
     '''
@@ -23,6 +67,12 @@ class DeadlineToConductorPackageMapper(object):
     '''
 
     PLUGIN_TO_PACKAGE_MAPPING = None
+
+    # Resolved (host package, plugins) keyed by (plugin, version, renderer,
+    # catalog revision)
+    _PLANS = {}
+    _PLAN_STATS = {"hits": 0, "misses": 0}
+    _PLAN_LOCK = threading.Lock()
     
     @classmethod
     def clear_mapping(cls):
@@ -32,7 +82,88 @@ class DeadlineToConductorPackageMapper(object):
         
         from . import plugin_mappers
         cls.PLUGIN_TO_PACKAGE_MAPPING = None
+        cls.clear_plans()
         reload(plugin_mappers)
+
+    @classmethod
+    def clear_plans(cls):
+        '''
+        Forget all the cached resolution plans and reset the counters
+        '''
+
+        with cls._PLAN_LOCK:
+            cls._PLANS.clear()
+            cls._PLAN_STATS.update(hits=0, misses=0)
+
+    @classmethod
+    def plan_stats(cls):
+        '''
+        Get the resolution plan cache counters
+
+        :rtype: dict
+        '''
+
+        with cls._PLAN_LOCK:
+            return dict(cls._PLAN_STATS, size=len(cls._PLANS))
+
+    @classmethod
+    def get_plan_key(cls, deadline_job):
+        '''
+        Get the key the resolution plan of the given job is cached under. Jobs
+        with the same key resolve to the same packages.
+
+        :rtype: tuple
+        '''
+
+        import conductor_job.catalog
+
+        return (deadline_job.GetJobInfoKeyValue("Plugin"),
+                deadline_job.GetJobPluginInfoKeyValue("Version"),
+                deadline_job.GetJobPluginInfoKeyValue("Renderer"),
+                conductor_job.catalog.get_catalog().get_revision())
+
+    @classmethod
+    def resolve(cls, deadline_job):
+        '''
+        Get the host package, plugins and output path for the given Deadline
+        job in one call.
+
+        The packages come from the mapping class's map(), host package first.
+        They only depend on the job's plugin, version and renderer so they're
+        resolved once per catalog revision and re-used for every job that
+        shares them.
+
+        :param deadline_job: The Deadline job to map, or a snapshot of it
+        :type deadline_job: :py:class:`~Deadline.Jobs.Job` or :py:class:`~conductor_deadline.snapshot.DeadlineJobSnapshot`
+
+        :rtype: :py:class:`~ResolutionPlan`
+        '''
+
+        deadline_job = snapshot.DeadlineJobSnapshot.of(deadline_job)
+        mapping_class = cls.get_mapping_class(deadline_job)
+        key = cls.get_plan_key(deadline_job)
+
+        with cls._PLAN_LOCK:
+            resolved = cls._PLANS.get(key)
+            cls._PLAN_STATS["hits" if resolved else "misses"] += 1
+
+        cached = resolved is not None
+
+        if not cached:
+            packages = list(mapping_class.map(deadline_job) or [])
+            resolved = ((packages[0] or None) if packages else None, tuple(packages[1:]))
+
+            with cls._PLAN_LOCK:
+
+                # Plans for an older catalog can't be hit again
+                for stale_key in [k for k in cls._PLANS if k[-1] != key[-1]]:
+                    del cls._PLANS[stale_key]
+
+                cls._PLANS[key] = resolved
+
+        return ResolutionPlan(resolved[0], resolved[1],
+                              output_path=mapping_class.get_output_path(deadline_job),
+                              cached=cached)
         
     @classmethod
     def get_mapping_class(cls, deadline_job):
@@ -49,7 +180,7 @@ class DeadlineToConductorPackageMapper(object):
         if map_class is None:
             raise Exception("No class has been registered for the Deadline plugin '{}'".format(plugin_name))
         
-        LOG.debug("Using mapping class '{}' for plugin '{}'".format(map_class, plugin_name))
+        LOG.debug("Using mapping class '%s' for plugin '%s'", map_class, plugin_name)
         
         return map_class         
             
@@ -58,16 +189,14 @@ class DeadlineToConductorPackageMapper(object):
         '''
         Get the corresponding Conductor package ID's for the given Deadline job
         
-        :param deaadline_job: The Deadline job to map
-        :type deadline_job: :py:class:`~Deadline.Jobs.Job`
+        :param deaadline_job: The Deadline job to map, or a snapshot of it
+        :type deadline_job: :py:class:`~Deadline.Jobs.Job` or :py:class:`~conductor_deadline.snapshot.DeadlineJobSnapshot`
         
         :returns: A list of package ID's
         :rtype: list of str
         '''
         
-        packages = cls.get_mapping_class(deadline_job).map(deadline_job)
-
-        return packages
+        return cls.resolve(deadline_job).packages
 
     @classmethod
     def register(cls, mapping_class):
@@ -96,4 +225,5 @@ class DeadlineToConductorPackageMapper(object):
         '''
         Get the output path for the given deadline job
         '''
+        deadline_job = snapshot.DeadlineJobSnapshot.of(deadline_job)
         return cls.get_mapping_class(deadline_job).get_output_path(deadline_job)
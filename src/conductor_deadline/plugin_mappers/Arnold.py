@@ -1,11 +1,10 @@
 import logging
 
-import ciocore
+import conductor_job.catalog
 
 from . import deadline_plugin_mapper
 
 LOG = logging.getLogger(__name__)
-LOG.setLevel(10)
 
 
 class ArnoldMapper(deadline_plugin_mapper.DeadlinePluginMapper):
@@ -30,16 +29,13 @@ class ArnoldMapper(deadline_plugin_mapper.DeadlinePluginMapper):
         Get the corresponding Conductor package for the primary (aka host) package.
         
         :param deaadline_job: The Deadline job to map
-        :type deadline_job: :py:class:`~Deadline.Jobs.Job`
+        :type deadline_job: :py:class:`~conductor_deadline.snapshot.DeadlineJobSnapshot`
         
         :returns: A package
         :rtype: dict
         '''
         
-        ciocore.data.init(product="all")
-        software_tree_data = ciocore.data.data()["software"]
-        
-        package = software_tree_data.find_by_name("{} {} linux".format(cls.PRODUCT_NAME, cls.MTOA_PRODUCT_VERSION))
+        package = conductor_job.catalog.get_catalog().find_by_name("{} {} linux".format(cls.PRODUCT_NAME, cls.MTOA_PRODUCT_VERSION))
             
         if not package:
             raise deadline_plugin_mapper.NoPackagesFoundError("Unable to locate packages for job '{}'".format(deadline_job))             
@@ -52,20 +48,13 @@ class ArnoldMapper(deadline_plugin_mapper.DeadlinePluginMapper):
         Get the corresponding Conductor packages for the given Deadline job
         
         :param deaadline_job: The Deadline job to map
-        :type deadline_job: :py:class:`~Deadline.Jobs.Job`
+        :type deadline_job: :py:class:`~conductor_deadline.snapshot.DeadlineJobSnapshot`
         
         :returns: A list of package's
         :rtype: list of dict
         '''           
 
-        ciocore.data.init(product="all")
-        software_tree_data = ciocore.data.data()["software"]
-        
-        package = software_tree_data.find_by_name("{} {} linux".format(cls.PRODUCT_NAME, cls.MTOA_PRODUCT_VERSION))
-            
-        if not package:
-            raise deadline_plugin_mapper.NoPackagesFoundError("Unable to locate packages for job '{}'".format(deadline_job))             
-
+        # get_host_package() raises if the package can't be found
         return [cls.get_host_package(deadline_job)]
     
     @classmethod
@@ -1,12 +1,12 @@
 import logging
 import sys
 
-import ciocore.data
+import conductor_job.catalog
+import conductor_job.versions
 
 from . import  deadline_plugin_mapper
 
 LOG = logging.getLogger(__name__)
-LOG.setLevel(10)
 
 
 class MayaCmdMapper(deadline_plugin_mapper.DeadlinePluginMapper):
@@ -30,6 +30,10 @@ class MayaCmdMapper(deadline_plugin_mapper.DeadlinePluginMapper):
                            "2022": "maya-io 2022.SP3 linux",
                            "2023": "maya-io 2023.SP3 linux",
                            "2024": "maya-io 2024 SP1 linux"} # There's an error with the arnold package for 2019 that needs to be resolved
+    
+    # The version can be 'latest', an exact version (ex: '5.3' is 5.3.0.0),
+    # a wildcard (ex: '5.3.*' picks the newest 5.3.x.x) or a range
+    # (ex: '>=5.3,<6'). See conductor_job.versions
     render_version_map = {'arnold': {'plugin': 'arnold-maya', 'version': 'latest'},
                           'vray': {'plugin': 'v-ray-maya', 'version': 'latest'},
                           'renderman': {'plugin': 'renderman-maya', 'version': 'latest'},
@@ -41,22 +45,19 @@ class MayaCmdMapper(deadline_plugin_mapper.DeadlinePluginMapper):
         Get the corresponding Conductor package for the primary (aka host) package.
         
         :param deaadline_job: The Deadline job to map
-        :type deadline_job: :py:class:`~Deadline.Jobs.Job`
+        :type deadline_job: :py:class:`~conductor_deadline.snapshot.DeadlineJobSnapshot`
         
         :returns: A package
         :rtype: dict
         '''
         
-        ciocore.data.init(product="all")
-        software_tree_data = ciocore.data.data()["software"]
-        
         # Get details from the Deadline Job plugin
         major_version = deadline_job.GetJobPluginInfoKeyValue("Version").lower()
         
         product_version = cls.product_version_map[major_version]
 
         # Get the package id for Maya
-        host_package = software_tree_data.find_by_name(product_version)
+        host_package = conductor_job.catalog.get_catalog().find_by_name(product_version)
         
         return host_package
     
@@ -66,7 +67,7 @@ class MayaCmdMapper(deadline_plugin_mapper.DeadlinePluginMapper):
         Get the corresponding Conductor packages for the renderer used in the job
         
         :param deaadline_job: The Deadline job to map
-        :type deadline_job: :py:class:`~Deadline.Jobs.Job`
+        :type deadline_job: :py:class:`~conductor_deadline.snapshot.DeadlineJobSnapshot`
         
         :returns: The renderer package
         :rtype: dict
@@ -75,7 +76,7 @@ class MayaCmdMapper(deadline_plugin_mapper.DeadlinePluginMapper):
         render_name = deadline_job.GetJobPluginInfoKeyValue("Renderer").lower()
         
         # The render plugin must be explicit
-        if render_name == "File":
+        if render_name == "file":
             raise Exception("Integration doesn't support 'File', please explicitly choose a renderer in the MayCmd plugin properties")
         
         if render_name not in cls.render_version_map:
@@ -85,36 +86,21 @@ class MayaCmdMapper(deadline_plugin_mapper.DeadlinePluginMapper):
         # Map the info from the Deadline Job plugin to a Conductor friendly name
         conductor_render_plugin = cls.render_version_map[render_name]
 
-        render_plugins = {}        
-        for plugin in host_package['children']:
+        render_plugin_versions = conductor_job.catalog.get_catalog().plugin_versions(host_package, conductor_render_plugin['plugin'])
 
-            if plugin['product'] == conductor_render_plugin['plugin']:
-                
-                plugin_version = "{major_version}.{minor_version}.{release_version}.{build_version}".format(**plugin)
-                render_plugins[plugin_version] = plugin        
-                   
-        render_plugin_versions = list(render_plugins.keys())
-        render_plugin_versions.sort()                
-        
-        # Always use the latest version of the render plugin
-        if conductor_render_plugin['version'] == 'latest':
+        if not render_plugin_versions:
+            raise deadline_plugin_mapper.NoPackagesFoundError("Unable to find any versions of {} for {} {}-{} available on Conductor".format( render_name.capitalize(), 
+                                                                                                            host_package['product'].capitalize(),
+                                                                                                            host_package['major_version'],
+                                                                                                            host_package['minor_version']  ))
 
-            if not render_plugin_versions:
-                print( host_package)
-                raise deadline_plugin_mapper.NoPackagesFoundError("Unable to find any versions of {} for {} {}-{} available on Conductor".format( render_name.capitalize(), 
-                                                                                                                host_package['product'].capitalize(),
-                                                                                                                host_package['major_version'],
-                                                                                                                host_package['minor_version']  ))
+        render_plugin = render_plugin_versions.find(conductor_render_plugin.get('version', conductor_job.versions.LATEST))
 
-            render_plugin = render_plugins[render_plugin_versions[-1]]
-            
-        else:
-            if conductor_render_plugin['version'] not in render_plugin_versions:
-                raise Exception("Unable to find {plugin} version '{verision}' in Conductor packages".format(conductor_render_plugin))
-            
-            render_plugin = render_plugins[conductor_render_plugin['version']]
+        if render_plugin is None:
+            raise deadline_plugin_mapper.NoPackagesFoundError("Unable to find {} version '{}' in Conductor packages (available: {})".format(
+                conductor_render_plugin['plugin'], conductor_render_plugin['version'], ", ".join(render_plugin_versions.versions)))
             
-        LOG.debug("Using render: {} {}".format(conductor_render_plugin, render_plugin['package']))
+        LOG.debug("Using render: %s %s", conductor_render_plugin, render_plugin['package'])
         
         return render_plugin
 
@@ -124,7 +110,7 @@ class MayaCmdMapper(deadline_plugin_mapper.DeadlinePluginMapper):
         Get the corresponding Conductor packages for plugins
         
         :param deaadline_job: The Deadline job to map
-        :type deadline_job: :py:class:`~Deadline.Jobs.Job`
+        :type deadline_job: :py:class:`~conductor_deadline.snapshot.DeadlineJobSnapshot`
         
         :returns: A list of packages
         :rtype: list of dict
@@ -138,31 +124,24 @@ class MayaCmdMapper(deadline_plugin_mapper.DeadlinePluginMapper):
         Get the corresponding Conductor packages for the given Deadline job
         
         :param deaadline_job: The Deadline job to map
-        :type deadline_job: :py:class:`~Deadline.Jobs.Job`
+        :type deadline_job: :py:class:`~conductor_deadline.snapshot.DeadlineJobSnapshot`
         
         :returns: A list of packages
         :rtype: list of dict
         '''
         
-        ciocore.data.init(product="all")
-        software_tree_data = ciocore.data.data()["software"]
         packages = []
         
-        # Get details from the Deadline Job plugin
-        major_version = deadline_job.GetJobPluginInfoKeyValue("Version").lower()        
-        product_version = cls.product_version_map[major_version]
-
         # Get the package id for Maya
         host_package = cls.get_host_package(deadline_job)
         
-        LOG.debug("Found host package: {}".format(host_package))
-        packages.append(host_package)
-        LOG.debug("Plugins: {}".format(software_tree_data.supported_plugins(product_version)))        
-        
-        packages.extend(cls.get_plugins(deadline_job, host_package))
+        LOG.debug("Found host package: %s", host_package and host_package['package'])
         
-        if not packages:
+        if not host_package:
             raise deadline_plugin_mapper.NoPackagesFoundError("Unable to locate packages for job '{}'".format(deadline_job))        
+        
+        packages.append(host_package)
+        packages.extend(cls.get_plugins(deadline_job, host_package))
 
         return packages
     
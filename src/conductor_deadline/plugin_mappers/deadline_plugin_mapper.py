@@ -6,6 +6,11 @@ class DeadlinePluginMapper(object):
     Base class for mapping a specific Deadline Job Plugin to a set of Conductor
     packages. It's the responsiblity of the child classes to handle plugins,
     specific versions, etc... 
+    
+    The deadline_job passed to every method is a
+    :py:class:`~conductor_deadline.snapshot.DeadlineJobSnapshot`, which has
+    the same GetJobInfoKeyValue()/GetJobPluginInfoKeyValue() methods as a
+    Deadline job, so mappers can be run without Deadline.
     '''
 
     DEADLINE_PLUGINS = []
@@ -17,7 +22,7 @@ class DeadlinePluginMapper(object):
         Get the corresponding Conductor package for the primary (aka host) package.
         
         :param deaadline_job: The Deadline job to map
-        :type deadline_job: :py:class:`~Deadline.Jobs.Job`
+        :type deadline_job: :py:class:`~conductor_deadline.snapshot.DeadlineJobSnapshot`
         
         :returns: A package
         :rtype: dict
@@ -31,7 +36,7 @@ class DeadlinePluginMapper(object):
         Get the corresponding Conductor packages for plugins
         
         :param deaadline_job: The Deadline job to map
-        :type deadline_job: :py:class:`~Deadline.Jobs.Job`
+        :type deadline_job: :py:class:`~conductor_deadline.snapshot.DeadlineJobSnapshot`
         
         :returns: A list of packages
         :rtype: list of dict
@@ -42,13 +47,22 @@ class DeadlinePluginMapper(object):
     @classmethod
     def map(cls, deadline_job):
         '''
-        Get the corresponding Conductor packages for the given Deadline job
+        Get the corresponding Conductor packages for the given Deadline job,
+        the host package first. This is what
+        :py:meth:`~conductor_deadline.package_mapper.DeadlineToConductorPackageMapper.resolve`
+        calls, so a mapper can override it or only get_host_package() and
+        get_plugins().
         
         :param deaadline_job: The Deadline job to map
-        :type deadline_job: :py:class:`~Deadline.Jobs.Job`
+        :type deadline_job: :py:class:`~conductor_deadline.snapshot.DeadlineJobSnapshot`
         
         :returns: A list of packages
         :rtype: list of dict
         '''           
         
-        raise NotImplementedError    
\ No newline at end of file
+        host_package = cls.get_host_package(deadline_job)
+        
+        if not host_package:
+            return []
+        
+        return [host_package] + list(cls.get_plugins(deadline_job, host_package))    
\ No newline at end of file
@@ -0,0 +1,176 @@
+'''
+Warm pools of Deadline Workers on Conductor that are shared between jobs.
+
+A pool is identified by everything that makes one worker interchangeable with
+another: the software packages, the Deadline Worker version, the instance
+type and whether it's preemptible. Every pool has its own Deadline group
+(conductorpool_<key>). A Deadline job submitted to a pool is put in the
+pool's group so the workers already running pick it up, and new instances
+are only launched for the part of the queue the running workers can't
+cover.
+
+Launches are recorded in the extra info of the Deadline job they were made
+for, so every submitter, whatever process it runs in, sees the instances
+that are on their way.
+
+Pools scale down on their own: a worker is stopped once its group has had no
+work for the idle window (see :py:mod:`~conductor_deadline.shutdown`). Pool
+workers use a longer idle window so they stay warm between jobs. Groups with
+no live jobs and no workers left are deleted by the group collector (see
+:py:mod:`~conductor_deadline.groups`).
+'''
+
+import hashlib
+import logging
+import os
+import time
+
+LOG = logging.getLogger(__name__)
+
+GROUP_NAME_TEMPLATE = "conductorpool_{key}"
+DEFAULT_IDLE_WINDOW = 15 * 60
+DEFAULT_LAUNCH_TIMEOUT = 20 * 60
+
+# The Deadline job extra info keys a launch is recorded under
+POOL_SIZE_KEY = "ConductorPoolSize"
+LAUNCHED_AT_KEY = "ConductorPoolLaunchedAt"
+
+# Jobs in these states may still be waiting for the instances launched for them
+_LAUNCHING_JOB_STATES = ("Active", "Pending", "Suspended")
+
+# Worker states that can't pick up work
+_UNAVAILABLE_STATES = ("Offline", "Stalled", "Unknown")
+
+
+def pool_key(software_packages, worker_version, instance_type, preemptible):
+    '''
+    Get the key of the pool for the given configuration. The order of the
+    packages doesn't matter.
+
+    :rtype: str
+    '''
+
+    package_ids = sorted([package['package_id'] for package in software_packages if package])
+    key = "|".join(package_ids + [str(worker_version), str(instance_type), str(bool(preemptible))])
+
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:12]
+
+
+def get_group_name(key):
+    return GROUP_NAME_TEMPLATE.format(key=key)
+
+
+class WorkerPoolManager(object):
+    '''
+    Keeps track of the workers in each pool.
+
+    Instances launched for a pool are counted as part of it until their
+    workers show up in Deadline (or launch_timeout seconds have passed), so
+    submitting several jobs in a row, from one or several machines, doesn't
+    launch instances for the same work twice. Each launch is stored on the
+    Deadline job it was made for (see record_launch()).
+
+    :param repository: The Deadline RepositoryUtils to use. Defaults to
+                       :py:class:`~Deadline.Scripting.RepositoryUtils`
+    '''
+
+    def __init__(self, repository=None, launch_timeout=DEFAULT_LAUNCH_TIMEOUT):
+
+        if repository is None:
+            import Deadline.Scripting
+            repository = Deadline.Scripting.RepositoryUtils
+
+        self.repository = repository
+        self.launch_timeout = launch_timeout
+
+    def available_workers(self, group_name):
+        '''
+        Get the names of the workers in the pool's group that can pick up work
+        '''
+
+        workers = []
+
+        for worker_name in self.repository.GetSlaveNamesInGroup(group_name):
+            worker_info = self.repository.GetSlaveInfo(worker_name, True)
+
+            if worker_info is not None and worker_info.SlaveState not in _UNAVAILABLE_STATES:
+                workers.append(worker_name)
+
+        return workers
+
+    def pool_size(self, group_name):
+        '''
+        Get the number of workers in the pool, including instances that have
+        been launched recently but haven't registered with Deadline yet.
+        '''
+
+        return max(len(self.available_workers(group_name)), self.expected_size(group_name))
+
+    def expected_size(self, group_name):
+        '''
+        Get the size the pool was expected to reach by its most recent
+        launches that may still be on their way
+
+        :rtype: int
+        '''
+
+        expected = 0
+
+        for state in _LAUNCHING_JOB_STATES:
+            for deadline_job in self.repository.GetJobsInState(state):
+
+                if deadline_job.JobGroup != group_name:
+                    continue
+
+                try:
+                    pool_size = int(deadline_job.GetJobExtraInfoKeyValue(POOL_SIZE_KEY) or 0)
+                    launched_at = float(deadline_job.GetJobExtraInfoKeyValue(LAUNCHED_AT_KEY) or 0)
+
+                except ValueError:
+                    continue
+
+                # Instances that haven't shown up by now aren't coming
+                if time.time() - launched_at <= self.launch_timeout:
+                    expected = max(expected, pool_size)
+
+        return expected
+
+    def instances_needed(self, group_name, wanted):
+        '''
+        Get how many more instances to launch so the pool has the wanted
+        number of workers.
+
+        :param group_name: The pool's group
+        :type group_name: str
+
+        :param wanted: The number of workers the pool should have
+        :type wanted: int
+
+        :rtype: int
+        '''
+
+        needed = max(0, wanted - self.pool_size(group_name))
+
+        LOG.debug("Pool '{}' needs {} more instance(s) to have {}".format(group_name, needed, wanted))
+
+        return needed
+
+    def record_launch(self, group_name, instance_count, deadline_job):
+        '''
+        Record that instances have been launched for the pool. The size the
+        pool should reach is stored in the Deadline job's extra info and the
+        job is saved.
+
+        :param deadline_job: The Deadline job the instances were launched for
+        :type deadline_job: :py:class:`~Deadline.Jobs.Job`
+        '''
+
+        pool_size = self.pool_size(group_name)
+
+        deadline_job.SetJobExtraInfoKeyValue(POOL_SIZE_KEY, str(pool_size + instance_count))
+        deadline_job.SetJobExtraInfoKeyValue(LAUNCHED_AT_KEY, str(time.time()))
+        self.repository.SaveJob(deadline_job)
+
+    @staticmethod
+    def get_idle_window():
+        return float(os.environ.get("CONDUCTOR_DEADLINE_POOL_IDLE_WINDOW", DEFAULT_IDLE_WINDOW))
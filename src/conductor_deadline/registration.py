@@ -0,0 +1,148 @@
+'''
+Register a Deadline Worker that has started on a Conductor instance.
+
+Hundreds of workers can start at the same time for one job, so registration
+only writes to the repository when something actually needs to change: the
+worker settings are saved once, and only if they differ, and the job is only
+saved by the first worker that finds it isn't in the right group.
+
+Every worker gets a unique name derived from the Conductor task it's running
+in (falling back to the host name) so workers of the same job don't collide.
+'''
+
+import logging
+import os
+import re
+import socket
+
+LOG = logging.getLogger(__name__)
+
+WORKER_NAME_TEMPLATE = "Conductor_{job_id}_{instance}"
+AUTOGROUP_TEMPLATE = "conductorautogroup_{job_id}"
+
+# Environment variables that identify the instance, in order of preference
+INSTANCE_ENVIRONMENT_VARIABLES = ("CONDUCTOR_TASK_ID", "CONDUCTOR_INSTANCE_ID")
+
+_INVALID_NAME_CHARACTERS = re.compile(r'[^A-Za-z0-9_\-]')
+
+
+def get_instance_id(environ=None):
+    '''
+    Get an id that's unique to this instance. The Conductor task id is
+    zero-padded so that worker names sort in task order.
+
+    :rtype: str
+    '''
+
+    if environ is None:
+        environ = os.environ
+
+    for variable in INSTANCE_ENVIRONMENT_VARIABLES:
+        value = environ.get(variable)
+
+        if value:
+            if value.isdigit():
+                return value.zfill(3)
+
+            return _INVALID_NAME_CHARACTERS.sub("_", value)
+
+    return _INVALID_NAME_CHARACTERS.sub("_", socket.gethostname().split(".")[0])
+
+
+def get_worker_name(job_id, environ=None):
+    '''
+    Get the unique name of the worker running on this instance
+    '''
+
+    return WORKER_NAME_TEMPLATE.format(job_id=job_id, instance=get_instance_id(environ))
+
+
+class WorkerRegistrar(object):
+    '''
+    :param repository: The Deadline RepositoryUtils to use. Defaults to
+                       :py:class:`~Deadline.Scripting.RepositoryUtils`
+    '''
+
+    def __init__(self, repository=None):
+
+        if repository is None:
+            import Deadline.Scripting
+            repository = Deadline.Scripting.RepositoryUtils
+
+        self.repository = repository
+
+        # Jobs that have already been checked by this process
+        self._checked_job_ids = set()
+
+    def register(self, worker_name, job_id, group_name=None, environ=None):
+        '''
+        Name the worker, describe it and put it in its group. If the group is
+        the job's autogroup, make sure the job is in it too.
+
+        :param worker_name: The current name of the worker
+        :type worker_name: str
+
+        :param job_id: The Deadline job the instance was launched for
+        :type job_id: str
+
+        :param group_name: The group to put the worker in. Defaults to the
+                           job's autogroup
+        :type group_name: str
+
+        :returns: The number of repository writes that were made
+        :rtype: int
+        '''
+
+        group_name = group_name or AUTOGROUP_TEMPLATE.format(job_id=job_id)
+
+        writes = self._update_worker(worker_name, job_id, group_name, environ)
+
+        if group_name == AUTOGROUP_TEMPLATE.format(job_id=job_id):
+            writes += self._update_job(job_id, group_name)
+
+        return writes
+
+    def _update_worker(self, worker_name, job_id, group_name, environ):
+
+        worker_settings = self.repository.GetSlaveSettings(worker_name, True)
+
+        expected = {"SlaveName": get_worker_name(job_id, environ),
+                    "SlaveDescription": "Conductor instance for job {}".format(job_id)}
+
+        changed = [name for name, value in expected.items() if getattr(worker_settings, name) != value]
+        groups_changed = list(worker_settings.SlaveGroups) != [group_name]
+
+        if not changed and not groups_changed:
+            LOG.debug("Worker '{}' is already registered".format(worker_name))
+            return 0
+
+        for name in changed:
+            setattr(worker_settings, name, expected[name])
+
+        if groups_changed:
+            worker_settings.SetSlaveGroups([group_name])
+
+        self.repository.SaveSlaveSettings(worker_settings)
+
+        LOG.info("Registered worker '{}' in group '{}'".format(expected["SlaveName"], group_name))
+
+        return 1
+
+    def _update_job(self, job_id, group_name):
+
+        if job_id in self._checked_job_ids:
+            return 0
+
+        self._checked_job_ids.add(job_id)
+
+        deadline_job = self.repository.GetJob(job_id, True)
+
+        if deadline_job is None or deadline_job.JobGroup == group_name:
+            return 0
+
+        deadline_job.JobGroup = group_name
+        self.repository.SaveJob(deadline_job)
+
+        LOG.info("Moved job {} to group '{}'".format(job_id, group_name))
+
+        return 1
@@ -0,0 +1,447 @@
+'''
+Decide when a Deadline Worker running on Conductor should shut down.
+
+A worker launched for a Deadline job belongs to that job's
+conductorautogroup group. Rather than shutting the instance down after every
+task, the worker is kept alive for as long as there are queued or pending
+tasks in its group and is only shut down once it has been idle, with nothing
+left to pick up, for the idle window.
+
+Deadline tears its event listeners down between events, so the check can't
+live in the ConductorWorker event plugin. When the worker starts, the plugin
+launches a separate watch process (see start_watch_process()) that runs
+watch_worker() until the worker is stopped.
+
+The backlog of every group is read from a single pass over the active jobs,
+which is shared by everything in the process for poll interval seconds (see
+get_group_backlogs()). A worker of a single job's autogroup only reads that
+job.
+'''
+
+import ctypes
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+LOG = logging.getLogger(__name__)
+
+DEFAULT_IDLE_WINDOW = 5 * 60
+DEFAULT_POLL_INTERVAL = 30
+
+# Worker states in which the worker has work
+BUSY_STATES = ("Rendering", "StartingJob")
+
+# Worker states in which there's nothing left to watch
+STOPPED_STATES = ("Offline", "Stopped")
+
+# Windows API constants, see _is_running()
+_PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+_ERROR_ACCESS_DENIED = 5
+_STILL_ACTIVE = 259
+
+_BACKLOGS = {}
+_BACKLOGS_LOCK = threading.Lock()
+
+
+def get_group_backlogs(repository, max_age=DEFAULT_POLL_INTERVAL, states=("Active",)):
+    '''
+    Get the number of queued and pending tasks of every group, from a single
+    pass over the jobs in the given states. The result is shared by every
+    caller in the process until it's older than max_age.
+
+    :param repository: The Deadline RepositoryUtils to use
+    :param max_age: How old, in seconds, a previous result can be. 0 always
+                    reads the jobs again
+    :type max_age: float
+
+    :returns: The backlog of each group that has one
+    :rtype: dict of str: int
+    '''
+
+    key = (id(repository), tuple(states))
+
+    with _BACKLOGS_LOCK:
+
+        read_at, backlogs = _BACKLOGS.get(key, (None, None))
+
+        if read_at is None or time.time() - read_at >= max_age:
+
+            backlogs = {}
+
+            for state in states:
+                for deadline_job in repository.GetJobsInState(state):
+
+                    tasks = deadline_job.JobQueuedTasks + deadline_job.JobPendingTasks
+
+                    if tasks:
+                        backlogs[deadline_job.JobGroup] = backlogs.get(deadline_job.JobGroup, 0) + tasks
+
+            _BACKLOGS[key] = (time.time(), backlogs)
+
+        return backlogs
+
+
+class DrainPolicy(object):
+    '''
+    :param idle_window: The number of seconds a worker must be idle, with no
+                        work left in its group, before it's shut down.
+                        Defaults to $CONDUCTOR_DEADLINE_IDLE_WINDOW or 300
+    :type idle_window: float
+
+    :param repository: The Deadline RepositoryUtils to use. Defaults to
+                       :py:class:`~Deadline.Scripting.RepositoryUtils`
+
+    :param job_ids: The jobs of the group, if they're known (ex: the only job
+                    of an autogroup). Only these jobs are read, rather than
+                    every active job
+    :type job_ids: list of str
+
+    :param max_age: How old, in seconds, a shared backlog can be (see
+                    get_group_backlogs()). Defaults to the poll interval
+    :type max_age: float
+    '''
+
+    # Job states that can still have tasks to render
+    ACTIVE_STATES = ("Active",)
+
+    def __init__(self, idle_window=None, repository=None, job_ids=None, max_age=DEFAULT_POLL_INTERVAL):
+
+        if idle_window is None:
+            idle_window = float(os.environ.get("CONDUCTOR_DEADLINE_IDLE_WINDOW", DEFAULT_IDLE_WINDOW))
+
+        if repository is None:
+            import Deadline.Scripting
+            repository = Deadline.Scripting.RepositoryUtils
+
+        self.idle_window = idle_window
+        self.repository = repository
+        self.job_ids = job_ids
+        self.max_age = max_age
+
+    def group_backlog(self, group_name):
+        '''
+        Get the number of tasks in the group that a worker could still pick up.
+
+        :param group_name: The Deadline group
+        :type group_name: str
+
+        :returns: The number of queued and pending tasks
+        :rtype: int
+        '''
+
+        if self.job_ids is None:
+            return get_group_backlogs(self.repository, self.max_age, self.ACTIVE_STATES).get(group_name, 0)
+
+        backlog = 0
+
+        for job_id in self.job_ids:
+            deadline_job = self.repository.GetJob(job_id, True)
+
+            if deadline_job is not None and deadline_job.JobStatus in self.ACTIVE_STATES and deadline_job.JobGroup == group_name:
+                backlog += deadline_job.JobQueuedTasks + deadline_job.JobPendingTasks
+
+        return backlog
+
+    def should_shutdown(self, group_name, idle_since, now=None):
+        '''
+        Whether a worker that has been idle since idle_since should shut down.
+
+        :param group_name: The worker's group
+        :type group_name: str
+
+        :param idle_since: When the worker went idle (seconds since the epoch)
+        :type idle_since: float
+
+        :rtype: bool
+        '''
+
+        if now is None:
+            now = time.time()
+
+        if now - idle_since < self.idle_window:
+            return False
+
+        backlog = self.group_backlog(group_name)
+
+        if backlog:
+            LOG.debug("Keeping the worker alive: {} task(s) left in group '{}'".format(backlog, group_name))
+            return False
+
+        return True
+
+
+class DrainMonitor(object):
+    '''
+    Watches an idle worker and calls shutdown once the policy says so.
+
+    While the group still has work the idle timer is restarted, since the
+    worker is only idle because that work isn't available to it yet (ex:
+    pending on a dependency).
+
+    :param group_name: The worker's group
+    :type group_name: str
+
+    :param policy: The policy that decides when to shut down
+    :type policy: :py:class:`~DrainPolicy`
+
+    :param shutdown: Called, without arguments, to shut the worker down
+    :type shutdown: callable
+
+    :param poll_interval: The number of seconds between checks. Defaults to
+                          $CONDUCTOR_DEADLINE_DRAIN_POLL_INTERVAL or 30
+    :type poll_interval: float
+
+    :param is_busy: Called, without arguments, to find out whether the worker
+                    is working. A busy worker isn't idle, whatever its group's
+                    backlog
+    :type is_busy: callable
+    '''
+
+    def __init__(self, group_name, policy, shutdown, poll_interval=None, is_busy=None):
+
+        if poll_interval is None:
+            poll_interval = float(os.environ.get("CONDUCTOR_DEADLINE_DRAIN_POLL_INTERVAL", DEFAULT_POLL_INTERVAL))
+
+        self.group_name = group_name
+        self.policy = policy
+        self.shutdown = shutdown
+        self.poll_interval = poll_interval
+        self.is_busy = is_busy
+
+        self.idle_since = None
+
+        # Every run gets its own event, so a run that's been cancelled but
+        # hasn't woken up yet can't be confused with a new one
+        self._cancelled = threading.Event()
+        self._thread = None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive() and not self._cancelled.is_set()
+
+    def start(self):
+        '''
+        Start watching in a thread. Does nothing if already watching. A
+        cancelled monitor can be started again.
+        '''
+
+        if self.running:
+            return
+
+        self._cancelled = threading.Event()
+        self.idle_since = time.time()
+
+        self._thread = threading.Thread(target=self._run, args=(self._cancelled,), name="ConductorDrainMonitor")
+        self._thread.daemon = True
+        self._thread.start()
+
+    def run(self):
+        '''
+        Watch in the current thread until the worker is shut down or the
+        monitor is cancelled
+        '''
+
+        self._cancelled = threading.Event()
+        self.idle_since = time.time()
+
+        self._run(self._cancelled)
+
+    def cancel(self):
+        '''
+        Stop watching, ex: because the worker has picked up a task
+        '''
+
+        self._cancelled.set()
+
+    def check(self, now=None):
+        '''
+        Check once whether the worker should shut down, calling shutdown if so.
+
+        :returns: True if shutdown was called
+        :rtype: bool
+        '''
+
+        if now is None:
+            now = time.time()
+
+        if self.is_busy is not None and self.is_busy():
+            self.idle_since = now
+            return False
+
+        if self.policy.should_shutdown(self.group_name, self.idle_since, now):
+            LOG.info("Group '{}' has been drained for {:.0f}s. Shutting down".format(self.group_name,
+                                                                                   now - self.idle_since))
+            self.shutdown()
+            return True
+
+        # There's still work in the group, so the worker isn't really idle
+        if now - self.idle_since >= self.policy.idle_window:
+            self.idle_since = now
+
+        return False
+
+    def _run(self, cancelled):
+
+        while not cancelled.wait(self.poll_interval):
+
+            try:
+                if self.check():
+                    return
+
+            except Exception:
+                LOG.exception("Unable to check group '{}'".format(self.group_name))
+
+
+def get_worker_state(repository, worker_name):
+    '''
+    Get the state of a worker (ex: 'Idle', 'Rendering'), or None if it's
+    unknown
+    '''
+
+    worker_info = repository.GetSlaveInfo(worker_name, True)
+
+    return worker_info.SlaveState if worker_info is not None else None
+
+
+def watch_worker(worker_name, group_name, repository=None, idle_window=None, poll_interval=None, job_ids=None,
+                 deadline_command="deadlinecommand"):
+    '''
+    Watch a worker until its group has been drained for the idle window, then
+    stop it. Returns once the worker has been stopped or has stopped on its
+    own.
+
+    This blocks, so it's meant to run in a process of its own (see
+    start_watch_process()) that outlives Deadline's event listeners.
+
+    :param job_ids: The jobs of the group, if they're known. See :py:class:`~DrainPolicy`
+    :type job_ids: list of str
+    '''
+
+    if repository is None:
+        import Deadline.Scripting
+        repository = Deadline.Scripting.RepositoryUtils
+
+    monitor = None
+
+    def _is_busy():
+
+        state = get_worker_state(repository, worker_name)
+
+        if state in STOPPED_STATES:
+            LOG.info("Worker '{}' is {}. No longer watching it".format(worker_name, state.lower()))
+            monitor.cancel()
+
+        return state in BUSY_STATES
+
+    policy = DrainPolicy(idle_window=idle_window, repository=repository, job_ids=job_ids,
+                         max_age=poll_interval or DEFAULT_POLL_INTERVAL)
+    monitor = DrainMonitor(group_name, policy, lambda: stop_worker(worker_name, deadline_command),
+                           poll_interval=poll_interval, is_busy=_is_busy)
+
+    LOG.info("Watching worker '{}'. It's stopped once group '{}' has had no work for {:.0f}s".format(
+        worker_name, group_name, policy.idle_window))
+
+    monitor.run()
+
+
+def start_watch_process(script_path, worker_name, job_id, group_name, idle_window, poll_interval,
+                        deadline_command="deadlinecommand"):
+    '''
+    Start watch_worker() in a process of its own, through the script at
+    script_path run by deadlinecommand -ExecuteScript. Nothing is started if
+    the worker is already being watched.
+
+    :returns: The id of the watch process
+    :rtype: int
+    '''
+
+    pid_path = os.path.join(tempfile.gettempdir(), "conductor_drain_{}.pid".format(worker_name))
+
+    if os.path.exists(pid_path):
+
+        with open(pid_path, 'r') as fh:
+            pid = fh.read().strip()
+
+        if pid.isdigit() and _is_running(int(pid)):
+            LOG.debug("Worker '{}' is already watched by process {}".format(worker_name, pid))
+            return int(pid)
+
+    log_path = os.path.join(tempfile.gettempdir(), "conductor_drain_{}.log".format(worker_name))
+
+    with open(log_path, 'a') as log:
+        process = subprocess.Popen([deadline_command, "-ExecuteScript", script_path, worker_name, job_id, group_name,
+                                    str(idle_window), str(poll_interval)],
+                                   stdin=subprocess.DEVNULL, stdout=log, stderr=subprocess.STDOUT,
+                                   close_fds=True, **_get_detach_options())
+
+    with open(pid_path, 'w') as fh:
+        fh.write(str(process.pid))
+
+    return process.pid
+
+
+def _get_detach_options():
+    '''
+    Popen options that let the process outlive the one that started it
+    '''
+
+    if sys.platform == "win32":
+        return {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP | subprocess.DETACHED_PROCESS}
+
+    return {"start_new_session": True}
+
+
+def _is_running(pid):
+
+    # os.kill() terminates the process on Windows rather than checking it
+    if sys.platform == "win32":
+        return _is_running_on_windows(pid)
+
+    try:
+        os.kill(pid, 0)
+
+    except OSError:
+        return False
+
+    return True
+
+
+def _is_running_on_windows(pid):
+
+    kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+    handle = kernel32.OpenProcess(_PROCESS_QUERY_LIMITED_INFORMATION, False, pid)
+
+    # The process may exist but belong to another user
+    if not handle:
+        return ctypes.get_last_error() == _ERROR_ACCESS_DENIED
+
+    try:
+        exit_code = ctypes.c_ulong()
+
+        if not kernel32.GetExitCodeProcess(handle, ctypes.byref(exit_code)):
+            return False
+
+        return exit_code.value == _STILL_ACTIVE
+
+    finally:
+        kernel32.CloseHandle(handle)
+
+
+def stop_worker(worker_name, deadline_command="deadlinecommand"):
+    '''
+    Stop the Deadline Worker. On Conductor, the instance is released once the
+    Worker exits. $CONDUCTOR_DEADLINE_SHUTDOWN_COMMAND, if set, is run instead.
+    '''
+
+    shutdown_command = os.environ.get("CONDUCTOR_DEADLINE_SHUTDOWN_COMMAND")
+
+    if shutdown_command:
+        LOG.info("Running shutdown command: {}".format(shutdown_command))
+        subprocess.call(shutdown_command, shell=True)
+
+    else:
+        subprocess.call([deadline_command, "-RemoteControl", worker_name, "StopSlave"])
@@ -0,0 +1,148 @@
+'''
+A plain-Python copy of a Deadline job.
+
+Every call to GetJobInfoKeyValue()/GetJobPluginInfoKeyValue() on a Deadline
+job crosses into Deadline's .NET scripting layer. A snapshot reads every key
+once and then answers from a dict. It has the same read methods as a
+Deadline job, so the package mappers can be given either, and it can be
+saved to and loaded from JSON so the mappers can be run without Deadline.
+'''
+
+import json
+
+# The job attributes copied into the snapshot
+JOB_ATTRIBUTES = ("JobId", "JobName", "JobGroup", "JobPool", "JobPlugin", "JobUserName", "JobStatus",
+                  "TaskCount", "JobQueuedTasks", "JobPendingTasks", "JobRenderingTasks", "JobCompletedTasks",
+                  "JobFailedTasks", "JobFrames", "JobPriority")
+
+
+class DeadlineJobSnapshot(object):
+    '''
+    :param job_info: The job info keys and values
+    :type job_info: dict
+
+    :param plugin_info: The plugin info keys and values
+    :type plugin_info: dict
+
+    :param extra_info: The extra info keys and values
+    :type extra_info: dict
+
+    :param attributes: Job attributes (ex: JobId, TaskCount)
+    :type attributes: dict
+    '''
+
+    VERSION = 1
+
+    def __init__(self, job_info=None, plugin_info=None, extra_info=None, attributes=None):
+
+        self.job_info = dict(job_info or {})
+        self.plugin_info = dict(plugin_info or {})
+        self.extra_info = dict(extra_info or {})
+        self.attributes = dict(attributes or {})
+
+    @classmethod
+    def from_job(cls, deadline_job):
+        '''
+        Read everything from a Deadline job
+
+        :param deadline_job: The Deadline job
+        :type deadline_job: :py:class:`~Deadline.Jobs.Job`
+
+        :rtype: :py:class:`~DeadlineJobSnapshot`
+        '''
+
+        job_info = {key: deadline_job.GetJobInfoKeyValue(key) for key in deadline_job.GetJobInfoKeys()}
+        plugin_info = {key: deadline_job.GetJobPluginInfoKeyValue(key) for key in deadline_job.GetJobPluginInfoKeys()}
+        extra_info = {key: deadline_job.GetJobExtraInfoKeyValue(key) for key in deadline_job.GetJobExtraInfoKeys()}
+
+        attributes = {}
+        for name in JOB_ATTRIBUTES:
+
+            try:
+                value = getattr(deadline_job, name)
+
+            except AttributeError:
+                continue
+
+            # Keep the values JSON friendly (some are .NET types)
+            if not isinstance(value, (int, float, bool, type(None))):
+                value = str(value)
+
+            attributes[name] = value
+
+        return cls(job_info, plugin_info, extra_info, attributes)
+
+    @classmethod
+    def of(cls, deadline_job):
+        '''
+        Get a snapshot of the given job. A snapshot is returned as is.
+
+        :rtype: :py:class:`~DeadlineJobSnapshot`
+        '''
+
+        if isinstance(deadline_job, cls):
+            return deadline_job
+
+        return cls.from_job(deadline_job)
+
+    def GetJobInfoKeyValue(self, key):
+        return self.job_info.get(key, "")
+
+    def GetJobPluginInfoKeyValue(self, key):
+        return self.plugin_info.get(key, "")
+
+    def GetJobExtraInfoKeyValue(self, key):
+        return self.extra_info.get(key, "")
+
+    def GetJobInfoKeys(self):
+        return list(self.job_info)
+
+    def GetJobPluginInfoKeys(self):
+        return list(self.plugin_info)
+
+    def GetJobExtraInfoKeys(self):
+        return list(self.extra_info)
+
+    def __getattr__(self, name):
+
+        # Only called for attributes that aren't found normally
+        attributes = self.__dict__.get('attributes', {})
+
+        if name in attributes:
+            return attributes[name]
+
+        raise AttributeError("'{}' object has no attribute '{}'".format(type(self).__name__, name))
+
+    def as_dict(self):
+
+        return {"version": self.VERSION,
+                "job_info": self.job_info,
+                "plugin_info": self.plugin_info,
+                "extra_info": self.extra_info,
+                "attributes": self.attributes}
+
+    @classmethod
+    def from_dict(cls, data):
+
+        return cls(data.get('job_info'), data.get('plugin_info'), data.get('extra_info'), data.get('attributes'))
+
+    def to_json(self, **kwargs):
+        return json.dumps(self.as_dict(), **kwargs)
+
+    @classmethod
+    def from_json(cls, text):
+        return cls.from_dict(json.loads(text))
+
+    def save(self, path):
+
+        with open(path, 'w') as fh:
+            json.dump(self.as_dict(), fh, indent=2)
+
+    @classmethod
+    def load(cls, path):
+
+        with open(path, 'r') as fh:
+            return cls.from_dict(json.load(fh))
+
+    def __repr__(self):
+        return "DeadlineJobSnapshot({}, {})".format(self.attributes.get('JobId'), self.job_info.get('Plugin'))
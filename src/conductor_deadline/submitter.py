@@ -0,0 +1,573 @@
+import concurrent.futures
+import logging
+import os
+import time
+
+import ciocore.package_tree
+import cioseq.sequence
+
+import conductor_job
+import conductor_job.catalog
+import conductor_job.sidecar
+import conductor_job.telemetry
+
+from . import cleanup
+from . import groups
+from . import package_mapper
+from . import pools
+from . import shutdown
+from . import snapshot
+
+LOG = logging.getLogger(__name__)
+
+DEFAULT_MAX_WORKERS = 4
+
+
+class SubmissionError(Exception):
+    pass
+
+
+class SubmissionSettings(object):
+    '''
+    The options used to turn a Deadline job into a Conductor job.
+
+    Attributes left as None fall back to what the package mapper provides for
+    the Deadline job (host/plugin packages) or to a default derived from the
+    Deadline job (title, dependency sidecar).
+    '''
+
+    def __init__(self, **kwargs):
+
+        self.job_title = None
+        self.project = "default"
+        self.instance_type = None
+        self.preemptible = True
+        self.native = False
+        self.worker_package_name = None
+        self.host_package_name = None
+        self.plugin_package_names = None
+        self.sidecar_path = None
+        self.sidecar_collapse_threshold = None
+
+        # Fleet sizing for Deadline Worker jobs (see conductor_job.sizing).
+        # Durations are in seconds and budget is in instance-hours
+        self.task_duration = None
+        self.boot_overhead = None
+        self.target_wall_clock = None
+        self.max_instances = None
+        self.budget = None
+
+        # Seconds a worker stays up once its group has no more work. None
+        # uses the ConductorWorker event plugin's setting
+        self.idle_window = None
+
+        # Submit Deadline Worker jobs to a warm pool shared with other jobs
+        # that use the same packages and instance type (see
+        # conductor_deadline.pools)
+        self.use_pool = False
+
+        for name, value in kwargs.items():
+
+            if not hasattr(self, name):
+                raise TypeError("Unknown submission setting '{}'".format(name))
+
+            setattr(self, name, value)
+
+    def copy(self, **kwargs):
+        '''
+        Get a copy of these settings with the given values overridden
+        '''
+
+        settings = dict(vars(self))
+        settings.update(kwargs)
+
+        return SubmissionSettings(**settings)
+
+
+class SubmissionResult(object):
+    '''
+    The outcome of submitting a single Deadline job to Conductor
+    '''
+
+    def __init__(self, deadline_job_id, job_name):
+
+        self.deadline_job_id = deadline_job_id
+        self.job_name = job_name
+        self.conductor_job_id = None
+
+        # Every Conductor job submitted, including the parts of a split job
+        # that were submitted before a failure
+        self.conductor_job_ids = []
+        self.error = None
+        self.duration = 0.0
+        self.fleet_plan = None
+        self.pool_name = None
+
+        # How long each phase of the submission took (see conductor_job.telemetry)
+        self.telemetry = None
+
+    @property
+    def succeeded(self):
+
+        if self.error is not None:
+            return False
+
+        # A job sent to a pool that already has enough workers doesn't need a
+        # Conductor job
+        return self.conductor_job_id is not None or self.pool_name is not None
+
+    def as_dict(self):
+
+        return {"deadline_job_id": self.deadline_job_id,
+                "job_name": self.job_name,
+                "conductor_job_id": self.conductor_job_id,
+                "conductor_job_ids": self.conductor_job_ids,
+                "succeeded": self.succeeded,
+                "error": str(self.error) if self.error is not None else None,
+                "duration": round(self.duration, 3),
+                "fleet_plan": self.fleet_plan.as_dict() if self.fleet_plan is not None else None,
+                "pool_name": self.pool_name,
+                "telemetry": self.telemetry}
+
+
+class DeadlineJobSubmitter(object):
+    '''
+    Converts Deadline jobs into Conductor jobs and submits them.
+
+    One submitter can be used for many Deadline jobs. The result of the package
+    mapper is shared between Deadline jobs that use the same plugin, version
+    and renderer and the Deadline group names are only listed once.
+
+    :param repository: The Deadline RepositoryUtils to use. Defaults to
+                       :py:class:`~Deadline.Scripting.RepositoryUtils`
+    '''
+
+    GROUP_NAME_TEMPLATE = "conductorautogroup_{job_id}"
+    JOB_TITLE_TEMPLATE = "[DEADLINE WORKER] {job_name}"
+
+    def __init__(self, repository=None):
+
+        if repository is None:
+            import Deadline.Scripting
+            repository = Deadline.Scripting.RepositoryUtils
+
+        self.repository = repository
+
+        self._snapshots = {}
+        self.groups = groups.GroupManager(repository=self.repository)
+        self._pool_manager = None
+
+    @property
+    def pool_manager(self):
+
+        if self._pool_manager is None:
+            self._pool_manager = pools.WorkerPoolManager(repository=self.repository)
+
+        return self._pool_manager
+
+    def snapshot(self, deadline_job):
+        '''
+        Get a snapshot of the given Deadline job. The job is only read once
+        per submitter.
+
+        :rtype: :py:class:`~conductor_deadline.snapshot.DeadlineJobSnapshot`
+        '''
+
+        if isinstance(deadline_job, snapshot.DeadlineJobSnapshot):
+            return deadline_job
+
+        if deadline_job.JobId not in self._snapshots:
+            self._snapshots[deadline_job.JobId] = snapshot.DeadlineJobSnapshot.from_job(deadline_job)
+
+        return self._snapshots[deadline_job.JobId]
+
+    def default_packages(self, deadline_job):
+        '''
+        Get the host and plugin packages the package mapper provides for the
+        given Deadline job.
+
+        :returns: The host package and a list of plugin packages
+        :rtype: tuple of (dict, list of dict)
+        '''
+
+        plan = package_mapper.DeadlineToConductorPackageMapper.resolve(self.snapshot(deadline_job))
+        return plan.host_package, plan.plugins
+
+    def get_software_packages(self, deadline_job, settings):
+        '''
+        Get the host and plugin packages for the given Deadline job, honouring
+        any packages explicitly chosen in the settings.
+
+        :returns: A list of packages, the host package first
+        :rtype: list of dict
+        '''
+
+        software_catalog = conductor_job.catalog.get_catalog()
+        host_package, plugins = self.default_packages(deadline_job)
+
+        if settings.host_package_name:
+            host_package = software_catalog.find_by_name(settings.host_package_name)
+
+            if host_package is None:
+                raise SubmissionError("Unable to find the package '{}' in Conductor".format(settings.host_package_name))
+
+        if settings.plugin_package_names and not host_package:
+            raise SubmissionError("Plugins can't be used without a host package")
+
+        if settings.plugin_package_names is not None:
+            plugin_packages = {ciocore.package_tree.to_name(plugin_package): plugin_package
+                               for plugin_package in software_catalog.children(host_package)}
+            plugins = []
+
+            for plugin_package_name in settings.plugin_package_names:
+
+                if plugin_package_name not in plugin_packages:
+                    raise SubmissionError("The package '{}' is not available for '{}'".format(plugin_package_name,
+                                                                                              ciocore.package_tree.to_name(host_package)))
+
+                plugins.append(plugin_packages[plugin_package_name])
+
+        if not host_package:
+            return list(plugins)
+
+        return [host_package] + list(plugins)
+
+    def get_sidecar_path(self, deadline_job, settings):
+        '''
+        Get the dependency sidecar for the given Deadline job. Unless one has
+        been given in the settings, a <scene file>.cdepends next to the scene
+        file is used if it exists.
+        '''
+
+        if settings.sidecar_path is not None:
+            return settings.sidecar_path
+
+        sidecar_path = "{}.cdepends".format(self.snapshot(deadline_job).GetJobPluginInfoKeyValue('SceneFile'))
+
+        if os.path.exists(sidecar_path):
+            return sidecar_path
+
+        return ""
+
+    @staticmethod
+    def load_sidecar(sidecar_path, collapse_threshold=None):
+        '''
+        Get the de-duplicated list of dependencies from a Conductor dependency
+        sidecar file
+        '''
+
+        return conductor_job.sidecar.load_dependencies(sidecar_path, collapse_threshold=collapse_threshold)
+
+    def ensure_group(self, group_name):
+        '''
+        Create the Deadline group with the given name unless it already exists
+        '''
+
+        self.groups.ensure(group_name)
+
+    def build_job(self, deadline_job, settings):
+        '''
+        Create the Conductor job for the given Deadline job.
+
+        For worker jobs this also prepares the Deadline job (group and post-task
+        script) so it's picked up by the Conductor instances.
+
+        :param deadline_job: The Deadline job to submit
+        :type deadline_job: :py:class:`~Deadline.Jobs.Job`
+
+        :param settings: The submission settings
+        :type settings: :py:class:`~SubmissionSettings`
+
+        :returns: The Conductor job, ready to be submitted
+        :rtype: :py:class:`~conductor_job.Job`
+        '''
+
+        job_telemetry = conductor_job.telemetry.SubmissionTelemetry()
+
+        # Everything is read from the snapshot. The Deadline job itself is
+        # only used to change the group.
+        job_snapshot = self.snapshot(deadline_job)
+        job_telemetry.info['deadline_job_id'] = job_snapshot.JobId
+
+        # Loading the catalog is timed on its own, rather than as part of
+        # whichever mapping happens to load it first
+        with job_telemetry.phase("catalog"):
+            conductor_job.catalog.get_catalog().get_revision()
+
+        with job_telemetry.phase("mapping"):
+            plan = package_mapper.DeadlineToConductorPackageMapper.resolve(job_snapshot)
+            software_packages = self.get_software_packages(job_snapshot, settings)
+
+        job_telemetry.info['plan_cached'] = plan.cached
+        scene_file = job_snapshot.GetJobPluginInfoKeyValue('SceneFile')
+
+        if settings.native:
+
+            if not plan.plugins:
+                raise SubmissionError("Native submission needs a renderer package but none was found for job '{}'".format(job_snapshot.JobId))
+
+            # The Maya mapper's only plugin is the renderer
+            renderer_package = plan.plugins[0]
+
+            conductor_render_job = conductor_job.MayaRenderJob(scene_path=scene_file,
+                                                               project_path=job_snapshot.GetJobPluginInfoKeyValue("ProjectPath"))
+            conductor_render_job.renderer = renderer_package['product']
+            conductor_render_job.frames = cioseq.sequence.Sequence.create(job_snapshot.GetJobInfoKeyValue("Frames"))
+            conductor_render_job.render_layer = job_snapshot.GetJobPluginInfoKeyValue("RenderLayer") or conductor_render_job.render_layer
+            conductor_render_job.chunk_size = 1
+            conductor_render_job.local_upload = False
+
+            new_job = conductor_render_job
+
+        else:
+
+            worker_job = conductor_job.DeadlineWorkerJob()
+            worker_job.deadline_proxy_root = os.environ.get('CONDUCTOR_DEADLINE_PROXY')
+            worker_job.set_deadline_ssl_certificate(os.environ.get('CONDUCTOR_DEADLINE_SSL_CERTIFICATE', ""))
+            worker_job.deadline_use_ssl = self.to_bool(os.environ.get('CONDUCTOR_DEADLINE_SSL_CERTIFICATE', "false"))
+
+            if settings.worker_package_name:
+                worker_job.deadline_worker_version = settings.worker_package_name.split(" ")[1]
+
+                # The package for the Deadline Worker is explicit
+                worker_job.deadline_worker_package = conductor_job.catalog.get_catalog().find_by_name(settings.worker_package_name)
+
+            LOG.info("Using Deadline Worker version: {}".format(worker_job.deadline_worker_version))
+
+            worker_job.idle_window = settings.idle_window
+
+            if settings.use_pool:
+                group_name = pools.get_group_name(pools.pool_key(software_packages,
+                                                                 worker_job.deadline_worker_version,
+                                                                 settings.instance_type,
+                                                                 settings.preemptible))
+                self.ensure_group(group_name)
+                worker_job.pool_name = group_name
+
+                if worker_job.idle_window is None:
+                    worker_job.idle_window = pools.WorkerPoolManager.get_idle_window()
+
+            else:
+                group_name = self.GROUP_NAME_TEMPLATE.format(job_id=job_snapshot.JobId)
+                self.ensure_group(group_name)
+
+            deadline_job.JobGroup = group_name
+            worker_job.deadline_group_name = group_name
+
+            # Workers aren't shut down after each task. The ConductorWorker
+            # event plugin shuts them down once the group has been drained.
+            self.repository.SaveJob(deadline_job)
+
+            new_job = worker_job
+
+        new_job.environment['DEADLINE_JOBID'] = job_snapshot.JobId
+        new_job.instance_type = settings.instance_type
+
+        if settings.native:
+            new_job.instance_count = job_snapshot.TaskCount
+
+        else:
+            task_count = job_snapshot.TaskCount
+
+            # A pool is sized for everything queued in its group, this job
+            # included
+            if new_job.pool_name:
+                backlog = shutdown.DrainPolicy(idle_window=0, repository=self.repository, max_age=0).group_backlog(new_job.pool_name)
+                task_count = max(task_count, backlog)
+
+            new_job.plan_fleet(task_count,
+                               task_duration=settings.task_duration,
+                               boot_overhead=settings.boot_overhead,
+                               target_wall_clock=settings.target_wall_clock,
+                               max_instances=settings.max_instances,
+                               budget=settings.budget)
+
+            if new_job.pool_name:
+                new_job.instance_count = self.pool_manager.instances_needed(new_job.pool_name,
+                                                                            new_job.instance_count)
+                self.pool_manager.record_launch(new_job.pool_name, new_job.instance_count, deadline_job)
+
+                LOG.info("Launching {} instance(s) for pool '{}'".format(new_job.instance_count, new_job.pool_name))
+
+        new_job.job_title = settings.job_title or self.JOB_TITLE_TEMPLATE.format(job_name=job_snapshot.JobName)
+        new_job.preemptible = settings.preemptible
+        new_job.project = settings.project
+        new_job.software_packages = software_packages
+
+        if scene_file not in new_job.upload_paths:
+            new_job.upload_paths.append(scene_file)
+
+        new_job.output_path = plan.output_path
+
+        # If a command is being executed that doesn't require any files, the
+        # submission shouldn't fail
+        sidecar_path = self.get_sidecar_path(job_snapshot, settings)
+
+        if sidecar_path:
+            with job_telemetry.phase("sidecar_load"):
+                new_job.upload_paths.extend(self.load_sidecar(sidecar_path, settings.sidecar_collapse_threshold))
+
+        new_job.telemetry = job_telemetry
+
+        return new_job
+
+    def submit(self, deadline_job, settings):
+        '''
+        Submit the given Deadline job to Conductor.
+
+        :returns: The Conductor job id. A job that was split into several
+                  Conductor jobs returns the id of the first one (they're
+                  all recorded on the Deadline job)
+        :rtype: str
+        '''
+
+        new_job = self.build_job(deadline_job, settings)
+
+        try:
+            conductor_job_id = new_job.submit_job()
+
+        except conductor_job.PartialSubmissionError as errMsg:
+            # Record the parts that made it so they're killed with the
+            # Deadline job
+            self.record_conductor_job(deadline_job, errMsg.conductor_job_ids, native=settings.native)
+            raise
+
+        self.record_conductor_job(deadline_job, new_job.conductor_job_ids or conductor_job_id, native=settings.native)
+
+        return conductor_job_id
+
+    def record_conductor_job(self, deadline_job, conductor_job_id, native=False):
+        '''
+        Store the Conductor job id(s) on the Deadline job so the
+        ConductorJobCleanup event plugin can kill the Conductor jobs once the
+        Deadline job is done.
+
+        Nothing is recorded for a native submission: the Deadline job is only
+        a placeholder and the Conductor job does the rendering, so it must not
+        be killed when the Deadline job is suspended or deleted.
+
+        :param conductor_job_id: A Conductor job id or a list of them
+        :type conductor_job_id: str or list of str
+
+        :param native: True if the job was sent to Conductor natively
+        :type native: bool
+        '''
+
+        if native:
+            return
+
+        if isinstance(conductor_job_id, (list, tuple)):
+            conductor_job_ids = [job_id for job_id in conductor_job_id if job_id is not None]
+        else:
+            conductor_job_ids = [conductor_job_id] if conductor_job_id is not None else []
+
+        if not conductor_job_ids:
+            return
+
+        for job_id in conductor_job_ids:
+            cleanup.add_conductor_job_id(deadline_job, job_id)
+
+        self.repository.SaveJob(deadline_job)
+
+    def submit_many(self, jobs, max_workers=None, on_result=None):
+        '''
+        Submit many Deadline jobs to Conductor.
+
+        The Deadline side of each submission (groups, saving the job) is done
+        serially in the calling thread. The Conductor submissions themselves
+        run concurrently (see :py:func:`~conductor_job.submit_many`), with at
+        most max_workers at a time. A failure only affects the job it belongs
+        to.
+
+        :param jobs: The Deadline jobs to submit, each with its own settings
+        :type jobs: list of tuple of (:py:class:`~Deadline.Jobs.Job`, :py:class:`~SubmissionSettings`)
+
+        :param max_workers: The maximum number of concurrent submissions.
+                            Defaults to $CONDUCTOR_DEADLINE_SUBMIT_WORKERS or 4
+        :type max_workers: int
+
+        :param on_result: Called with the :py:class:`~SubmissionResult` of
+                          each job, in the calling thread, as soon as its
+                          submission has succeeded or failed
+        :type on_result: callable
+
+        :returns: A result for every job, in the same order as the given jobs
+        :rtype: list of :py:class:`~SubmissionResult`
+        '''
+
+        if max_workers is None:
+            max_workers = int(os.environ.get('CONDUCTOR_DEADLINE_SUBMIT_WORKERS', DEFAULT_MAX_WORKERS))
+
+        results = []
+        pending = []
+
+        for deadline_job, settings in jobs:
+
+            result = SubmissionResult(deadline_job.JobId, deadline_job.JobName)
+            results.append(result)
+            start_time = time.time()
+
+            try:
+                new_job = self.build_job(deadline_job, settings)
+                result.fleet_plan = getattr(new_job, 'fleet_plan', None)
+                result.pool_name = getattr(new_job, 'pool_name', None)
+                pending.append((result, start_time, new_job, deadline_job, settings))
+
+            except Exception as errMsg:
+                LOG.exception("Unable to prepare Deadline job {}".format(deadline_job.JobId))
+                result.error = errMsg
+                result.duration = time.time() - start_time
+
+                if on_result is not None:
+                    on_result(result)
+
+        futures = {}
+
+        if pending:
+            submissions = conductor_job.submit_many([new_job for _, _, new_job, _, _ in pending],
+                                                    max_workers=min(max_workers, len(pending)))
+            futures = dict(zip(submissions, pending))
+
+        for future in concurrent.futures.as_completed(futures):
+
+            result, start_time, new_job, _, _ = futures[future]
+
+            try:
+                result.conductor_job_id = future.result()
+                result.conductor_job_ids = list(new_job.conductor_job_ids)
+
+            except Exception as errMsg:
+                LOG.exception("Unable to submit Deadline job {}".format(result.deadline_job_id))
+                result.error = errMsg
+
+                # The parts of a split job that were submitted before the
+                # failure are still running
+                if isinstance(errMsg, conductor_job.PartialSubmissionError):
+                    result.conductor_job_ids = list(errMsg.conductor_job_ids)
+
+            result.duration = time.time() - start_time
+            result.telemetry = new_job.telemetry.as_dict()
+
+            if on_result is not None:
+                on_result(result)
+
+        # Saving the Deadline jobs is done serially, like the rest of the
+        # Deadline side of the submissions
+        for result, _, _, deadline_job, settings in pending:
+
+            try:
+                self.record_conductor_job(deadline_job, result.conductor_job_ids or result.conductor_job_id,
+                                          native=settings.native)
+
+            except Exception:
+                LOG.exception("Unable to record Conductor job {} on Deadline job {}".format(result.conductor_job_id,
+                                                                                           result.deadline_job_id))
+
+        LOG.info("Submitted {} of {} Deadline jobs to Conductor".format(len([r for r in results if r.succeeded]),
+                                                                       len(results)))
+
+        return results
+
+    @staticmethod
+    def to_bool(value):
+        return value.lower() not in ('0', 'false', 'no')
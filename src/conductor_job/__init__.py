@@ -1,3 +1,4 @@
-from .job import Job, JobError
+from .job import Job, JobError, PartialSubmissionError, PreflightError, submit_many
 from .maya import MayaRenderJob
+from .nuke import NukeRenderJob
 from .worker import DeadlineWorkerJob
\ No newline at end of file
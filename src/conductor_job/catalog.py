@@ -0,0 +1,392 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+
+import ciocore.api_client
+import ciocore.package_tree
+
+from . import versions
+
+LOG = logging.getLogger(__name__)
+
+DEFAULT_TTL = 60 * 60
+DEFAULT_SNAPSHOT_PATH = os.path.join(os.path.expanduser("~"), ".conductor", "deadline_software_catalog.json")
+
+
+class CatalogError(Exception):
+    pass
+
+
+class SoftwareCatalog(object):
+    '''
+    A process-wide view of the Conductor software packages.
+
+    The package list is fetched once from Conductor and kept in memory. A
+    snapshot is also written to disk so that other processes (or the next
+    session) can re-use it until it's older than the TTL. Call refresh() to
+    explicitly fetch a new copy.
+
+    The packages are indexed by name, by product and by host (the host package
+    dict has a 'children' key with all of its plugins, the same structure as a
+    :py:class:`~ciocore.package_tree.PackageTree`) so lookups don't need to
+    walk the tree. The plugins of each host are also indexed by product and
+    version on first use (see plugin_versions()).
+
+    The TTL and snapshot path can be controlled with the environment variables
+    CONDUCTOR_DEADLINE_CATALOG_TTL (in seconds, 0 disables the on-disk snapshot)
+    and CONDUCTOR_DEADLINE_CATALOG_PATH.
+    '''
+
+    SNAPSHOT_VERSION = 1
+
+    def __init__(self, snapshot_path=None, ttl=None, fetch=None):
+
+        if snapshot_path is None:
+            snapshot_path = os.environ.get("CONDUCTOR_DEADLINE_CATALOG_PATH", DEFAULT_SNAPSHOT_PATH)
+
+        if ttl is None:
+            ttl = int(os.environ.get("CONDUCTOR_DEADLINE_CATALOG_TTL", DEFAULT_TTL))
+
+        self.snapshot_path = snapshot_path
+        self.ttl = ttl
+        self._fetch = fetch or ciocore.api_client.request_software_packages
+        self._lock = threading.RLock()
+
+        self._packages = None
+        self._fetched_at = None
+        self.revision = None
+
+        self._by_id = {}
+        self._by_name = {}
+        self._by_product = {}
+        self._plugin_versions = {}
+
+    @property
+    def packages(self):
+        '''
+        The raw list of packages, as returned by the Conductor packages endpoint
+        '''
+        self._ensure_loaded()
+        return self._packages
+
+    def is_expired(self):
+        '''
+        Whether the in-memory copy of the catalog is older than the TTL
+        '''
+
+        if self._fetched_at is None:
+            return True
+
+        return self.ttl > 0 and (time.time() - self._fetched_at) > self.ttl
+
+    def refresh(self):
+        '''
+        Fetch the packages from Conductor, regardless of the age of the current
+        copy, and update the on-disk snapshot.
+        '''
+
+        with self._lock:
+            start_time = time.time()
+            packages = self._fetch()
+            LOG.debug("Fetched {} packages from Conductor in {:.2f}s".format(len(packages), time.time()-start_time))
+
+            self._set_packages(packages, time.time())
+            self._write_snapshot()
+
+    def clear(self):
+        '''
+        Forget the in-memory copy of the catalog. The on-disk snapshot is kept.
+        '''
+
+        with self._lock:
+            self._packages = None
+            self._fetched_at = None
+            self.revision = None
+            self._by_id = {}
+            self._by_name = {}
+            self._by_product = {}
+            self._plugin_versions = {}
+
+    def get_revision(self):
+        '''
+        Get the revision of the catalog. It changes whenever a package is
+        added, removed or updated.
+
+        :rtype: str
+        '''
+
+        self._ensure_loaded()
+        return self.revision
+
+    def find_by_name(self, name):
+        '''
+        Get the package for the given name.
+
+        :param name: The name of the package (ex: maya-io 2024 SP1 linux)
+        :type name: str
+
+        :returns: The package or None if no package matches
+        :rtype: dict
+        '''
+
+        self._ensure_loaded()
+        return self._by_name.get(name)
+
+    def find_by_id(self, package_id):
+        '''
+        Get the package for the given package id
+        '''
+
+        self._ensure_loaded()
+        return self._by_id.get(package_id)
+
+    def packages_for_product(self, product):
+        '''
+        Get all the packages for the given product (ex: maya-io)
+
+        :returns: A list of packages
+        :rtype: list of dict
+        '''
+
+        self._ensure_loaded()
+        return list(self._by_product.get(product, []))
+
+    def host_names(self, product):
+        '''
+        Get the sorted names of all the packages of the given product. This is
+        the equivalent of building a PackageTree with the product keyword and
+        calling supported_host_names()
+
+        :returns: A list of package names
+        :rtype: list of str
+        '''
+
+        return sorted([ciocore.package_tree.to_name(package) for package in self.packages_for_product(product)])
+
+    def children(self, host_package):
+        '''
+        Get the plugin packages of the given host package.
+
+        :param host_package: The host package or its name
+        :type host_package: dict or str
+
+        :returns: A list of packages
+        :rtype: list of dict
+        '''
+
+        if not isinstance(host_package, dict):
+            host_package = self.find_by_name(host_package)
+
+        if not host_package:
+            return []
+
+        self._ensure_loaded()
+        indexed_package = self._by_id.get(host_package.get('package_id'), host_package)
+        return list(indexed_package['children'])
+
+    def plugin_versions(self, host_package, product):
+        '''
+        Get the versions of a plugin product available for the given host.
+        The index is built once per host.
+
+        :param host_package: The host package or its name
+        :type host_package: dict or str
+
+        :param product: The plugin product (ex: arnold-maya)
+        :type product: str
+
+        :rtype: :py:class:`~conductor_job.versions.VersionIndex`
+        '''
+
+        if not isinstance(host_package, dict):
+            host_package = self.find_by_name(host_package)
+
+        if not host_package:
+            return versions.VersionIndex([])
+
+        self._ensure_loaded()
+        host_id = host_package.get('package_id')
+
+        with self._lock:
+
+            if host_id not in self._plugin_versions:
+
+                by_product = {}
+                for plugin in self.children(host_package):
+                    by_product.setdefault(plugin['product'], []).append(plugin)
+
+                self._plugin_versions[host_id] = {plugin_product: versions.VersionIndex(plugins)
+                                                  for plugin_product, plugins in by_product.items()}
+
+            index = self._plugin_versions[host_id].get(product)
+
+        return index if index is not None else versions.VersionIndex([])
+
+    def _ensure_loaded(self):
+
+        if self._packages is not None and not self.is_expired():
+            return
+
+        with self._lock:
+
+            # Another thread may have loaded it while we were waiting
+            if self._packages is not None and not self.is_expired():
+                return
+
+            if not self._read_snapshot():
+                self.refresh()
+
+    def _set_packages(self, packages, fetched_at):
+
+        by_id = {}
+        by_product = {}
+
+        for package in packages:
+            indexed_package = dict(package)
+            indexed_package['children'] = []
+            plugin_ids = indexed_package.pop('plugins', None) or []
+            indexed_package['_plugin_ids'] = plugin_ids
+            by_id[indexed_package['package_id']] = indexed_package
+            by_product.setdefault(indexed_package['product'], []).append(indexed_package)
+
+        # Link each host to its plugins. Hosts are named first so that a name
+        # resolves the same way ciocore.package_tree.PackageTree.find_by_name()
+        # would.
+        by_name = {}
+        hosts = []
+        plugins = []
+
+        for indexed_package in by_id.values():
+
+            for plugin_id in indexed_package.pop('_plugin_ids'):
+                if plugin_id in by_id:
+                    indexed_package['children'].append(by_id[plugin_id])
+
+            if indexed_package.get('plugin_host_product'):
+                plugins.append(indexed_package)
+            else:
+                hosts.append(indexed_package)
+
+        for indexed_package in hosts + plugins:
+
+            try:
+                by_name.setdefault(ciocore.package_tree.to_name(indexed_package), indexed_package)
+            except KeyError:
+                LOG.debug("Skipping package with an unsupported platform: {}".format(indexed_package.get('package_id')))
+
+        revision = hashlib.sha1()
+        for package_id in sorted(by_id):
+            revision.update("{}:{};".format(package_id, by_id[package_id].get('updated_at', '')).encode("utf-8"))
+
+        self._packages = packages
+        self._fetched_at = fetched_at
+        self._by_id = by_id
+        self._by_name = by_name
+        self._by_product = by_product
+        self._plugin_versions = {}
+        self.revision = revision.hexdigest()
+
+    def _read_snapshot(self):
+
+        if self.ttl <= 0 or not self.snapshot_path or not os.path.exists(self.snapshot_path):
+            return False
+
+        try:
+            with open(self.snapshot_path, 'r') as fh:
+                snapshot = json.load(fh)
+
+        except (IOError, OSError, ValueError) as errMsg:
+            LOG.warning("Unable to read the software catalog snapshot '{}': {}".format(self.snapshot_path, errMsg))
+            return False
+
+        if snapshot.get('version') != self.SNAPSHOT_VERSION:
+            return False
+
+        fetched_at = snapshot.get('fetched_at', 0)
+        if (time.time() - fetched_at) > self.ttl:
+            LOG.debug("Software catalog snapshot '{}' has expired".format(self.snapshot_path))
+            return False
+
+        LOG.debug("Using software catalog snapshot '{}'".format(self.snapshot_path))
+        self._set_packages(snapshot['packages'], fetched_at)
+
+        return True
+
+    def _write_snapshot(self):
+
+        if self.ttl <= 0 or not self.snapshot_path:
+            return
+
+        snapshot = {'version': self.SNAPSHOT_VERSION,
+                    'fetched_at': self._fetched_at,
+                    'packages': self._packages}
+
+        temp_path = "{}.{}.tmp".format(self.snapshot_path, os.getpid())
+
+        try:
+            snapshot_dir = os.path.dirname(self.snapshot_path)
+            if snapshot_dir and not os.path.exists(snapshot_dir):
+                os.makedirs(snapshot_dir)
+
+            with open(temp_path, 'w') as fh:
+                json.dump(snapshot, fh)
+
+            os.replace(temp_path, self.snapshot_path)
+
+        except (IOError, OSError) as errMsg:
+            LOG.warning("Unable to write the software catalog snapshot '{}': {}".format(self.snapshot_path, errMsg))
+
+
+_CATALOG = None
+_CATALOG_LOCK = threading.Lock()
+
+
+def get_catalog():
+    '''
+    Get the process-wide :py:class:`~SoftwareCatalog`
+    '''
+
+    global _CATALOG
+
+    with _CATALOG_LOCK:
+        if _CATALOG is None:
+            _CATALOG = SoftwareCatalog()
+
+        return _CATALOG
+
+
+def set_catalog(catalog):
+    '''
+    Replace the process-wide :py:class:`~SoftwareCatalog`. Passing None will
+    create a new default catalog on the next call to get_catalog()
+    '''
+
+    global _CATALOG
+
+    with _CATALOG_LOCK:
+        _CATALOG = catalog
+
+
+_INSTANCE_TYPES = None
+_INSTANCE_TYPES_LOCK = threading.Lock()
+
+
+def get_instance_types(refresh=False):
+    '''
+    Get the instance types available to the account. They're only requested
+    from Conductor once per process unless refresh is True.
+
+    :returns: The instance types, as returned by the Conductor instance types endpoint
+    :rtype: list of dict
+    '''
+
+    global _INSTANCE_TYPES
+
+    with _INSTANCE_TYPES_LOCK:
+        if _INSTANCE_TYPES is None or refresh:
+            _INSTANCE_TYPES = ciocore.api_client.request_instance_types()
+
+        return _INSTANCE_TYPES
@@ -1,23 +1,51 @@
+import concurrent.futures
 import logging
+import math
 import os
+import threading
+import time
 
 import ciocore.conductor_submit as conductor_submit
-import ciocore.data
 import ciocore.package_environment
 
+from . import md5_cache
+from . import payload
+from . import preflight
+from . import scout
+from . import telemetry
+from . import transport
 
 LOG = logging.getLogger(__name__)
-LOG.setLevel(10)
+
+DEFAULT_SUBMIT_WORKERS = 4
 
 class JobError(Exception):
     pass
 
+class PreflightError(JobError):
+    
+    def __init__(self, report):
+        super(PreflightError, self).__init__(report.summary())
+        self.report = report
+
+class PartialSubmissionError(JobError):
+    '''
+    A job split into several parts failed after some of them had been
+    submitted. Those parts are running on Conductor and are in
+    conductor_job_ids so they can be killed or recorded.
+    '''
+    
+    def __init__(self, conductor_job_ids, part_count, error):
+        super(PartialSubmissionError, self).__init__(
+            "Part {} of {} failed after Conductor job(s) {} had been submitted: {}".format(
+                len(conductor_job_ids) + 1, part_count, ", ".join(conductor_job_ids), error))
+        self.conductor_job_ids = list(conductor_job_ids)
+        self.error = error
+
 class Job(object):
     
     def __init__(self):
         
-        self._core_data = None
-    
         self.upload_paths = []
         self.software_packages = []
         self.user = None
@@ -29,6 +57,14 @@ class Job(object):
         self.auto_retry_policy = {}
         self.preemptible = True
         self.chunk_size = 1
+        
+        # Adaptive chunking. When target_task_count is set, or both
+        # target_task_duration and frame_duration (in seconds) are, the number
+        # of frames per task is derived from them instead of chunk_size
+        self.target_task_count = None
+        self.target_task_duration = None
+        self.frame_duration = None
+        
         self.project = "default"
         self.output_path = ""
         self.job_title = ""
@@ -36,29 +72,125 @@ class Job(object):
         self._dependencies = None
         self.environment = {}
         self.scout_frames = ""
+
+        # How the scout frames are chosen from the frames of the job. See
+        # set_scout_policy()
+        self.scout_policy = None
+        self.scout_policy_value = None
         
         self._dependency_scan_enabled = True
         self.conductor_job_id = None
         
+        # All the Conductor jobs the job was submitted as. A job with a very
+        # large payload is split into several (see conductor_job.payload)
+        self.conductor_job_ids = []
+        
+        # Skip hashing and uploading files that haven't changed since they
+        # were last uploaded (only applies to local uploads)
+        self.md5_cache_enabled = True
+        
+        # Check the upload paths, packages and instance type before anything
+        # is uploaded or submitted
+        self.preflight_enabled = True
+        self.preflight_report = None
+        
+        # How long each phase of the submission took. The submitter adds the
+        # phases that happen before the job is built (ex: mapping)
+        self.telemetry = telemetry.SubmissionTelemetry()
+        
     def validate_job(self):
         pass
     
-    @property
-    def core_data(self):
-        
-        if self._core_data is None:
-                    
-            ciocore.data.init(product="all")
-            self._core_data = ciocore.data.data()
-            
-        return self._core_data
-                
     def _get_task_data(self):
         pass
     
     def _get_frame_range(self):
         pass
     
+    def get_chunk_size(self, frame_count):
+        '''
+        Get the number of frames per task.
+        
+        :param frame_count: The number of frames in the job
+        :type frame_count: int
+        
+        :rtype: int
+        '''
+        
+        if self.target_task_count:
+            chunk_size = int(math.ceil(frame_count / float(self.target_task_count)))
+            
+        elif self.target_task_duration and self.frame_duration:
+            chunk_size = int(self.target_task_duration // self.frame_duration)
+            
+        else:
+            chunk_size = self.chunk_size or frame_count
+            
+        return max(1, chunk_size)
+    
+    def set_scout_policy(self, policy, value=None):
+        '''
+        Set how the scout frames are chosen. See :py:mod:`~conductor_job.scout`
+        for the available policies.
+
+        :param policy: The policy (ex: 'fml', 'spaced', 'nth', 'percentage')
+        :type policy: str
+
+        :param value: The count, step or percentage used by the policy
+
+        :raises: :py:class:`~conductor_job.scout.ScoutPolicyError` if the
+                 policy or value isn't valid
+        '''
+
+        scout.validate_policy(policy, value)
+
+        self.scout_policy = policy
+        self.scout_policy_value = value
+
+    def get_scout_frames(self, frames, default_policy=scout.NONE):
+        '''
+        Get the scout frames in compact range notation (ex: 1-901x100)
+
+        :param frames: The frames of the job
+        :type frames: :py:class:`~cioseq.sequence.Sequence`
+
+        :param default_policy: The policy to use if none has been set
+        :type default_policy: str
+
+        :rtype: str
+        '''
+
+        policy = self.scout_policy or default_policy
+        scout_frames = scout.select_frames(frames, policy, self.scout_policy_value)
+
+        LOG.debug("Scout frames ({}): {}".format(policy, scout_frames))
+
+        if not scout_frames:
+            return ""
+
+        return str(scout_frames)
+
+    def get_frame_chunks(self, frames):
+        '''
+        Split the frames into chunks for each task. Every chunk is an
+        arithmetic progression (ex: 1-10, 20-50x10) so a task never covers
+        frames that weren't asked for, even when the sequence has gaps or
+        mixed steps.
+        
+        :param frames: The frames of the job
+        :type frames: :py:class:`~cioseq.sequence.Sequence`
+        
+        :returns: The chunks, each with a start, end and step
+        :rtype: list of :py:class:`~cioseq.sequence.Progression`
+        '''
+        
+        frames.chunk_strategy = "progressions"
+        frames.chunk_size = self.get_chunk_size(len(frames))
+        
+        LOG.debug("Using a chunk size of {}".format(frames.chunk_size))
+        
+        return frames.chunks()
+    
     def _get_environment(self):
 
         env = ciocore.package_environment.PackageEnvironment()        
@@ -71,11 +203,12 @@ class Job(object):
         return env
     
     def _get_package_ids(self):
-        LOG.debug("Getting package ids ({}) from packages: {}".format(len(self.software_packages),
-                                                                      self.software_packages))
         
         packages_ids = [ package['package_id'] for package in self.software_packages]
-        LOG.debug("Got package ids: {}".format(packages_ids))
+        
+        if LOG.isEnabledFor(logging.DEBUG):
+            LOG.debug("Got {} package ids: {}".format(len(packages_ids), telemetry.summarise(packages_ids)))
+            
         return packages_ids
     
     def get_output_path(self):
@@ -84,6 +217,18 @@ class Job(object):
     def scan_for_dependencies(self):
         return []
     
+    def get_task_groups(self):
+        '''
+        Get the tasks that must be submitted as Conductor jobs of their own.
+        It's only called once the task data has been built.
+        
+        :returns: The start and end (exclusive) index of the tasks of each
+                  group, or None if they can all be in the same job
+        :rtype: list of tuple of (int, int)
+        '''
+        
+        return None
+    
     def get_dependencies(self):
         
         if self._dependencies is None and self._dependency_scan_enabled:            
@@ -91,16 +236,107 @@ class Job(object):
             
         return self._dependencies + self.upload_paths
 
+    def preflight(self):
+        '''
+        Run the pre-flight checks on the job.
+        
+        :returns: The report of the checks
+        :rtype: :py:class:`~conductor_job.preflight.PreflightReport`
+        '''
+        
+        self.preflight_report = preflight.PreflightRunner().run(self)
+        return self.preflight_report
+
     def submit_job(self):
+        '''
+        Submit the job. The time spent in each phase is emitted as one record
+        once it's done, whether it succeeded or not (see
+        :py:mod:`~conductor_job.telemetry`).
+        '''
+        
+        try:
+            return self._submit_job()
+        
+        except Exception as errMsg:
+            self.telemetry.error = "{}: {}".format(type(errMsg).__name__, errMsg)
+            raise
+        
+        finally:
+            self.telemetry.info['job_ids'] = list(self.conductor_job_ids)
+            self.telemetry.emit()
+    
+    def _submit_job(self):
         
         self.validate_job()
         
-        data = { "upload_paths": self.get_dependencies(),
+        # The pre-flight checks read the dependencies, so they're scanned
+        # first to be timed as a phase of their own
+        with self.telemetry.phase("dependency_scan"):
+            upload_paths = self.get_dependencies()
+        
+        if self.preflight_enabled:
+            
+            with self.telemetry.phase("preflight"):
+                report = self.preflight()
+            
+            if not report.ok:
+                raise PreflightError(report)
+        
+        self.conductor_job_ids = []
+        
+        with self.telemetry.phase("environment"):
+            environment = self._get_environment()
+        
+        with self.telemetry.phase("payload"):
+            data = self._get_submission_data(upload_paths, environment)
+            planner = payload.PayloadPlanner()
+            parts = planner.plan(data, groups=self.get_task_groups())
+        
+        self.telemetry.count("tasks", len(data['tasks_data'] or []))
+        self.telemetry.count("upload_paths", len(upload_paths))
+        self.telemetry.count("packages", len(data['software_package_ids']))
+        self.telemetry.count("parts", len(parts))
+        
+        if planner.payload_size is not None:
+            self.telemetry.count("payload_bytes", planner.payload_size)
+        
+        first_submitter = None
+        
+        # The files are only uploaded for the first part. The other parts
+        # send the same upload manifest.
+        for part in parts:
+            
+            submitter = self._get_submitter(part)
+            
+            if first_submitter is not None:
+                payload.share_manifest(first_submitter, submitter)
+            
+            try:
+                self.conductor_job_ids.append(self._send(submitter))
+            
+            except Exception as errMsg:
+                
+                # The parts already submitted are running on Conductor
+                if self.conductor_job_ids:
+                    self.conductor_job_id = self.conductor_job_ids[0]
+                    raise PartialSubmissionError(self.conductor_job_ids, len(parts), errMsg) from errMsg
+                
+                raise
+            
+            first_submitter = first_submitter or submitter
+        
+        self.conductor_job_id = self.conductor_job_ids[0]
+         
+        return self.conductor_job_id
+    
+    def _get_submission_data(self, upload_paths, environment):
+        
+        data = { "upload_paths": upload_paths,
                  "software_package_ids": self._get_package_ids(), 
                  "tasks_data": self._get_task_data(), 
                  "user": self.user, 
                  "frame_range": self._get_frame_range(),
-                 "environment": self._get_environment(), 
+                 "environment": environment, 
                  "priority": self.priority,
                  "location": self.location, 
                  "instance_type": self.instance_type, 
@@ -134,13 +370,32 @@ class Job(object):
                     
                 data[job_parm_key.lower()] = value
         
-        LOG.debug("Job Parameters:")
-        for k, v in data.items():
-            LOG.debug("  {}: '{}'".format(k, v))
-
-        submitter = conductor_submit.Submit(data)
-
-        response, response_code = submitter.main()
+        # Formatting every task and upload path is slow for large jobs, so
+        # they're only summarised, and only if they'd be logged
+        if LOG.isEnabledFor(logging.DEBUG):
+            LOG.debug("Job Parameters:")
+            for k, v in data.items():
+                LOG.debug("  {}: '{}'".format(k, telemetry.summarise(v)))
+        
+        return data
+    
+    def _send(self, submitter):
+        
+        # The upload is timed on its own and the rest of main() is the submit
+        upload_time = self.telemetry.phases.get("upload", 0.0)
+        
+        if hasattr(submitter, "_handle_local_upload"):
+            self.telemetry.wrap(submitter, "_handle_local_upload", "upload")
+        
+        start_time = time.perf_counter()
+        
+        try:
+            response, response_code = submitter.main()
+            
+        finally:
+            duration = time.perf_counter() - start_time
+            self.telemetry.add_time("submit", duration - (self.telemetry.phases.get("upload", 0.0) - upload_time))
+        
         LOG.debug("Response Code: %s", response_code)
         LOG.debug("Response: %s", response)
          
@@ -150,10 +405,36 @@ class Job(object):
         else:
             LOG.error("Submission Failure. Response code: %s", response_code)
             raise JobError("Submission Failure. Response code: %s", response_code)
- 
-        self.conductor_job_id = response['jobid']
-         
-        return self.conductor_job_id
+        
+        return response['jobid']
+    
+    def submit_job_async(self, executor=None):
+        '''
+        Submit the job from another thread.
+        
+        :param executor: The executor to submit from. Defaults to a
+                         process-wide one (see get_submit_executor())
+        :type executor: :py:class:`~concurrent.futures.Executor`
+        
+        :returns: A future for the Conductor job id
+        :rtype: :py:class:`~concurrent.futures.Future`
+        '''
+        
+        return (executor or get_submit_executor()).submit(self.submit_job)
+    
+    def _get_submitter(self, data):
+        
+        if self.local_upload and self.md5_cache_enabled:
+            submitter = md5_cache.CachedSubmit(data)
+        
+        else:
+            submitter = conductor_submit.Submit(data)
+        
+        # Share one pooled, rate limited and retrying connection between
+        # all the submissions
+        submitter.api_client = transport.get_api_client()
+        
+        return submitter
     
     @property
     def owner(self):
@@ -183,3 +464,57 @@ class Job(object):
         
         else:
             raise JobError("Unable to match the command '{}' to an appropriate class".format(cmd))
+
+
+_SUBMIT_EXECUTOR = None
+_SUBMIT_EXECUTOR_LOCK = threading.Lock()
+
+
+def get_submit_executor():
+    '''
+    Get the process-wide executor used by Job.submit_job_async(). The number
+    of threads can be set with $CONDUCTOR_DEADLINE_SUBMIT_WORKERS
+    '''
+
+    global _SUBMIT_EXECUTOR
+
+    with _SUBMIT_EXECUTOR_LOCK:
+        if _SUBMIT_EXECUTOR is None:
+            max_workers = int(os.environ.get('CONDUCTOR_DEADLINE_SUBMIT_WORKERS', DEFAULT_SUBMIT_WORKERS))
+            _SUBMIT_EXECUTOR = concurrent.futures.ThreadPoolExecutor(max_workers=max(1, max_workers),
+                                                                     thread_name_prefix="conductor_submit")
+
+        return _SUBMIT_EXECUTOR
+
+
+def submit_many(jobs, max_workers=None):
+    '''
+    Submit many jobs concurrently. They all share the pooled connection and
+    the rate limiter of :py:mod:`~conductor_job.transport`, so max_workers
+    limits the uploads and payload building rather than the request rate.
+
+    :param jobs: The jobs to submit
+    :type jobs: list of :py:class:`~Job`
+
+    :param max_workers: The maximum number of concurrent submissions.
+                        Defaults to the process-wide executor
+    :type max_workers: int
+
+    :returns: A future for the Conductor job id of every job, in the same
+              order as the given jobs. A failed submission raises from its
+              future's result()
+    :rtype: list of :py:class:`~concurrent.futures.Future`
+    '''
+
+    if max_workers is None:
+        return [job.submit_job_async() for job in jobs]
+
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=max(1, max_workers),
+                                                     thread_name_prefix="conductor_submit")
+
+    try:
+        return [job.submit_job_async(executor) for job in jobs]
+
+    finally:
+        # The threads exit once the submissions are done
+        executor.shutdown(wait=False)
@@ -4,6 +4,8 @@ import cioseq.sequence
 import ciopath.gpath
 
 from . import job
+from . import maya_ascii
+from . import scout
 
 LOG = logging.getLogger(__name__)
 
@@ -13,6 +15,8 @@ class MayaRenderJob(job.Job):
                                        "renderman-maya": "renderman",
                                        "redshift-maya": "redshift",
                                        "v-ray-maya": "vray"}
+        
+        COMMAND_TEMPLATE = "{cmd} -r {renderer} -s {start_frame} -e {end_frame} -b {frame_step} -rl {render_layer} -rd {output_path} -proj {project_path} {renderer_args} {extra_args} {scene_path}"
     
         def __init__(self, scene_path=None, project_path=None, *args , **kwargs):
             
@@ -31,50 +35,91 @@ class MayaRenderJob(job.Job):
             self.log_level = "2"
             self.renderer = "File"
  
-        def _get_task_data(self):
-
-            LOG.debug("Using a chunk size of {}".format(self.chunk_size))
+        def _compile_command_template(self):
+            '''
+            Build the task command with everything that's the same for every
+            task already filled in. Only the {start_frame} and {end_frame}
+            placeholders are left.
+            '''
+            
+            def escape(value):
+                return str(value).replace("{", "{{").replace("}", "}}")
+            
+            command_args = {'cmd': escape(self.cmd),
+                            'renderer': escape(self.PRODUCT_TO_RENDERER_MAPPING[self.renderer]),
+                            'start_frame': '{start_frame}',
+                            'end_frame': '{end_frame}',
+                            'frame_step': '{frame_step}',
+                            'render_layer': escape(self.render_layer),
+                            'output_path': escape(ciopath.gpath.Path(self.output_path).fslash(with_drive=False)),
+                            'project_path': escape(ciopath.gpath.Path(self.project_path).fslash(with_drive=False)),
+                            'scene_path': escape(ciopath.gpath.Path(self.scene_path).fslash(with_drive=False)),
+                            'extra_args': escape(self.additional_cmd_args),
+                            'renderer_args': escape(self.get_renderer_args(self.renderer)),
+                            'post_cmd': escape(self.post_task_cmd)}
             
-            task_data = []
+            command_template = self.COMMAND_TEMPLATE.format(**command_args)
+            
+            if self.post_job_cmd:
+                command_template += " && {}".format(escape(self.post_task_cmd))
+                
+            return command_template
+ 
+        def iter_task_data(self):
+            '''
+            Generate the data for each task, one chunk of frames at a time.
+            Each chunk is an arithmetic progression of the job's frames so only
+            the frames that were asked for are rendered.
+            
+            :rtype: generator of dict
+            '''
             
             if not self.frames:
-                self.frames = cioseq.sequence.Sequence.create(self.start_frame, self.end_frame+1)
+                self.frames = cioseq.sequence.Sequence.create(self.start_frame, self.end_frame, self.frame_step)
             
             LOG.debug("Frames: {}".format(self.frames))
+            
+            command_template = self._compile_command_template()
 
-            for start in range(0, len(self.frames), self.chunk_size):
-                chunk_frames = self.frames[start:start+self.chunk_size]
-                start_frame = chunk_frames[0]
-                end_frame = chunk_frames[-1]
+            for chunk in self.get_frame_chunks(self.frames):
                 
-                command_args = {'cmd': self.cmd,
-                                'renderer': self.PRODUCT_TO_RENDERER_MAPPING[self.renderer],
-                                'start_frame': start_frame,
-                                'end_frame': end_frame,
-                                'frame_step': self.frame_step,
-                                'render_layer': self.render_layer,
-                                'output_path': ciopath.gpath.Path(self.output_path).fslash(with_drive=False),
-                                'project_path': ciopath.gpath.Path(self.project_path).fslash(with_drive=False),
-                                'scene_path': ciopath.gpath.Path(self.scene_path).fslash(with_drive=False),
-                                'extra_args': self.additional_cmd_args,
-                                'renderer_args': self.get_renderer_args(self.renderer),
-                                'post_cmd': self.post_task_cmd}
-                
-                task_cmd = { "frames": "{}-{}".format(start_frame, end_frame),
-                             "command": "{cmd} -r {renderer} -s {start_frame} -e {end_frame} -b {frame_step} -rl {render_layer} -rd {output_path} -proj {project_path} {renderer_args} {extra_args} {scene_path}".format(**command_args)}
-                
-                if self.post_job_cmd:
-                    task_cmd["command"] += " && {}".format(self.post_task_cmd)
-                    
-                task_data.append(task_cmd)
+                yield {"frames": str(chunk),
+                       "command": command_template.format(start_frame=chunk.start, 
+                                                          end_frame=chunk.end, 
+                                                          frame_step=chunk.step)}
                 
+            # With a post-job task, every frame is a scout frame by default so
+            # the post-job task is held until the frames have rendered
             if self.post_job_cmd is not None:
-                task_data.append({"frames": "999999", 
-                                  "command": self.post_job_cmd})
+                self.scout_frames = self.get_scout_frames(self.frames, default_policy=scout.ALL)
                 
-                self.scout_frames = ",".join([str(f) for f in self.frames])
+                yield {"frames": "999999", 
+                       "command": self.post_job_cmd}
                 
-            return task_data
+            elif self.scout_policy:
+                self.scout_frames = self.get_scout_frames(self.frames)
+ 
+        def _get_task_data(self):
+            return list(self.iter_task_data())
+        
+        def scan_for_dependencies(self):
+            '''
+            Get the files the scene depends on, without Maya. Only Maya ASCII
+            scenes can be scanned (see :py:mod:`~conductor_job.maya_ascii`).
+            
+            :rtype: list of str
+            '''
+            
+            if not self.scene_path or not self.scene_path.lower().endswith(".ma"):
+                LOG.debug("Not scanning '{}' for dependencies. Only Maya ASCII scenes can be scanned".format(self.scene_path))
+                return []
+            
+            try:
+                return maya_ascii.collect_dependencies(self.scene_path, project_path=self.project_path)
+            
+            except maya_ascii.MayaAsciiError as errMsg:
+                LOG.warning("Unable to scan for dependencies: {}".format(errMsg))
+                return []
         
         def get_renderer_args(self, renderer):
             
@@ -0,0 +1,614 @@
+'''
+Find the dependencies of a Maya ASCII (.ma) scene without Maya.
+
+The scene is streamed one line at a time and only the statements that can
+hold a path are kept:
+
+    file -r ... "path";                         References
+    createNode file ...; setAttr ".ftn" ...     File textures
+    createNode aiImage ...; setAttr ".filename" ...
+    createNode aiStandIn ...; setAttr ".dso" ...
+    createNode AlembicNode ...; setAttr ".fn" ...
+
+Everything else (mesh data, animation curves, ...) is skipped without being
+kept, so memory use doesn't grow with the size of the scene. Referenced
+Maya ASCII scenes are scanned too.
+
+The paths found in a scene are cached per scene path, size and mtime, in
+memory and on disk ($CONDUCTOR_DEADLINE_MAYA_SCAN_CACHE, an empty value
+disables the on-disk cache), so re-submitting an unchanged scene doesn't
+read it again.
+'''
+
+import bisect
+import glob
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+
+LOG = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".conductor", "deadline_maya_scans")
+
+# Bump when the scan results change, so older cache entries are ignored
+CACHE_VERSION = 1
+
+# The attributes that hold a path, for each node type. Both the short and
+# long names are listed since either can be written to the scene.
+NODE_ATTRIBUTES = {"file": ("ftn", "fileTextureName"),
+                   "aiImage": ("filename", "fn"),
+                   "aiStandIn": ("dso",),
+                   "AlembicNode": ("fn", "abc_File", "fns", "abc_layerFiles")}
+
+# Tokens that stand for many files on disk (ex: UDIM tiles, frame numbers)
+_TOKENS = re.compile(r'<udim>|<uvtile>|<tile>|<frame>|<f>|<u>|<v>|#+', re.IGNORECASE)
+_QUOTED = re.compile(r'"((?:[^"\\]|\\.)*)"')
+_TYPE_FLAG = re.compile(r'-type\s+"[^"]*"')
+_ESCAPE = re.compile(r'\\(.)')
+_ESCAPES = {"n": "\n", "t": "\t", "r": "\r"}
+_DRIVE = re.compile(r'^[a-zA-Z]:[\\/]')
+
+# The same scene referenced several times gets a copy number (ex: {1})
+_COPY_NUMBER = re.compile(r'\{\d+\}$')
+
+
+class MayaAsciiError(Exception):
+    pass
+
+
+class MayaAsciiReader(object):
+    '''
+    Stream the paths out of a Maya ASCII scene.
+
+    :param path: The path to the scene
+    :type path: str
+    '''
+
+    # Lines longer than this are truncated. Statements that hold a path are
+    # far shorter, long lines are only ever data.
+    MAX_LINE_LENGTH = 64 * 1024
+
+    # A statement of interest that's longer than this is dropped
+    MAX_STATEMENT_LENGTH = 1024 * 1024
+
+    def __init__(self, path):
+
+        self.path = path
+
+        self.line_count = 0
+        self.node_count = 0
+
+    def iter_lines(self):
+        '''
+        Iterate over the lines of the scene, each truncated to at most
+        MAX_LINE_LENGTH characters
+        '''
+
+        truncated = False
+
+        with open(self.path, 'rb') as fh:
+
+            while True:
+                line = fh.readline(self.MAX_LINE_LENGTH)
+
+                if not line:
+                    break
+
+                complete = line.endswith(b"\n")
+
+                # The rest of a truncated line is skipped
+                if truncated:
+                    truncated = not complete
+                    continue
+
+                truncated = not complete and len(line) >= self.MAX_LINE_LENGTH
+                self.line_count += 1
+
+                yield line.decode("utf-8", "replace")
+
+    def iter_statements(self):
+        '''
+        Iterate over the statements that can hold a path
+
+        :returns: The type of statement ('reference' or the node type) and
+                  the full statement
+        :rtype: generator of tuple of (str, str)
+        '''
+
+        node_type = None
+        kind = None
+        statement = []
+        statement_length = 0
+
+        for line in self.iter_lines():
+
+            if kind is not None:
+                statement.append(line)
+                statement_length += len(line)
+
+            # Indented statements are about the last created node. Most lines
+            # of a scene are indented data, so they're dismissed first.
+            elif line[:1] in ("\t", " "):
+
+                if node_type not in NODE_ATTRIBUTES:
+                    continue
+
+                stripped = line.lstrip()
+
+                if not stripped.startswith("setAttr ") or self._get_attribute(stripped) not in NODE_ATTRIBUTES[node_type]:
+                    continue
+
+                kind = node_type
+                statement = [line]
+                statement_length = len(line)
+
+            else:
+                node_type = None
+
+                if line.startswith("createNode "):
+                    node_type = self._get_node_type(line)
+                    self.node_count += 1
+                    continue
+
+                if not line.startswith("file "):
+                    continue
+
+                kind = "reference"
+
+                statement = [line]
+                statement_length = len(line)
+
+            if statement_length > self.MAX_STATEMENT_LENGTH:
+                LOG.warning("Skipping a {} statement longer than {} characters in '{}'".format(
+                    kind, self.MAX_STATEMENT_LENGTH, self.path))
+                kind = None
+                statement = []
+
+            elif line.rstrip().endswith(";") and _is_complete("".join(statement)):
+                yield kind, "".join(statement)
+                kind = None
+                statement = []
+
+    @staticmethod
+    def _get_node_type(statement):
+
+        tokens = statement.split(None, 2)
+        return tokens[1].rstrip(";") if len(tokens) > 1 else None
+
+    @staticmethod
+    def _get_attribute(statement):
+
+        match = _QUOTED.search(statement)
+
+        if match is None or not match.group(1).startswith("."):
+            return None
+
+        return match.group(1)[1:]
+
+    def scan(self):
+        '''
+        Get the raw paths and references of the scene, as they're written in
+        it (ex: relative or with UDIM tokens)
+
+        :rtype: :py:class:`~MayaAsciiScan`
+        '''
+
+        result = MayaAsciiScan()
+
+        for kind, statement in self.iter_statements():
+
+            values = get_string_values(statement)
+
+            if kind == "reference":
+                # The path is the last argument of the file command
+                if values:
+                    result.add_reference(_COPY_NUMBER.sub("", values[-1]))
+
+            else:
+                # The first string is the attribute name
+                for value in values[1:]:
+                    result.add_path(value)
+
+        LOG.debug("Scanned {} lines and {} nodes in '{}': {} paths, {} references".format(self.line_count,
+                                                                                        self.node_count,
+                                                                                        self.path,
+                                                                                        len(result.paths),
+                                                                                        len(result.references)))
+
+        return result
+
+
+class MayaAsciiScan(object):
+    '''
+    The paths and references found in a single scene
+    '''
+
+    def __init__(self, paths=None, references=None):
+
+        self.paths = list(paths or [])
+        self.references = list(references or [])
+
+        self._seen = set(self.paths) | set(self.references)
+
+    def add_path(self, path):
+
+        if path and path not in self._seen:
+            self._seen.add(path)
+            self.paths.append(path)
+
+    def add_reference(self, path):
+
+        if path and path not in self._seen:
+            self._seen.add(path)
+            self.references.append(path)
+
+    def as_dict(self):
+        return {"paths": self.paths, "references": self.references}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(paths=data.get('paths'), references=data.get('references'))
+
+
+class ScanCache(object):
+    '''
+    Cache the scans of scenes. An entry is only valid while the scene's size
+    and mtime are unchanged.
+
+    :param path: The directory the entries are stored in. Defaults to
+                 $CONDUCTOR_DEADLINE_MAYA_SCAN_CACHE or
+                 ~/.conductor/deadline_maya_scans. If empty, the scans are
+                 only cached in memory
+    :type path: str
+    '''
+
+    def __init__(self, path=None):
+
+        if path is None:
+            path = os.environ.get("CONDUCTOR_DEADLINE_MAYA_SCAN_CACHE", DEFAULT_CACHE_PATH)
+
+        self.path = path
+
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _stat(scene_path):
+
+        stat = os.stat(scene_path)
+        return stat.st_size, stat.st_mtime
+
+    def _get_entry_path(self, scene_path):
+        return os.path.join(self.path, hashlib.sha1(scene_path.encode("utf-8")).hexdigest() + ".json")
+
+    def get(self, scene_path):
+        '''
+        Get the cached scan of the scene
+
+        :returns: The scan or None if there's no valid entry
+        :rtype: :py:class:`~MayaAsciiScan`
+        '''
+
+        scene_path = os.path.abspath(scene_path)
+        size, mtime = self._stat(scene_path)
+
+        with self._lock:
+            entry = self._entries.get(scene_path)
+
+        if entry is None and self.path:
+            try:
+                with open(self._get_entry_path(scene_path), 'r') as fh:
+                    entry = json.load(fh)
+
+            except (IOError, OSError, ValueError):
+                entry = None
+
+        if entry is None or entry.get('version') != CACHE_VERSION or \
+           entry.get('path') != scene_path or entry.get('size') != size or entry.get('mtime') != mtime:
+            return None
+
+        with self._lock:
+            self._entries[scene_path] = entry
+
+        return MayaAsciiScan.from_dict(entry)
+
+    def store(self, scene_path, scan, stat=None):
+        '''
+        Cache the scan of the scene.
+
+        :param stat: The size and mtime of the scene when it was scanned.
+                     Defaults to the current ones
+        :type stat: tuple of (int, float)
+        '''
+
+        scene_path = os.path.abspath(scene_path)
+        size, mtime = stat or self._stat(scene_path)
+
+        entry = dict(scan.as_dict(), version=CACHE_VERSION, path=scene_path, size=size, mtime=mtime)
+
+        with self._lock:
+            self._entries[scene_path] = entry
+
+        if not self.path:
+            return
+
+        try:
+            if not os.path.exists(self.path):
+                os.makedirs(self.path)
+
+            # Write to a temporary file first so a reader never sees half an entry
+            entry_path = self._get_entry_path(scene_path)
+            temp_path = "{}.{}.tmp".format(entry_path, os.getpid())
+
+            with open(temp_path, 'w') as fh:
+                json.dump(entry, fh)
+
+            os.replace(temp_path, entry_path)
+
+        except (IOError, OSError) as errMsg:
+            LOG.warning("Unable to cache the scan of '{}': {}".format(scene_path, errMsg))
+
+    def clear(self):
+        '''
+        Forget every entry, in memory and on disk
+        '''
+
+        with self._lock:
+            self._entries = {}
+
+        if self.path and os.path.isdir(self.path):
+            for name in os.listdir(self.path):
+                if name.endswith(".json"):
+                    os.remove(os.path.join(self.path, name))
+
+
+_CACHE = None
+_CACHE_LOCK = threading.Lock()
+
+
+def get_cache():
+    '''
+    Get the process-wide scan cache
+    '''
+
+    global _CACHE
+
+    with _CACHE_LOCK:
+        if _CACHE is None:
+            _CACHE = ScanCache()
+
+        return _CACHE
+
+
+def get_string_values(statement):
+    '''
+    Get the unescaped strings of a MEL statement, leaving out the value of
+    any -type flag
+
+    :rtype: list of str
+    '''
+
+    statement = _TYPE_FLAG.sub("", statement)
+
+    return [_ESCAPE.sub(lambda match: _ESCAPES.get(match.group(1), match.group(1)), value)
+            for value in _QUOTED.findall(statement)]
+
+
+def scan(scene_path, cache=None):
+    '''
+    Get the raw paths and references of a scene, from the cache if it hasn't
+    changed since it was last scanned
+
+    :param cache: Defaults to the process-wide cache (see get_cache())
+    :type cache: :py:class:`~ScanCache`
+
+    :raises: :py:class:`~MayaAsciiError` if the scene can't be read
+
+    :rtype: :py:class:`~MayaAsciiScan`
+    '''
+
+    cache = cache or get_cache()
+
+    try:
+        cached = cache.get(scene_path)
+
+        if cached is not None:
+            LOG.debug("Using the cached scan of '{}'".format(scene_path))
+            return cached
+
+        stat = cache._stat(os.path.abspath(scene_path))
+        result = MayaAsciiReader(scene_path).scan()
+
+    except (IOError, OSError) as errMsg:
+        raise MayaAsciiError("Unable to read the Maya scene '{}': {}".format(scene_path, errMsg))
+
+    cache.store(scene_path, result, stat=stat)
+
+    return result
+
+
+class _DirectoryIndex(object):
+    '''
+    Match paths with tokens against the files on disk. Each directory is only
+    listed once, however many paths are matched in it.
+    '''
+
+    def __init__(self):
+        self._listings = {}
+
+    def _list(self, directory):
+
+        names = self._listings.get(directory)
+
+        if names is None:
+            try:
+                names = sorted(os.listdir(directory))
+
+            except OSError:
+                names = []
+
+            self._listings[directory] = names
+
+        return names
+
+    def match(self, path):
+        '''
+        Get the files that match a path with tokens (ex: texture.<UDIM>.exr)
+
+        :rtype: list of str
+        '''
+
+        directory, name = os.path.split(path)
+
+        # Rare enough not to be worth indexing
+        if _TOKENS.search(directory):
+            return sorted(glob.glob(_TOKENS.sub("*", glob.escape(path))))
+
+        pattern = re.compile(".+".join([re.escape(part) for part in _TOKENS.split(name)]) + "$")
+        prefix = name[:_TOKENS.search(name).start()]
+
+        names = self._list(directory)
+        matches = []
+
+        # Only the names that start like the path need to be matched
+        for index in range(bisect.bisect_left(names, prefix), len(names)):
+
+            if not names[index].startswith(prefix):
+                break
+
+            if pattern.match(names[index]):
+                matches.append(os.path.join(directory, names[index]))
+
+        return matches
+
+
+def resolve_path(path, search_paths, index=None):
+    '''
+    Get the files on disk for a path from a scene. Environment variables are
+    expanded, relative paths are looked for in each of the search paths and
+    tokens (ex: <UDIM>, ####) are matched against the files on disk.
+
+    :param search_paths: The directories to resolve relative paths from (ex:
+                         the project and the scene's directory)
+    :type search_paths: list of str
+
+    :returns: The existing files. Empty if none were found
+    :rtype: list of str
+    '''
+
+    index = index or _DirectoryIndex()
+    path = os.path.expandvars(path)
+
+    if os.path.isabs(path) or _DRIVE.match(path):
+        candidates = [path]
+    else:
+        candidates = [os.path.join(search_path, path) for search_path in search_paths if search_path]
+
+    for candidate in candidates:
+
+        if _TOKENS.search(candidate):
+            matches = index.match(candidate)
+
+            if matches:
+                return matches
+
+        elif os.path.exists(candidate):
+            return [candidate]
+
+    return []
+
+
+def collect_dependencies(scene_path, project_path=None, cache=None, recursive=True):
+    '''
+    Get the files a Maya ASCII scene depends on: its textures, images,
+    stand-ins, Alembic caches and references. The dependencies of referenced
+    Maya ASCII scenes are included.
+
+    Paths that can't be found on disk are left out, with a warning.
+
+    :param scene_path: The path to the scene
+    :type scene_path: str
+
+    :param project_path: The Maya project relative paths are resolved from,
+                         before the scene's directory
+    :type project_path: str
+
+    :param cache: Defaults to the process-wide cache (see get_cache())
+    :type cache: :py:class:`~ScanCache`
+
+    :param recursive: Whether to scan referenced scenes
+    :type recursive: bool
+
+    :raises: :py:class:`~MayaAsciiError` if the scene can't be read
+
+    :rtype: list of str
+    '''
+
+    dependencies = []
+    seen = set()
+    missing = []
+    scanned = set()
+    pending = [scene_path]
+    index = _DirectoryIndex()
+
+    while pending:
+
+        current_path = pending.pop(0)
+        scanned.add(os.path.abspath(current_path))
+
+        try:
+            result = scan(current_path, cache=cache)
+
+        except MayaAsciiError as errMsg:
+
+            # A broken reference shouldn't stop the scene from being scanned
+            if current_path == scene_path:
+                raise
+
+            LOG.warning(errMsg)
+            continue
+
+        search_paths = [project_path, os.path.dirname(current_path)]
+
+        for raw_path in result.references + result.paths:
+
+            resolved_paths = resolve_path(raw_path, search_paths, index=index)
+
+            if not resolved_paths:
+                missing.append(raw_path)
+                continue
+
+            for resolved_path in resolved_paths:
+
+                if resolved_path in seen:
+                    continue
+
+                seen.add(resolved_path)
+                dependencies.append(resolved_path)
+
+                if recursive and raw_path in result.references and resolved_path.lower().endswith(".ma") and \
+                   os.path.abspath(resolved_path) not in scanned:
+                    pending.append(resolved_path)
+
+    if missing:
+        LOG.warning("{} dependencies of '{}' weren't found on disk: {}".format(
+            len(missing), scene_path, ", ".join(missing[:10]) + (", ..." if len(missing) > 10 else "")))
+
+    LOG.info("Found {} dependencies for '{}'".format(len(dependencies), scene_path))
+
+    return dependencies
+
+
+def _is_complete(statement):
+    '''
+    Whether the statement is complete. A ';' inside a string doesn't end it.
+    '''
+
+    stripped = statement.rstrip()
+
+    # A quote left once the strings are removed means the statement ends
+    # inside a string
+    return stripped.endswith(";") and '"' not in _QUOTED.sub("", stripped)
@@ -0,0 +1,437 @@
+'''
+A persistent cache of the md5 of files that have been uploaded to Conductor.
+
+Entries are keyed by the absolute path of the file and by where it was
+uploaded to (the Conductor account, project and location, see
+upload_scope()), and are only valid while the file's size, mtime and inode
+are unchanged. When a job is submitted with local_upload, files that have a
+valid entry for the job's account, project and location are neither hashed
+nor checked against Conductor again. If the account can't be read from the
+Conductor credentials, the cache isn't used.
+
+The cache can be inspected and pruned from the command line:
+
+    python -m conductor_job.md5_cache inspect [<path> ...]
+    python -m conductor_job.md5_cache prune [--max-age DAYS] [--max-entries N]
+    python -m conductor_job.md5_cache clear
+'''
+
+import argparse
+import json
+import logging
+import os
+import sqlite3
+import sys
+import threading
+import time
+
+import ciocore.api_client
+import ciocore.conductor_submit as conductor_submit
+
+LOG = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".conductor", "deadline_md5_cache.sqlite")
+DEFAULT_MAX_AGE = 7 * 24 * 60 * 60
+DEFAULT_MAX_ENTRIES = 2000000
+
+# SQLite's default limit on the number of parameters in a query is 999
+_QUERY_BATCH_SIZE = 500
+
+
+def get_account_id():
+    '''
+    Get the id of the Conductor account the credentials are for. Every
+    account signs in through the same url, so it's read from the bearer
+    token.
+
+    :returns: The account id or None if there are no credentials
+    :rtype: str
+    '''
+
+    try:
+        token = ciocore.api_client.get_bearer_token()
+
+        if not token:
+            return None
+
+        account_id = ciocore.api_client.account_id_from_jwt(token)
+
+    except Exception as errMsg:
+        LOG.warning("Unable to read the Conductor account from the credentials: {}".format(errMsg))
+        return None
+
+    return str(account_id) if account_id else None
+
+
+def upload_scope(project, location, account=None):
+    '''
+    Get the scope an upload is cached under. A file uploaded for one account,
+    project or location isn't known to have been uploaded for another.
+
+    :param account: The Conductor account id. Defaults to the account of the
+                    credentials (see get_account_id())
+    :type account: str
+
+    :returns: The scope or None if the account isn't known
+    :rtype: str
+    '''
+
+    if account is None:
+        account = get_account_id()
+
+    if not account:
+        return None
+
+    return "|".join([str(account), str(project or ""), str(location or "")])
+
+
+class FileHashCache(object):
+    '''
+    A SQLite backed cache of file md5s.
+
+    :param path: The path to the database. Defaults to $CONDUCTOR_DEADLINE_MD5_CACHE
+                 or ~/.conductor/deadline_md5_cache.sqlite
+    :type path: str
+
+    :param max_age: Entries that haven't been uploaded or used in this many
+                    seconds are ignored and pruned. Defaults to
+                    $CONDUCTOR_DEADLINE_MD5_CACHE_MAX_AGE or 7 days
+    :type max_age: int
+
+    :param max_entries: The maximum number of entries kept when pruning
+    :type max_entries: int
+    '''
+
+    def __init__(self, path=None, max_age=None, max_entries=None):
+
+        if path is None:
+            path = os.environ.get("CONDUCTOR_DEADLINE_MD5_CACHE", DEFAULT_CACHE_PATH)
+
+        if max_age is None:
+            max_age = int(os.environ.get("CONDUCTOR_DEADLINE_MD5_CACHE_MAX_AGE", DEFAULT_MAX_AGE))
+
+        self.path = path
+        self.max_age = max_age
+        self.max_entries = max_entries or DEFAULT_MAX_ENTRIES
+
+        self._lock = threading.Lock()
+        self._connection = None
+
+    def _connect(self):
+
+        if self._connection is None:
+
+            cache_dir = os.path.dirname(self.path)
+            if cache_dir and not os.path.exists(cache_dir):
+                os.makedirs(cache_dir)
+
+            self._connection = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+
+            # Entries from before uploads were scoped can't tell where the
+            # file was uploaded to
+            columns = [row[1] for row in self._connection.execute("PRAGMA table_info(files)")]
+
+            if columns and "scope" not in columns:
+                LOG.info("Clearing the md5 cache '{}' since its entries aren't scoped".format(self.path))
+                self._connection.execute("DROP TABLE files")
+
+            self._connection.execute("CREATE TABLE IF NOT EXISTS files ("
+                                     "scope TEXT NOT NULL DEFAULT '', "
+                                     "path TEXT, "
+                                     "size INTEGER, "
+                                     "mtime REAL, "
+                                     "inode INTEGER, "
+                                     "md5 TEXT, "
+                                     "uploaded_at REAL, "
+                                     "last_used REAL, "
+                                     "PRIMARY KEY (scope, path))")
+            self._connection.execute("CREATE INDEX IF NOT EXISTS files_last_used ON files (last_used)")
+            self._connection.commit()
+
+        return self._connection
+
+    def close(self):
+
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    @staticmethod
+    def _stat(path):
+
+        try:
+            file_stat = os.stat(path)
+
+        except OSError:
+            return None
+
+        return (file_stat.st_size, file_stat.st_mtime, file_stat.st_ino)
+
+    def lookup(self, paths, scope=""):
+        '''
+        Get the md5 of every given file that has been uploaded and hasn't
+        changed since.
+
+        :param paths: The absolute paths of the files
+        :type paths: list of str
+
+        :param scope: Where the files were uploaded to (see upload_scope())
+        :type scope: str
+
+        :returns: The md5 for every path that has a valid entry
+        :rtype: dict
+        '''
+
+        stats = {}
+        for path in paths:
+            file_stat = self._stat(path)
+            if file_stat is not None:
+                stats[path] = file_stat
+
+        if not stats:
+            return {}
+
+        now = time.time()
+        min_uploaded_at = now - self.max_age
+        found = {}
+
+        with self._lock:
+            connection = self._connect()
+            stat_paths = list(stats)
+
+            for start in range(0, len(stat_paths), _QUERY_BATCH_SIZE):
+                batch = stat_paths[start:start+_QUERY_BATCH_SIZE]
+                rows = connection.execute("SELECT path, size, mtime, inode, md5 FROM files "
+                                          "WHERE scope = ? AND uploaded_at >= ? AND path IN ({})".format(",".join("?"*len(batch))),
+                                          [scope, min_uploaded_at] + batch)
+
+                for path, size, mtime, inode, md5 in rows:
+                    if stats[path] == (size, mtime, inode):
+                        found[path] = md5
+
+            found_paths = list(found)
+            for start in range(0, len(found_paths), _QUERY_BATCH_SIZE):
+                batch = found_paths[start:start+_QUERY_BATCH_SIZE]
+                connection.execute("UPDATE files SET last_used = ? WHERE scope = ? AND path IN ({})".format(",".join("?"*len(batch))),
+                                   [now, scope] + batch)
+
+            connection.commit()
+
+        return found
+
+    def store(self, md5s, uploaded=True, scope=""):
+        '''
+        Record the md5 of files.
+
+        :param md5s: The md5 of every file, keyed by its absolute path
+        :type md5s: dict
+
+        :param uploaded: Whether the files are known to have been uploaded
+        :type uploaded: bool
+
+        :param scope: Where the files were uploaded to (see upload_scope())
+        :type scope: str
+        '''
+
+        now = time.time()
+        rows = []
+
+        for path, md5 in md5s.items():
+            file_stat = self._stat(path)
+
+            if md5 and file_stat is not None:
+                rows.append((scope, path) + file_stat + (md5, now if uploaded else None, now))
+
+        if not rows:
+            return
+
+        with self._lock:
+            connection = self._connect()
+            connection.executemany("INSERT OR REPLACE INTO files (scope, path, size, mtime, inode, md5, uploaded_at, last_used) "
+                                   "VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            connection.commit()
+
+    def prune(self, max_age=None, max_entries=None):
+        '''
+        Remove entries that haven't been used in max_age seconds and, if there
+        are still more than max_entries, the least recently used ones.
+
+        :returns: The number of entries removed
+        :rtype: int
+        '''
+
+        if max_age is None:
+            max_age = self.max_age
+
+        if max_entries is None:
+            max_entries = self.max_entries
+
+        with self._lock:
+            connection = self._connect()
+            removed = connection.execute("DELETE FROM files WHERE last_used < ?", (time.time() - max_age,)).rowcount
+            removed += connection.execute("DELETE FROM files WHERE rowid NOT IN "
+                                          "(SELECT rowid FROM files ORDER BY last_used DESC LIMIT ?)", (max_entries,)).rowcount
+            connection.commit()
+
+        LOG.debug("Pruned {} entries from the md5 cache '{}'".format(removed, self.path))
+
+        return removed
+
+    def clear(self):
+        '''
+        Remove every entry
+        '''
+
+        with self._lock:
+            connection = self._connect()
+            connection.execute("DELETE FROM files")
+            connection.commit()
+            connection.execute("VACUUM")
+
+    def entries(self, paths):
+        '''
+        Get the raw entries for the given paths, in every scope
+
+        :rtype: list of dict
+        '''
+
+        keys = ("scope", "path", "size", "mtime", "inode", "md5", "uploaded_at", "last_used")
+        entries = []
+
+        with self._lock:
+            connection = self._connect()
+            for start in range(0, len(paths), _QUERY_BATCH_SIZE):
+                batch = list(paths[start:start+_QUERY_BATCH_SIZE])
+                rows = connection.execute("SELECT {} FROM files WHERE path IN ({})".format(", ".join(keys), ",".join("?"*len(batch))),
+                                          batch)
+                entries.extend([dict(zip(keys, row)) for row in rows])
+
+        return entries
+
+    def stats(self):
+        '''
+        Get a summary of the cache
+
+        :rtype: dict
+        '''
+
+        with self._lock:
+            connection = self._connect()
+            count, uploaded, total_size, oldest, newest = connection.execute(
+                "SELECT COUNT(*), COUNT(uploaded_at), SUM(size), MIN(last_used), MAX(last_used) FROM files").fetchone()
+
+        return {"path": self.path,
+                "entries": count,
+                "uploaded_entries": uploaded,
+                "total_file_size": total_size or 0,
+                "oldest_use": oldest,
+                "newest_use": newest,
+                "database_size": os.path.getsize(self.path) if os.path.exists(self.path) else 0}
+
+
+class CachedSubmit(conductor_submit.Submit):
+    '''
+    A :py:class:`~ciocore.conductor_submit.Submit` that skips the files the
+    md5 cache knows have already been uploaded to the job's account, project
+    and location, and records the md5 of the files it uploads.
+
+    :param scope: Where the files are uploaded to. Defaults to the
+                  upload_scope() of the job's project and location. If
+                  there's none, every file is hashed and checked as usual
+    :type scope: str
+    '''
+
+    def __init__(self, args, hash_cache=None, scope=None):
+
+        super(CachedSubmit, self).__init__(args)
+        self.hash_cache = hash_cache or get_cache()
+
+        if scope is None:
+            scope = upload_scope(self.payload["project"], self.payload["location"])
+
+        self.scope = scope
+
+    def _handle_local_upload(self, file_map):
+
+        # Without the account, a file uploaded by someone else would look
+        # like it had been uploaded for this job
+        if self.scope is None:
+            LOG.info("Not using the md5 cache since the Conductor account isn't known")
+            return super(CachedSubmit, self)._handle_local_upload(file_map)
+
+        cached_md5s = self.hash_cache.lookup(list(file_map), scope=self.scope)
+        remaining_file_map = {path: md5 for path, md5 in file_map.items() if path not in cached_md5s}
+
+        LOG.info("{} of {} files are unchanged since they were uploaded".format(len(cached_md5s), len(file_map)))
+
+        if remaining_file_map:
+            remaining_file_map = super(CachedSubmit, self)._handle_local_upload(remaining_file_map)
+            self.hash_cache.store(remaining_file_map, uploaded=True, scope=self.scope)
+
+        file_map.update(cached_md5s)
+        file_map.update(remaining_file_map)
+
+        return file_map
+
+
+_CACHE = None
+_CACHE_LOCK = threading.Lock()
+
+
+def get_cache():
+    '''
+    Get the process-wide :py:class:`~FileHashCache`
+    '''
+
+    global _CACHE
+
+    with _CACHE_LOCK:
+        if _CACHE is None:
+            _CACHE = FileHashCache()
+
+        return _CACHE
+
+
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(prog="conductor_job.md5_cache",
+                                     description="Inspect or prune the Conductor md5 cache")
+    parser.add_argument("--cache", help="The path to the cache database")
+    subparsers = parser.add_subparsers(dest="command")
+    subparsers.required = True
+
+    inspect_parser = subparsers.add_parser("inspect", help="Show a summary of the cache or the entries for the given paths")
+    inspect_parser.add_argument("paths", nargs="*")
+
+    prune_parser = subparsers.add_parser("prune", help="Remove old entries")
+    prune_parser.add_argument("--max-age", type=float, help="Remove entries not used in this many days")
+    prune_parser.add_argument("--max-entries", type=int, help="Keep at most this many entries")
+
+    subparsers.add_parser("clear", help="Remove every entry")
+
+    args = parser.parse_args(argv)
+    hash_cache = FileHashCache(args.cache)
+
+    if args.command == "inspect":
+        if args.paths:
+            result = hash_cache.entries([os.path.abspath(path) for path in args.paths])
+        else:
+            result = hash_cache.stats()
+
+    elif args.command == "prune":
+        max_age = args.max_age * 24 * 60 * 60 if args.max_age is not None else None
+        result = {"removed": hash_cache.prune(max_age=max_age, max_entries=args.max_entries)}
+
+    else:
+        hash_cache.clear()
+        result = {"cleared": hash_cache.path}
+
+    json.dump(result, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,11 +1,16 @@
 import logging
 
+import cioseq.sequence
+
 from . import job
+from . import scout
 
 LOG = logging.getLogger(__name__)
 
 class NukeRenderJob(job.Job):
     
+        COMMAND_TEMPLATE = "{cmd} -x {write_node_args}-F {start_frame}-{end_frame}x{frame_step} {extra_args} {scene_path} {argv}"
+    
         def __init__(self, scene_path=None, *args , **kwargs):
             
             super(NukeRenderJob, self).__init__(*args, **kwargs)
@@ -17,43 +22,121 @@ class NukeRenderJob(job.Job):
             self.pre_task_cmd = ""
             self.post_task_cmd = ""
             self.post_job_cmd = None
-            self.chunk_size = None
             self.argv = ""
-
-        def _get_task_data(self):
-
-            task_data = []
+            self.frames = None
+            self.start_frame = None
+            self.end_frame = None
+            self.frame_step = 1
             
-            frames = range(self.start_frame, self.end_frame+1)
+            # The Write nodes to render. If split_write_nodes is True, every
+            # Write node is rendered by a Conductor job of its own, otherwise
+            # each task renders all of them
+            self.write_nodes = []
+            self.split_write_nodes = False
             
-            if self.chunk_size is None:
-                self.chunk_size =  len(frames)
-
-            LOG.debug("Using a chunk size of {}".format(self.chunk_size))
-            LOG.debug("Frames: {}".format(frames))
-
-            for start in range(0, len(frames), self.chunk_size):
-                chunk_frames = frames[start:start+self.chunk_size]
-                start_frame = chunk_frames[0]
-                end_frame = chunk_frames[-1]
-                
-                command_args = {'cmd': self.cmd,
-                                'start_frame': start_frame,
-                                'end_frame': end_frame,
-                                'frame_step': self.frame_step,
-                                'scene_path': self.scene_path,
-                                'extra_args': self.additional_cmd_args,
-                                'argv': self.argv,
-                                'pre_task_cmd': self.pre_task_cmd,
-                                'post_cmd': self.post_task_cmd}
-                
-                task_data.append({"frames": "{}-{}".format(start_frame, end_frame),
-                                  "command": "{pre_task_cmd}; {cmd} -x -F {start_frame}-{end_frame}x{frame_step} {extra_args} {scene_path} {argv} && {post_cmd}".format(**command_args)})
+            # The range of tasks of each Write node (see get_task_groups())
+            self._task_groups = None
+            
+        def validate_job(self):
+            
+            if not self.frames and (self.start_frame is None or self.end_frame is None):
+                raise job.JobError("NukeRenderJob needs either frames or a start_frame and end_frame")
+            
+            # The post-job task can only wait for the tasks of its own job
+            if self.post_job_cmd is not None and self.split_write_nodes and len(self.write_nodes) > 1:
+                raise job.JobError("NukeRenderJob can't have a post-job command when the Write nodes are split")
+            
+        def _compile_command_template(self, write_nodes):
+            '''
+            Build the task command with everything that's the same for every
+            task already filled in. Only the {start_frame}, {end_frame} and
+            {frame_step} placeholders are left.
+            '''
+            
+            def escape(value):
+                return str(value).replace("{", "{{").replace("}", "}}")
+            
+            write_node_args = ""
+            if write_nodes:
+                write_node_args = "-X {} ".format(escape(",".join(write_nodes)))
+            
+            command_args = {'cmd': escape(self.cmd),
+                            'write_node_args': write_node_args,
+                            'start_frame': '{start_frame}',
+                            'end_frame': '{end_frame}',
+                            'frame_step': '{frame_step}',
+                            'scene_path': escape(self.scene_path),
+                            'extra_args': escape(self.additional_cmd_args),
+                            'argv': escape(self.argv)}
+            
+            command_template = self.COMMAND_TEMPLATE.format(**command_args)
+            
+            if self.pre_task_cmd:
+                command_template = "{}; {}".format(escape(self.pre_task_cmd), command_template)
                 
+            if self.post_task_cmd:
+                command_template += " && {}".format(escape(self.post_task_cmd))
+                
+            return command_template
+        
+        def iter_task_data(self):
+            '''
+            Generate the data for each task. The frames are split into chunks
+            that are each an arithmetic progression and, if split_write_nodes
+            is set, every Write node has a task for each chunk. Conductor
+            tells the tasks of a job apart by their frames, so the tasks of
+            each Write node are submitted as a job of their own (see
+            get_task_groups()).
+            
+            :rtype: generator of dict
+            '''
+            
+            if not self.frames:
+                self.frames = cioseq.sequence.Sequence.create(self.start_frame, self.end_frame, self.frame_step)
+                
+            LOG.debug("Frames: {}".format(self.frames))
+            
+            if self.split_write_nodes and self.write_nodes:
+                command_templates = [self._compile_command_template([write_node]) for write_node in self.write_nodes]
+            else:
+                command_templates = [self._compile_command_template(self.write_nodes)]
+                
+            chunks = self.get_frame_chunks(self.frames)
+            self._task_groups = []
+            
+            for command_template in command_templates:
+                
+                start = len(chunks) * len(self._task_groups)
+                self._task_groups.append((start, start + len(chunks)))
+                
+                for chunk in chunks:
+                    yield {"frames": str(chunk),
+                           "command": command_template.format(start_frame=chunk.start,
+                                                              end_frame=chunk.end,
+                                                              frame_step=chunk.step)}
+                
+            # With a post-job task, every frame is a scout frame by default so
+            # the post-job task is held until the frames have rendered
             if self.post_job_cmd is not None:
-                task_data.append({"frames": "999999", 
-                                  "command": self.post_job_cmd})
+                self.scout_frames = self.get_scout_frames(self.frames, default_policy=scout.ALL)
+                self._task_groups[-1] = (self._task_groups[-1][0], self._task_groups[-1][1] + 1)
                 
-                self.scout_frames = ",".join([str(f) for f in frames])
+                yield {"frames": "999999", 
+                       "command": self.post_job_cmd}
                 
-            return task_data
\ No newline at end of file
+            elif self.scout_policy:
+                self.scout_frames = self.get_scout_frames(self.frames)
+                
+        def get_task_groups(self):
+            '''
+            Every Write node that's split is submitted as a job of its own
+            since its tasks have the same frames as the other Write nodes'
+            '''
+            
+            if self._task_groups is None or len(self._task_groups) < 2:
+                return None
+            
+            return list(self._task_groups)
+
+        def _get_task_data(self):
+            return list(self.iter_task_data())
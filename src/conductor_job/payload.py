@@ -0,0 +1,252 @@
+'''
+Split oversized job submissions.
+
+Every task, the environment and the upload manifest are sent to Conductor in
+a single JSON body. For jobs with a very large number of tasks, this body
+can grow to tens of MB, which is slow to serialise, send and accept.
+
+The PayloadPlanner measures a job's payload and, when it's over the limits,
+splits the tasks into contiguous ranges, one Conductor job per range. Every
+part carries the same upload manifest. The files are only uploaded by the
+first part, and the other parts re-use its manifest (see share_manifest()).
+
+The limits can be set with $CONDUCTOR_DEADLINE_MAX_PAYLOAD_MB and
+$CONDUCTOR_DEADLINE_MAX_TASKS_PER_JOB (0 means no limit).
+'''
+
+import json
+import logging
+import os
+import uuid
+
+import cioseq.sequence
+
+LOG = logging.getLogger(__name__)
+
+DEFAULT_MAX_PAYLOAD_MB = 8
+DEFAULT_MAX_TASKS = 0
+
+# Each upload path becomes an entry with its md5 and stats in the payload
+# once the files have been processed
+UPLOAD_FILE_OVERHEAD = 300
+
+# Room for the part number in the title and metadata
+PART_OVERHEAD = 256
+
+SPLIT_GROUP_KEY = "deadline_split_group"
+SPLIT_PART_KEY = "deadline_split_part"
+
+
+class PayloadPlanner(object):
+    '''
+    :param max_bytes: The largest payload, in bytes. 0 means no limit
+    :type max_bytes: int
+
+    :param max_tasks: The most tasks in a single job. 0 means no limit
+    :type max_tasks: int
+    '''
+
+    def __init__(self, max_bytes=None, max_tasks=None):
+
+        if max_bytes is None:
+            max_bytes = int(float(os.environ.get("CONDUCTOR_DEADLINE_MAX_PAYLOAD_MB", DEFAULT_MAX_PAYLOAD_MB)) * 1024 * 1024)
+
+        if max_tasks is None:
+            max_tasks = int(os.environ.get("CONDUCTOR_DEADLINE_MAX_TASKS_PER_JOB", DEFAULT_MAX_TASKS))
+
+        self.max_bytes = max_bytes
+        self.max_tasks = max_tasks
+
+        # The measured size of the last payload that was planned. It's only
+        # measured when there's a size limit
+        self.payload_size = None
+
+    def measure(self, data):
+        '''
+        Get the estimated size of the payload for the given data, in bytes.
+        The upload manifest is estimated from the number of upload paths.
+
+        :rtype: int
+        '''
+
+        return len(json.dumps(data)) + len(data.get('upload_paths') or []) * UPLOAD_FILE_OVERHEAD
+
+    def get_ranges(self, data):
+        '''
+        Get the ranges of tasks of each part
+
+        :returns: The start and end (exclusive) index of the tasks of each part
+        :rtype: list of tuple of (int, int)
+        '''
+
+        tasks = data.get('tasks_data') or []
+        task_count = len(tasks)
+
+        self.payload_size = self.measure(data) if self.max_bytes else None
+
+        over_tasks = self.max_tasks and task_count > self.max_tasks
+        over_bytes = self.max_bytes and self.payload_size > self.max_bytes
+
+        if not (over_tasks or over_bytes):
+            return [(0, task_count)]
+
+        budget = None
+
+        if over_bytes:
+
+            base_data = dict(data, tasks_data=[])
+            budget = self.max_bytes - self.measure(base_data) - PART_OVERHEAD
+
+            # Splitting the tasks won't help if the rest of the payload
+            # doesn't fit on its own
+            if budget <= 0:
+                LOG.warning("The payload without any tasks is already {:.1f}MB. The tasks won't be split by size".format(
+                    self.measure(base_data) / (1024.0 * 1024)))
+                budget = None
+
+        ranges = []
+        start = 0
+        size = 0
+
+        for index, task in enumerate(tasks):
+
+            # +2 for the ', ' separator
+            task_size = len(json.dumps(task)) + 2
+
+            full = (self.max_tasks and index - start >= self.max_tasks) or \
+                   (budget is not None and index > start and size + task_size > budget)
+
+            if full:
+                ranges.append((start, index))
+                start = index
+                size = 0
+
+            size += task_size
+
+        ranges.append((start, task_count))
+
+        return ranges
+
+    def plan(self, data, groups=None):
+        '''
+        Split the data of a job into one or more parts.
+
+        Each part is a copy of the data with a contiguous range of the tasks.
+        The frame range and scout frames only cover the part's tasks, and the
+        title and metadata say which part it is.
+
+        :param data: The submission data of the job
+        :type data: dict
+
+        :param groups: The ranges of tasks that must be in parts of their own
+                       (ex: tasks that have the same frames), as the start and
+                       end (exclusive) index of each group. Each group is
+                       split further if it's over the limits
+        :type groups: list of tuple of (int, int)
+
+        :returns: The data of every part
+        :rtype: list of dict
+        '''
+
+        if groups:
+            tasks = data.get('tasks_data') or []
+            ranges = []
+
+            for group_start, group_end in groups:
+                group_data = dict(data, tasks_data=tasks[group_start:group_end])
+                ranges.extend([(group_start + start, group_start + end) for start, end in self.get_ranges(group_data)])
+
+            self.payload_size = self.measure(data) if self.max_bytes else None
+
+        else:
+            ranges = self.get_ranges(data)
+
+        if len(ranges) == 1:
+            return [data]
+
+        group_id = uuid.uuid4().hex[:12]
+        tasks = data['tasks_data']
+        parts = []
+
+        LOG.info("Splitting the job into {} parts of at most {} tasks".format(len(ranges),
+                                                                            max([end - start for start, end in ranges])))
+
+        for number, (start, end) in enumerate(ranges, 1):
+
+            part = dict(data)
+            part['tasks_data'] = tasks[start:end]
+            part['job_title'] = "{} [{}/{}]".format(data.get('job_title') or "", number, len(ranges)).strip()
+
+            part['metadata'] = dict(data.get('metadata') or {})
+            part['metadata'][SPLIT_GROUP_KEY] = group_id
+            part['metadata'][SPLIT_PART_KEY] = "{}/{}".format(number, len(ranges))
+
+            frames = get_frames(part['tasks_data'])
+
+            if frames is not None:
+
+                if data.get('frame_range'):
+                    part['frame_range'] = intersect_frames(data['frame_range'], frames)
+
+                if data.get('scout_frames'):
+                    part['scout_frames'] = intersect_frames(data['scout_frames'], frames)
+
+            parts.append(part)
+
+        return parts
+
+
+def get_frames(tasks):
+    '''
+    Get the frames covered by the given tasks
+
+    :returns: The frames or None if the tasks don't have frames
+    :rtype: :py:class:`~cioseq.sequence.Sequence`
+    '''
+
+    specs = [str(task.get('frames')) for task in tasks if task.get('frames') not in (None, "")]
+
+    if not specs:
+        return None
+
+    try:
+        return cioseq.sequence.Sequence.create(",".join(specs))
+
+    except (TypeError, ValueError):
+        return None
+
+
+def intersect_frames(spec, frames):
+    '''
+    Get the frames of the spec (ex: the scout frames) that are in the given
+    frames. A spec that isn't a frame sequence is returned as is.
+
+    :rtype: str
+    '''
+
+    try:
+        sequence = cioseq.sequence.Sequence.create(str(spec))
+
+    except (TypeError, ValueError):
+        return spec
+
+    intersection = sequence.intersection(frames)
+
+    return str(intersection) if intersection else ""
+
+
+def share_manifest(source, submitter):
+    '''
+    Make the submitter send the upload manifest of a submitter that has
+    already run, rather than processing and uploading the files again.
+
+    :param source: A submitter that has run
+    :type source: :py:class:`~ciocore.conductor_submit.Submit`
+
+    :param submitter: The submitter to send the same files
+    :type submitter: :py:class:`~ciocore.conductor_submit.Submit`
+    '''
+
+    submitter.upload_paths = []
+    submitter.payload['upload_files'] = list(source.payload['upload_files'])
+    submitter.payload['upload_size'] = source.payload['upload_size']
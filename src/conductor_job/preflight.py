@@ -0,0 +1,228 @@
+'''
+Checks run on a job before anything is uploaded or submitted.
+
+The checks run in parallel: the upload paths are checked on a thread pool
+while the software packages and instance type are checked against the
+catalog. Everything must finish within a time budget; anything still running
+when it runs out is reported as a warning rather than holding up the
+submission.
+'''
+
+import concurrent.futures
+import glob
+import logging
+import os
+import time
+
+from . import catalog
+
+LOG = logging.getLogger(__name__)
+
+DEFAULT_TIME_BUDGET = 30
+DEFAULT_MAX_WORKERS = 16
+
+# The number of paths checked by each task on the thread pool
+_PATH_BATCH_SIZE = 256
+
+ERROR = "error"
+WARNING = "warning"
+
+
+class PreflightIssue(object):
+    '''
+    A single problem found by a check
+    '''
+
+    def __init__(self, check, severity, message, subject=None):
+
+        self.check = check
+        self.severity = severity
+        self.message = message
+        self.subject = subject
+
+    def as_dict(self):
+
+        return {"check": self.check,
+                "severity": self.severity,
+                "message": self.message,
+                "subject": self.subject}
+
+    def __str__(self):
+        return "[{}] {}: {}".format(self.severity, self.check, self.message)
+
+
+class PreflightReport(object):
+    '''
+    The result of running the pre-flight checks on a job
+    '''
+
+    # Only this many issues of each check are shown in the summary
+    SUMMARY_LIMIT = 10
+
+    def __init__(self):
+
+        self.issues = []
+        self.checks = []
+        self.duration = 0.0
+        self.timed_out = False
+
+    @property
+    def errors(self):
+        return [issue for issue in self.issues if issue.severity == ERROR]
+
+    @property
+    def warnings(self):
+        return [issue for issue in self.issues if issue.severity == WARNING]
+
+    @property
+    def ok(self):
+        return not self.errors
+
+    def as_dict(self):
+
+        return {"ok": self.ok,
+                "checks": list(self.checks),
+                "duration": round(self.duration, 3),
+                "timed_out": self.timed_out,
+                "issues": [issue.as_dict() for issue in self.issues]}
+
+    def summary(self):
+
+        lines = ["Pre-flight: {} error(s), {} warning(s) in {:.2f}s".format(len(self.errors),
+                                                                            len(self.warnings),
+                                                                            self.duration)]
+
+        for check in self.checks:
+            check_issues = [issue for issue in self.issues if issue.check == check]
+
+            for issue in check_issues[:self.SUMMARY_LIMIT]:
+                lines.append("  {}".format(issue))
+
+            if len(check_issues) > self.SUMMARY_LIMIT:
+                lines.append("  ... and {} more {} issues".format(len(check_issues) - self.SUMMARY_LIMIT, check))
+
+        return "\n".join(lines)
+
+
+def _check_paths(paths):
+
+    issues = []
+
+    for path in paths:
+
+        if glob.has_magic(path):
+            if not glob.glob(path):
+                issues.append(PreflightIssue("upload_paths", ERROR, "No files match '{}'".format(path), path))
+
+        elif not os.path.exists(path):
+            issues.append(PreflightIssue("upload_paths", ERROR, "'{}' does not exist".format(path), path))
+
+    return issues
+
+
+def _check_software_packages(software_packages):
+
+    software_catalog = catalog.get_catalog()
+    issues = []
+
+    for package in software_packages:
+
+        if not package:
+            issues.append(PreflightIssue("software_packages", ERROR,
+                                         "A software package could not be resolved (got {!r})".format(package)))
+
+        elif software_catalog.find_by_id(package.get('package_id')) is None:
+            issues.append(PreflightIssue("software_packages", ERROR,
+                                         "The package '{}' is not available on Conductor".format(package.get('package_id')),
+                                         package.get('package_id')))
+
+    return issues
+
+
+def _check_instance_type(instance_type):
+
+    instance_types = catalog.get_instance_types()
+
+    if instance_type not in [available_type['name'] for available_type in instance_types]:
+        return [PreflightIssue("instance_type", ERROR,
+                               "The instance type '{}' is not available".format(instance_type),
+                               instance_type)]
+
+    return []
+
+
+class PreflightRunner(object):
+    '''
+    Runs the pre-flight checks on a job.
+
+    :param time_budget: The maximum number of seconds to spend on the checks.
+                        Defaults to $CONDUCTOR_DEADLINE_PREFLIGHT_BUDGET or 30
+    :type time_budget: float
+
+    :param max_workers: The size of the thread pool
+    :type max_workers: int
+    '''
+
+    def __init__(self, time_budget=None, max_workers=DEFAULT_MAX_WORKERS):
+
+        if time_budget is None:
+            time_budget = float(os.environ.get("CONDUCTOR_DEADLINE_PREFLIGHT_BUDGET", DEFAULT_TIME_BUDGET))
+
+        self.time_budget = time_budget
+        self.max_workers = max_workers
+
+    def run(self, job):
+        '''
+        Run all the checks on the given job
+
+        :param job: The job to check
+        :type job: :py:class:`~conductor_job.job.Job`
+
+        :rtype: :py:class:`~PreflightReport`
+        '''
+
+        report = PreflightReport()
+        start_time = time.time()
+
+        upload_paths = [path for path in job.get_dependencies() if path]
+
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers)
+        futures = {}
+
+        try:
+            for start in range(0, len(upload_paths), _PATH_BATCH_SIZE):
+                futures[executor.submit(_check_paths, upload_paths[start:start+_PATH_BATCH_SIZE])] = "upload_paths"
+
+            futures[executor.submit(_check_software_packages, list(job.software_packages))] = "software_packages"
+            futures[executor.submit(_check_instance_type, job.instance_type)] = "instance_type"
+
+            for check in futures.values():
+                if check not in report.checks:
+                    report.checks.append(check)
+
+            done, not_done = concurrent.futures.wait(futures, timeout=self.time_budget)
+
+            for future in done:
+
+                try:
+                    report.issues.extend(future.result())
+
+                except Exception as errMsg:
+                    report.issues.append(PreflightIssue(futures[future], ERROR,
+                                                        "The check failed: {}".format(errMsg)))
+
+            for future in not_done:
+                future.cancel()
+                report.timed_out = True
+
+            for check in sorted(set([futures[future] for future in not_done])):
+                report.issues.append(PreflightIssue(check, WARNING,
+                                                    "Not completed within the {}s time budget".format(self.time_budget)))
+
+        finally:
+            executor.shutdown(wait=False)
+
+        report.duration = time.time() - start_time
+        LOG.debug(report.summary())
+
+        return report
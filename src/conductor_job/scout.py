@@ -0,0 +1,98 @@
+'''
+Choose the scout frames of a job.
+
+Scout frames are rendered first. The rest of the tasks are held until the job
+is released, so a handful of frames can be checked before paying for the
+whole sequence. The selection is returned as a cioseq Sequence so it can be
+written in compact range notation (ex: 1-901x100) rather than as a list of
+every frame.
+
+Policies:
+
+    all          Every frame
+    none         No scout frames
+    fml          The first, middle and last frames. The value is the number of
+                 frames (default 3)
+    spaced       The value is the number of evenly spaced frames
+    nth          Every nth frame, starting with the first
+    percentage   The value is the percentage of evenly spaced frames
+'''
+
+import math
+
+import cioseq.sequence
+
+ALL = "all"
+NONE = "none"
+FIRST_MIDDLE_LAST = "fml"
+SPACED = "spaced"
+EVERY_NTH = "nth"
+PERCENTAGE = "percentage"
+
+POLICIES = (ALL, NONE, FIRST_MIDDLE_LAST, SPACED, EVERY_NTH, PERCENTAGE)
+
+DEFAULT_FML_COUNT = 3
+
+
+class ScoutPolicyError(ValueError):
+    pass
+
+
+def validate_policy(policy, value=None):
+    '''
+    Check that the policy exists and has a value that it can use
+
+    :raises: :py:class:`~ScoutPolicyError`
+    '''
+
+    if policy not in POLICIES:
+        raise ScoutPolicyError("Unknown scout policy '{}'. Must be one of: {}".format(policy, ", ".join(POLICIES)))
+
+    if policy in (SPACED, EVERY_NTH) and (value is None or int(value) < 1):
+        raise ScoutPolicyError("The '{}' scout policy needs a value of 1 or more".format(policy))
+
+    if policy == PERCENTAGE and (value is None or not 0 < float(value) <= 100):
+        raise ScoutPolicyError("The '{}' scout policy needs a value greater than 0 and up to 100".format(policy))
+
+
+def select_frames(frames, policy, value=None):
+    '''
+    Select the scout frames from the given frames.
+
+    :param frames: The frames of the job
+    :type frames: :py:class:`~cioseq.sequence.Sequence`
+
+    :param policy: One of POLICIES
+    :type policy: str
+
+    :param value: The value for the policy. See the module docstring.
+
+    :returns: The scout frames or None if there are none
+    :rtype: :py:class:`~cioseq.sequence.Sequence`
+    '''
+
+    validate_policy(policy, value)
+
+    if not frames or policy == NONE:
+        return None
+
+    if policy == ALL:
+        return frames
+
+    if policy == FIRST_MIDDLE_LAST:
+        selected = frames.calc_fml(int(value or DEFAULT_FML_COUNT))
+
+    elif policy == SPACED:
+        selected = frames.subsample(int(value))
+
+    elif policy == EVERY_NTH:
+        selected = list(frames)[::int(value)]
+
+    else:
+        selected = frames.subsample(int(math.ceil(len(frames) * float(value) / 100.0)))
+
+    # Some of the cioseq selections return a plain list of frames
+    if not isinstance(selected, cioseq.sequence.Sequence):
+        selected = cioseq.sequence.Sequence.create(list(selected))
+
+    return selected
@@ -0,0 +1,278 @@
+'''
+Read the dependency list from a Conductor dependency sidecar (.cdepends).
+
+A sidecar is a JSON object with a 'dependencies' key holding a list of paths.
+Sidecars for heavy scenes can hold hundreds of thousands of paths, many of
+them duplicates that only differ by slash direction or drive letter, so the
+list is streamed from the file rather than loaded in one go and every path
+is normalised and de-duplicated as it's read.
+'''
+
+import hashlib
+import json
+import logging
+import os
+import re
+
+import ciopath.gpath
+
+LOG = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r'\s*')
+_NUMBER_CHARACTERS = "0123456789+-.eE"
+
+
+class SidecarError(Exception):
+    pass
+
+
+class _JsonStream(object):
+    '''
+    A minimal incremental JSON tokenizer over a file handle. Only what's
+    needed to walk a top-level object and the items of an array is
+    supported. Any other value is decoded in one go.
+    '''
+
+    def __init__(self, fh, chunk_size):
+
+        self._fh = fh
+        self._chunk_size = chunk_size
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self):
+
+        if self._eof:
+            return False
+
+        chunk = self._fh.read(self._chunk_size)
+
+        if not chunk:
+            self._eof = True
+            return False
+
+        # Drop what has already been consumed so the buffer stays small
+        self._buffer = self._buffer[self._pos:] + chunk
+        self._pos = 0
+
+        return True
+
+    def peek(self):
+        '''
+        Get the next non-whitespace character without consuming it. An empty
+        string is returned at the end of the file.
+        '''
+
+        while True:
+            self._pos = _WHITESPACE.match(self._buffer, self._pos).end()
+
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+
+            if not self._fill():
+                return ""
+
+    def expect(self, character):
+
+        found = self.peek()
+
+        if found != character:
+            raise SidecarError("Expected '{}' but found '{}'".format(character, found or "end of file"))
+
+        self._pos += 1
+
+    def decode(self):
+        '''
+        Decode the next complete JSON value
+        '''
+
+        self.peek()
+
+        while True:
+
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+
+                # A number at the end of the buffer may continue in the next chunk
+                if self._eof or (end < len(self._buffer) and self._buffer[end] not in _NUMBER_CHARACTERS):
+                    self._pos = end
+                    return value
+
+            except ValueError:
+                if self._eof:
+                    raise SidecarError("Invalid JSON in sidecar")
+
+            self._fill()
+
+
+class SidecarReader(object):
+    '''
+    Stream the dependencies of a sidecar file.
+
+    Paths are normalised with :py:class:`~ciopath.gpath.Path` and only the
+    first occurrence of a path is kept. Two paths that only differ by slash
+    direction, '.'/'..' components or drive letter are considered the same.
+
+    :param path: The path to the sidecar file
+    :type path: str
+
+    :param collapse_threshold: If given, when more than this many files are in
+                               the same directory, the directory is uploaded
+                               instead of the individual files.
+    :type collapse_threshold: int
+    '''
+
+    CHUNK_SIZE = 1024 * 1024
+
+    def __init__(self, path, collapse_threshold=None, chunk_size=None):
+
+        self.path = path
+        self.collapse_threshold = collapse_threshold
+        self.chunk_size = chunk_size or self.CHUNK_SIZE
+
+        self.entry_count = 0
+        self.duplicate_count = 0
+
+    def iter_entries(self):
+        '''
+        Iterate over the raw entries of the 'dependencies' list
+        '''
+
+        with open(self.path, 'r') as fh:
+
+            stream = _JsonStream(fh, self.chunk_size)
+            stream.expect("{")
+
+            if stream.peek() == "}":
+                return
+
+            while True:
+
+                key = stream.decode()
+                stream.expect(":")
+
+                if key == "dependencies":
+
+                    if stream.peek() != "[":
+                        # null or some other value
+                        value = stream.decode()
+
+                        if value:
+                            raise SidecarError("The dependencies in '{}' are not a list".format(self.path))
+
+                        return
+
+                    stream.expect("[")
+
+                    if stream.peek() == "]":
+                        return
+
+                    while True:
+                        yield stream.decode()
+
+                        if stream.peek() == "]":
+                            return
+
+                        stream.expect(",")
+
+                # Skip over anything else
+                stream.decode()
+
+                if stream.peek() == "}":
+                    return
+
+                stream.expect(",")
+
+    def iter_paths(self):
+        '''
+        Iterate over the normalised, de-duplicated dependency paths
+        '''
+
+        seen = set()
+        self.entry_count = 0
+        self.duplicate_count = 0
+
+        for entry in self.iter_entries():
+
+            if not entry:
+                continue
+
+            self.entry_count += 1
+
+            if not isinstance(entry, str):
+                LOG.warning("Skipping dependency that isn't a path: {!r}".format(entry))
+                continue
+
+            try:
+                path = ciopath.gpath.Path(entry, no_expand=True)
+
+            except ValueError:
+                LOG.warning("Skipping invalid dependency path: '{}'".format(entry))
+                continue
+
+            # Keep a digest rather than the path itself. It's a fraction of the
+            # size of the string and the full path is never needed again.
+            key = hashlib.md5(path.fslash(with_drive=False).encode("utf-8")).digest()
+
+            if key in seen:
+                self.duplicate_count += 1
+                continue
+
+            seen.add(key)
+
+            yield path.fslash()
+
+    def read(self):
+        '''
+        Get the list of dependencies, with directories collapsed if a
+        collapse_threshold was given.
+
+        :rtype: list of str
+        '''
+
+        if not self.collapse_threshold:
+            paths = list(self.iter_paths())
+
+        else:
+            paths_by_directory = {}
+
+            for path in self.iter_paths():
+                directory_paths = paths_by_directory.setdefault(os.path.dirname(path), [])
+
+                # Once a directory is going to be collapsed, there's no need to
+                # hold on to its files
+                if directory_paths is not None:
+                    directory_paths.append(path)
+
+                    if len(directory_paths) > self.collapse_threshold:
+                        paths_by_directory[os.path.dirname(path)] = None
+
+            paths = []
+            for directory, directory_paths in paths_by_directory.items():
+
+                if directory_paths is None:
+                    LOG.debug("Uploading the directory '{}' instead of its files".format(directory))
+                    paths.append(directory)
+
+                else:
+                    paths.extend(directory_paths)
+
+        LOG.debug("Read {} dependencies from '{}' ({} duplicates, {} paths to upload)".format(self.entry_count,
+                                                                                             self.path,
+                                                                                             self.duplicate_count,
+                                                                                             len(paths)))
+
+        return paths
+
+
+def load_dependencies(path, collapse_threshold=None):
+    '''
+    Get the de-duplicated list of dependencies from a sidecar file. See
+    :py:class:`~SidecarReader` for details.
+
+    :rtype: list of str
+    '''
+
+    return SidecarReader(path, collapse_threshold=collapse_threshold).read()
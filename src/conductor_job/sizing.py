@@ -0,0 +1,205 @@
+'''
+Decide how many Conductor instances to launch for a DeadlineWorkerJob.
+
+Every instance pays a boot overhead (starting the instance, pulling the image
+and starting the Deadline Worker) before it renders anything, so launching
+one instance per Deadline task is wasteful when tasks are short. The plan
+gives each worker as many tasks as fit in the target wall-clock time, then
+applies the hard cap and instance-hour budget.
+
+Without a target wall-clock time, each worker is given enough tasks to spend
+at least as long rendering as it did booting. Without an estimated task
+duration there's nothing to go on, so every task gets its own instance (the
+previous behaviour), subject to the cap.
+'''
+
+import logging
+import math
+import os
+
+LOG = logging.getLogger(__name__)
+
+DEFAULT_BOOT_OVERHEAD = 240
+
+
+class FleetPlan(object):
+    '''
+    The number of instances to launch and what to expect from them.
+
+    Durations are in seconds.
+    '''
+
+    def __init__(self, task_count, instance_count, task_duration=None, boot_overhead=0):
+
+        self.task_count = task_count
+        self.instance_count = instance_count
+        self.task_duration = task_duration
+        self.boot_overhead = boot_overhead
+
+        # What limited the instance count: 'tasks', 'target', 'overhead',
+        # 'cap' or 'budget'
+        self.limited_by = "tasks"
+
+        # Anything the user should know about the plan (ex: the budget can't
+        # be met)
+        self.notes = []
+
+    @property
+    def tasks_per_worker(self):
+        '''
+        The most tasks any one worker is expected to render
+        '''
+
+        if not self.instance_count:
+            return 0
+
+        return int(math.ceil(self.task_count / float(self.instance_count)))
+
+    @property
+    def expected_wall_clock(self):
+        '''
+        The expected time from launch until the last task finishes, or None if
+        the task duration isn't known
+        '''
+
+        if self.task_duration is None:
+            return None
+
+        return self.boot_overhead + self.tasks_per_worker * self.task_duration
+
+    @property
+    def expected_instance_hours(self):
+
+        if self.task_duration is None:
+            return None
+
+        # Workers shut down once the queue is empty so every instance pays
+        # the boot overhead but the render time is shared
+        return (self.instance_count * self.boot_overhead + self.task_count * self.task_duration) / 3600.0
+
+    @property
+    def expected_utilisation(self):
+        '''
+        The fraction of the paid instance time that's spent rendering
+        '''
+
+        if not self.task_duration or not self.instance_count:
+            return None
+
+        render_time = self.task_count * self.task_duration
+        return render_time / float(render_time + self.instance_count * self.boot_overhead)
+
+    def as_dict(self):
+
+        def rounded(value, digits=3):
+            return round(value, digits) if value is not None else None
+
+        return {"task_count": self.task_count,
+                "instance_count": self.instance_count,
+                "tasks_per_worker": self.tasks_per_worker,
+                "task_duration": self.task_duration,
+                "boot_overhead": self.boot_overhead,
+                "expected_wall_clock": rounded(self.expected_wall_clock),
+                "expected_instance_hours": rounded(self.expected_instance_hours),
+                "expected_utilisation": rounded(self.expected_utilisation),
+                "limited_by": self.limited_by,
+                "notes": list(self.notes)}
+
+    def summary(self):
+
+        summary = "{} instance(s) for {} task(s), up to {} task(s) each".format(self.instance_count,
+                                                                                 self.task_count,
+                                                                                 self.tasks_per_worker)
+
+        if self.task_duration is not None:
+            summary += ", ~{:.0f} min wall-clock, {:.0%} utilisation".format(self.expected_wall_clock / 60.0,
+                                                                             self.expected_utilisation or 0)
+
+        for note in self.notes:
+            summary += ". {}".format(note)
+
+        return summary
+
+    def __repr__(self):
+        return "FleetPlan({})".format(self.summary())
+
+
+def plan_fleet(task_count, task_duration=None, boot_overhead=None, target_wall_clock=None,
+               max_instances=None, budget=None):
+    '''
+    Work out how many instances to launch.
+
+    :param task_count: The number of Deadline tasks
+    :type task_count: int
+
+    :param task_duration: The estimated time to render one task, in seconds
+    :type task_duration: float
+
+    :param boot_overhead: The time before an instance starts rendering, in
+                          seconds. Defaults to $CONDUCTOR_DEADLINE_BOOT_OVERHEAD
+                          or 240
+    :type boot_overhead: float
+
+    :param target_wall_clock: The time the whole job should take, in seconds
+    :type target_wall_clock: float
+
+    :param max_instances: Never launch more than this many instances. Defaults
+                          to $CONDUCTOR_DEADLINE_MAX_INSTANCES
+    :type max_instances: int
+
+    :param budget: The maximum number of instance-hours to spend. Only used if
+                   task_duration is given
+    :type budget: float
+
+    :rtype: :py:class:`~FleetPlan`
+    '''
+
+    if boot_overhead is None:
+        boot_overhead = float(os.environ.get("CONDUCTOR_DEADLINE_BOOT_OVERHEAD", DEFAULT_BOOT_OVERHEAD))
+
+    if max_instances is None and os.environ.get("CONDUCTOR_DEADLINE_MAX_INSTANCES"):
+        max_instances = int(os.environ["CONDUCTOR_DEADLINE_MAX_INSTANCES"])
+
+    task_count = max(1, int(task_count))
+
+    if not task_duration:
+        plan = FleetPlan(task_count, task_count, boot_overhead=boot_overhead)
+
+    else:
+        if target_wall_clock:
+            tasks_per_worker = int((target_wall_clock - boot_overhead) // task_duration)
+            limited_by = "target"
+
+        else:
+            tasks_per_worker = int(math.ceil(boot_overhead / float(task_duration)))
+            limited_by = "overhead"
+
+        tasks_per_worker = max(1, tasks_per_worker)
+        instance_count = int(math.ceil(task_count / float(tasks_per_worker)))
+
+        plan = FleetPlan(task_count, instance_count, task_duration=task_duration, boot_overhead=boot_overhead)
+
+        if tasks_per_worker > 1:
+            plan.limited_by = limited_by
+
+        if budget:
+            # Each extra instance only adds its boot overhead to the total
+            budget_instances = int((budget * 3600.0 - task_count * task_duration) // boot_overhead) if boot_overhead else task_count
+
+            if budget_instances < plan.instance_count:
+                plan.instance_count = max(1, budget_instances)
+                plan.limited_by = "budget"
+
+            # Even one instance costs more than the budget. It's launched
+            # anyway, since the job can't render without one
+            if budget_instances < 1:
+                note = "The budget of {:g} instance-hour(s) can't cover the job, which needs at least {:.2f}".format(
+                    budget, plan.expected_instance_hours)
+                LOG.warning(note)
+                plan.notes.append(note)
+
+    if max_instances and plan.instance_count > max_instances:
+        plan.instance_count = max_instances
+        plan.limited_by = "cap"
+
+    return plan
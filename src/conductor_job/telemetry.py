@@ -0,0 +1,136 @@
+'''
+Time the phases of a submission and report them as one JSON record.
+
+Every job has a SubmissionTelemetry. The submitter and the job record how
+long each phase took, along with the counts and sizes that explain it:
+
+    catalog          Loading the software catalog
+    mapping          Resolving the packages for the Deadline job
+    sidecar_load     Reading the dependency sidecar
+    dependency_scan  Scanning the scene for dependencies
+    preflight        Running the pre-flight checks
+    environment      Merging the package environments
+    payload          Building the tasks and the rest of the submission data
+    upload           Hashing and uploading the files
+    submit           Sending the job(s) to Conductor
+
+Once the job has been submitted (or has failed), the record is logged as a
+single line of JSON on the 'conductor_job.telemetry' logger and, if
+$CONDUCTOR_DEADLINE_TELEMETRY_PATH is set, appended to that file.
+'''
+
+import contextlib
+import datetime
+import json
+import logging
+import os
+import threading
+import time
+
+LOG = logging.getLogger(__name__)
+
+
+class SubmissionTelemetry(object):
+
+    def __init__(self):
+
+        self.started_at = time.time()
+        self.phases = {}
+        self.counts = {}
+        self.info = {}
+        self.error = None
+
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        '''
+        Time the enclosed block. Repeated phases add up.
+        '''
+
+        start_time = time.perf_counter()
+
+        try:
+            yield
+
+        finally:
+            self.add_time(name, time.perf_counter() - start_time)
+
+    def add_time(self, name, duration):
+
+        with self._lock:
+            self.phases[name] = self.phases.get(name, 0.0) + duration
+
+    def count(self, name, value):
+        '''
+        Record a count or size (ex: the number of tasks)
+        '''
+        self.counts[name] = value
+
+    def wrap(self, obj, method_name, phase_name):
+        '''
+        Time every call to a method of the given object as the given phase.
+        Only that object is affected.
+        '''
+
+        method = getattr(obj, method_name)
+
+        def timed(*args, **kwargs):
+            with self.phase(phase_name):
+                return method(*args, **kwargs)
+
+        setattr(obj, method_name, timed)
+
+    def as_dict(self):
+
+        return {"timestamp": datetime.datetime.fromtimestamp(self.started_at).isoformat(timespec="seconds"),
+                "duration": round(time.time() - self.started_at, 4),
+                "phases": {name: round(duration, 4) for name, duration in self.phases.items()},
+                "counts": dict(self.counts),
+                "error": self.error,
+                **self.info}
+
+    def to_json(self):
+        return json.dumps(self.as_dict(), sort_keys=True, default=str)
+
+    def emit(self, path=None):
+        '''
+        Log the record and append it to the telemetry file, if there's one
+
+        :param path: The file to append to. Defaults to $CONDUCTOR_DEADLINE_TELEMETRY_PATH
+        :type path: str
+        '''
+
+        record = self.to_json()
+        LOG.info(record)
+
+        path = path or os.environ.get("CONDUCTOR_DEADLINE_TELEMETRY_PATH")
+
+        if not path:
+            return
+
+        try:
+            with open(path, 'a') as fh:
+                fh.write(record + "\n")
+
+        except (IOError, OSError) as errMsg:
+            LOG.warning("Unable to write the submission telemetry to '{}': {}".format(path, errMsg))
+
+
+def summarise(value, limit=200):
+    '''
+    Get a short description of a value for the debug log. Long lists and
+    dicts are reduced to their size.
+
+    :rtype: str
+    '''
+
+    if isinstance(value, (list, tuple, dict, set)) and len(value) > 10:
+        return "<{} with {} items>".format(type(value).__name__, len(value))
+
+    text = str(value)
+
+    if len(text) > limit:
+        return "{}... ({} characters)".format(text[:limit], len(text))
+
+    return text
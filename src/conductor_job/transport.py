@@ -0,0 +1,277 @@
+'''
+A shared, rate limited and retrying connection to Conductor.
+
+ciocore's ApiClient sends every request with requests.request(), so each
+submission opens a new connection, and only connection errors are retried.
+The PooledApiClient sends every request through one pooled session, waits
+for the process-wide rate limiter before each request, and retries 429 and
+5xx responses with exponential backoff.
+
+A POST (ex: creating a job) may have been carried out even though the server
+answered with an error, so it's only retried when the server says it wasn't:
+on a 429 or a 503, or when the response has a Retry-After header. Other
+requests are retried on every status in RETRY_STATUSES.
+
+Defaults can be changed with these environment variables:
+
+    CONDUCTOR_DEADLINE_API_RATE          Requests per second (0 disables the limit)
+    CONDUCTOR_DEADLINE_API_BURST         Requests that can be sent at once before the limit applies
+    CONDUCTOR_DEADLINE_API_ATTEMPTS      Attempts per request, including the first
+    CONDUCTOR_DEADLINE_API_BACKOFF       Seconds to wait before the first retry. Doubles every retry
+    CONDUCTOR_DEADLINE_API_POOL_SIZE     Connections kept open to each host
+'''
+
+import logging
+import os
+import random
+import threading
+import time
+
+import ciocore.api_client
+import requests
+import requests.adapters
+
+LOG = logging.getLogger(__name__)
+
+DEFAULT_RATE = 10
+DEFAULT_BURST = 10
+DEFAULT_ATTEMPTS = 5
+DEFAULT_BACKOFF = 1.0
+DEFAULT_MAX_BACKOFF = 60.0
+DEFAULT_POOL_SIZE = 16
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# The statuses a request that isn't idempotent is retried on
+NON_IDEMPOTENT_RETRY_STATUSES = (429, 503)
+
+IDEMPOTENT_VERBS = ("GET", "HEAD", "OPTIONS", "PUT", "DELETE")
+
+
+class RateLimiter(object):
+    '''
+    A token bucket shared by all the threads using it.
+
+    :param rate: The number of requests per second. 0 disables the limit
+    :type rate: float
+
+    :param burst: The number of requests that can be made at once
+    :type burst: int
+    '''
+
+    def __init__(self, rate=None, burst=None):
+
+        if rate is None:
+            rate = float(os.environ.get("CONDUCTOR_DEADLINE_API_RATE", DEFAULT_RATE))
+
+        if burst is None:
+            burst = int(os.environ.get("CONDUCTOR_DEADLINE_API_BURST", DEFAULT_BURST))
+
+        self.rate = rate
+        self.burst = max(1, burst)
+
+        self._tokens = float(self.burst)
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        '''
+        Wait until a request can be made
+
+        :returns: The number of seconds spent waiting
+        :rtype: float
+        '''
+
+        if not self.rate or self.rate <= 0:
+            return 0.0
+
+        waited = 0.0
+
+        while True:
+
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated_at) * self.rate)
+                self._updated_at = now
+
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+
+                delay = (1 - self._tokens) / self.rate
+
+            time.sleep(delay)
+            waited += delay
+
+
+class RetryPolicy(object):
+    '''
+    When and how long to wait before a request is retried.
+
+    :param attempts: The number of attempts, including the first
+    :type attempts: int
+
+    :param backoff: The number of seconds before the first retry. It doubles
+                    for every following retry, up to max_backoff
+    :type backoff: float
+
+    :param statuses: The HTTP status codes that are retried
+    :type statuses: tuple of int
+
+    :param non_idempotent_statuses: The HTTP status codes that are retried
+                                    for requests that aren't idempotent (ex:
+                                    POST). Any status in statuses is also
+                                    retried if the response has a
+                                    Retry-After header
+    :type non_idempotent_statuses: tuple of int
+    '''
+
+    def __init__(self, attempts=None, backoff=None, max_backoff=DEFAULT_MAX_BACKOFF, statuses=RETRY_STATUSES,
+                 non_idempotent_statuses=NON_IDEMPOTENT_RETRY_STATUSES):
+
+        if attempts is None:
+            attempts = int(os.environ.get("CONDUCTOR_DEADLINE_API_ATTEMPTS", DEFAULT_ATTEMPTS))
+
+        if backoff is None:
+            backoff = float(os.environ.get("CONDUCTOR_DEADLINE_API_BACKOFF", DEFAULT_BACKOFF))
+
+        self.attempts = max(1, attempts)
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.statuses = tuple(statuses)
+        self.non_idempotent_statuses = tuple(non_idempotent_statuses)
+
+    def should_retry(self, response, attempt, verb="GET"):
+        '''
+        :param verb: The HTTP method of the request. A request that isn't
+                     idempotent is only retried if the server didn't carry
+                     it out
+        :type verb: str
+        '''
+
+        if response.status_code not in self.statuses or attempt + 1 >= self.attempts:
+            return False
+
+        if verb.upper() in IDEMPOTENT_VERBS:
+            return True
+
+        return response.status_code in self.non_idempotent_statuses or bool(response.headers.get("Retry-After"))
+
+    def get_delay(self, response, attempt):
+        '''
+        Get the number of seconds to wait before the given retry. A numeric
+        Retry-After header is honoured. Otherwise, the delay is the
+        exponential backoff with jitter so concurrent submissions don't all
+        retry at once.
+        '''
+
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+
+        if retry_after:
+            try:
+                return min(self.max_backoff, float(retry_after))
+            except ValueError:
+                pass
+
+        delay = min(self.max_backoff, self.backoff * (2 ** attempt))
+
+        return delay * random.uniform(0.5, 1.0)
+
+
+class PooledApiClient(ciocore.api_client.ApiClient):
+    '''
+    A :py:class:`~ciocore.api_client.ApiClient` that uses one pooled session,
+    a rate limiter and a retry policy for every request.
+
+    :param session: The session to use. A new one is created by default
+    :type session: :py:class:`~requests.Session`
+
+    :param rate_limiter: Defaults to a new :py:class:`~RateLimiter`
+    :param retry_policy: Defaults to a new :py:class:`~RetryPolicy`
+
+    :param pool_size: The number of connections kept open to each host
+    :type pool_size: int
+    '''
+
+    def __init__(self, session=None, rate_limiter=None, retry_policy=None, pool_size=None):
+
+        super(PooledApiClient, self).__init__()
+
+        if pool_size is None:
+            pool_size = int(os.environ.get("CONDUCTOR_DEADLINE_API_POOL_SIZE", DEFAULT_POOL_SIZE))
+
+        if session is None:
+            session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+
+        self.session = session
+        self.rate_limiter = rate_limiter or RateLimiter()
+        self.retry_policy = retry_policy or RetryPolicy()
+
+        self.stats = {"requests": 0, "retries": 0, "rate_limited_seconds": 0.0}
+        self._stats_lock = threading.Lock()
+
+    def _make_request(self, verb, conductor_url, headers, params, data, raise_on_error=True):
+
+        attempt = 0
+
+        while True:
+
+            waited = self.rate_limiter.acquire()
+            response = self.session.request(method=verb, url=conductor_url, headers=headers, params=params, data=data)
+
+            with self._stats_lock:
+                self.stats["requests"] += 1
+                self.stats["rate_limited_seconds"] += waited
+
+            if not self.retry_policy.should_retry(response, attempt, verb):
+                break
+
+            delay = self.retry_policy.get_delay(response, attempt)
+            LOG.warning("{} {} returned {}. Retrying in {:.1f}s (attempt {} of {})".format(verb, conductor_url,
+                                                                                           response.status_code, delay,
+                                                                                           attempt + 2,
+                                                                                           self.retry_policy.attempts))
+
+            with self._stats_lock:
+                self.stats["retries"] += 1
+
+            time.sleep(delay)
+            attempt += 1
+
+        if raise_on_error:
+            response.raise_for_status()
+
+        return response
+
+
+_API_CLIENT = None
+_API_CLIENT_LOCK = threading.Lock()
+
+
+def get_api_client():
+    '''
+    Get the process-wide :py:class:`~PooledApiClient`
+    '''
+
+    global _API_CLIENT
+
+    with _API_CLIENT_LOCK:
+        if _API_CLIENT is None:
+            _API_CLIENT = PooledApiClient()
+
+        return _API_CLIENT
+
+
+def set_api_client(api_client):
+    '''
+    Replace the process-wide :py:class:`~PooledApiClient`. Passing None will
+    create a new default client on the next call to get_api_client()
+    '''
+
+    global _API_CLIENT
+
+    with _API_CLIENT_LOCK:
+        _API_CLIENT = api_client
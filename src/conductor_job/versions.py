@@ -0,0 +1,267 @@
+'''
+Compare and select package versions.
+
+Versions are compared as tuples of their parts, numbers numerically, so 5.10
+comes after 5.9. Trailing zero parts are ignored, so 5.3 and 5.3.0.0 are the
+same version. A word part (ex: beta) marks a pre-release, which comes before
+the release it leads up to: 2024.beta < 2024 < 2024.1, and 5.10.0.beta <
+5.10.0.0.
+
+A version constraint is one of:
+
+    latest              The highest version
+    5.10 / 5.10.0.0     Exactly that version. Missing parts are zeros, so
+                        5.10 is 5.10.0.0 but not 5.10.2.0 or 5.1.0.0
+    5.10.*              The highest version whose leading parts are those
+                        (5.10.0.0, 5.10.2.0, but not 5.1.0.0 or 5.100.0.0)
+    >=5.3,<6            The highest version matching every comparison
+                        (==, !=, >=, <=, > and <)
+'''
+
+import re
+
+LATEST = "latest"
+
+# Ends every version key. It sorts after the word parts and before the number
+# parts, so a version comes after its pre-releases and before the versions
+# that add parts to it
+_END = (1, -1, "")
+_ZERO = (1, 0, "")
+
+_SPLIT_PATTERN = re.compile(r"[.\s_-]+")
+_WILDCARD_PATTERN = re.compile(r"^(.*?)[.\s_-]*\*$")
+_COMPARISON_PATTERN = re.compile(r"^(==|!=|>=|<=|>|<)\s*(.+)$")
+
+_COMPARISONS = {"==": lambda a, b: a == b,
+                "!=": lambda a, b: a != b,
+                ">=": lambda a, b: a >= b,
+                "<=": lambda a, b: a <= b,
+                ">": lambda a, b: a > b,
+                "<": lambda a, b: a < b}
+
+
+class VersionError(ValueError):
+    pass
+
+
+def version_key(version):
+    '''
+    Get the sortable key for a version string
+
+    :param version: The version (ex: 5.10.0.0 or 2024.SP1)
+    :type version: str
+
+    :rtype: tuple
+    '''
+
+    key = []
+
+    for part in _get_parts(version):
+
+        if part[0]:
+            key.append(part)
+            continue
+
+        # Zeros before a word are ignored like trailing ones, so 5.10.0.beta
+        # is compared with 5.10 (5.10.0.0), which comes after it
+        while key and key[-1] == _ZERO:
+            key.pop()
+
+        key.append(part)
+
+    while key and key[-1] == _ZERO:
+        key.pop()
+
+    if not key:
+        return ()
+
+    return tuple(key) + (_END,)
+
+
+def _get_parts(version):
+    '''
+    Get the parts of a version as they're written, zeros included
+
+    :rtype: list of tuple
+    '''
+
+    parts = []
+
+    for part in _SPLIT_PATTERN.split(str(version).strip()):
+
+        if not part:
+            continue
+
+        # Numbers sort after words
+        if part.isdigit():
+            parts.append((1, int(part), ""))
+        else:
+            parts.append((0, 0, part.lower()))
+
+    return parts
+
+
+def package_version(package):
+    '''
+    Get the version string of a Conductor package (ex: 5.10.0.0)
+
+    :rtype: str
+    '''
+
+    parts = [str(package.get(name) or "") for name in ("major_version", "minor_version", "release_version", "build_version")]
+
+    return ".".join([part for part in parts if part])
+
+
+class VersionConstraint(object):
+    '''
+    A parsed version constraint. See the module docs for the syntax.
+
+    :param spec: The constraint
+    :type spec: str
+    '''
+
+    def __init__(self, spec):
+
+        self.spec = str(spec or LATEST).strip()
+
+        # The key of the only version that matches
+        self.pinned = None
+
+        # The leading parts of the versions that match (ex: 5.3.*)
+        self.prefix = None
+
+        self.comparisons = []
+
+        if self.spec.lower() == LATEST:
+            return
+
+        wildcard = _WILDCARD_PATTERN.match(self.spec)
+
+        if wildcard:
+            self.prefix = tuple(_get_parts(wildcard.group(1)))
+
+            if not self.prefix:
+                raise VersionError("Invalid version '{}'".format(self.spec))
+
+            return
+
+        if not _COMPARISON_PATTERN.match(self.spec):
+            self.pinned = version_key(self.spec)
+
+            if not self.pinned:
+                raise VersionError("Invalid version '{}'".format(self.spec))
+
+            return
+
+        for clause in self.spec.split(","):
+
+            match = _COMPARISON_PATTERN.match(clause.strip())
+
+            if not match:
+                raise VersionError("Invalid version constraint '{}' in '{}'".format(clause, self.spec))
+
+            self.comparisons.append((match.group(1), version_key(match.group(2))))
+
+    @property
+    def is_latest(self):
+        return self.pinned is None and self.prefix is None and not self.comparisons
+
+    def matches(self, key):
+        '''
+        Whether the version key (see version_key()) satisfies the constraint
+
+        :rtype: bool
+        '''
+
+        if self.pinned is not None:
+            return key == self.pinned
+
+        if self.prefix is not None:
+
+            # Missing parts are zeros (5.3 is 5.3.0.0). The key ends with
+            # _END, which isn't a part
+            parts = key[:-1] + (_ZERO,) * max(0, len(self.prefix) - len(key) + 1)
+            return parts[:len(self.prefix)] == self.prefix
+
+        return all([_COMPARISONS[operator](key, other) for operator, other in self.comparisons])
+
+    def __str__(self):
+        return self.spec
+
+    def __repr__(self):
+        return "VersionConstraint('{}')".format(self.spec)
+
+
+class VersionIndex(object):
+    '''
+    The versions of one product, sorted oldest to newest.
+
+    Latest and pinned versions are looked up in a dict. Wildcard and range
+    constraints walk the versions once and the answer is remembered.
+
+    :param packages: The packages of a single product
+    :type packages: list of dict
+    '''
+
+    def __init__(self, packages):
+
+        by_key = {}
+
+        for package in packages:
+            key = version_key(package_version(package))
+
+            # Identical versions resolve to the first package, like a
+            # catalog lookup by name would
+            by_key.setdefault(key, package)
+
+        self.keys = sorted(by_key)
+        self.packages = [by_key[key] for key in self.keys]
+
+        self._by_key = by_key
+        self._found = {}
+
+    def __len__(self):
+        return len(self.packages)
+
+    @property
+    def versions(self):
+        '''
+        The version strings, oldest to newest
+
+        :rtype: list of str
+        '''
+        return [package_version(package) for package in self.packages]
+
+    def latest(self):
+        return self.packages[-1] if self.packages else None
+
+    def find(self, constraint=LATEST):
+        '''
+        Get the newest package that satisfies the constraint
+
+        :param constraint: The version constraint
+        :type constraint: str or :py:class:`~VersionConstraint`
+
+        :returns: The package or None if no version matches
+        :rtype: dict
+        '''
+
+        if not isinstance(constraint, VersionConstraint):
+            constraint = VersionConstraint(constraint)
+
+        if constraint.is_latest:
+            return self.latest()
+
+        if constraint.pinned is not None:
+            return self._by_key.get(constraint.pinned)
+
+        if constraint.spec not in self._found:
+            self._found[constraint.spec] = None
+
+            for key, package in zip(reversed(self.keys), reversed(self.packages)):
+                if constraint.matches(key):
+                    self._found[constraint.spec] = package
+                    break
+
+        return self._found[constraint.spec]
@@ -1,9 +1,11 @@
 import logging
 
 import ciocore
-import ciocore.data
+import ciocore.file_utils
 
+from . import catalog
 from . import job
+from . import sizing
 
 LOG = logging.getLogger(__name__)
 
@@ -39,6 +41,10 @@ class DeadlineWorkerJob(WorkerJob):
         self.job_title = "Deadline Worker"
         self.instance_count = 1
         
+        # The :py:class:`~conductor_job.sizing.FleetPlan` instance_count came
+        # from, if any
+        self.fleet_plan = None
+        
         self.cmd = self.DEFAULT_CMD
         self.deadline_proxy_root = None
         self.deadline_ssl_certificate = None
@@ -47,6 +53,13 @@ class DeadlineWorkerJob(WorkerJob):
         self.deadline_group_name = None
         self.deadline_worker_package = None
         
+        # How long, in seconds, a worker stays up once its group has no more
+        # work. None uses the ConductorWorker event plugin's setting
+        self.idle_window = None
+        
+        # The Deadline group of the warm pool the workers belong to, if any
+        self.pool_name = None
+        
     def _get_task_data(self):
         task_data = []
         
@@ -56,6 +69,22 @@ class DeadlineWorkerJob(WorkerJob):
         
         return task_data
     
+    def plan_fleet(self, task_count, **kwargs):
+        '''
+        Set the number of instances from a fleet plan for the given number of
+        Deadline tasks. See :py:func:`~conductor_job.sizing.plan_fleet` for the
+        keyword arguments.
+        
+        :rtype: :py:class:`~conductor_job.sizing.FleetPlan`
+        '''
+        
+        self.fleet_plan = sizing.plan_fleet(task_count, **kwargs)
+        self.instance_count = self.fleet_plan.instance_count
+        
+        LOG.info("Fleet plan: {}".format(self.fleet_plan.summary()))
+        
+        return self.fleet_plan
+    
     def set_deadline_ssl_certificate(self, path):
         self.deadline_ssl_certificate =  ciocore.file_utils.strip_drive_letter(path)
         self.upload_paths.append(path)
@@ -70,6 +99,9 @@ class DeadlineWorkerJob(WorkerJob):
         self.environment['CONDUCTOR_DEADLINE_SKIP_ENV_VAR_DUMP'] = "0"
         self.environment['CONDUCTOR_DEADLINE_SHOW_WATCHER_DEBUG'] = "1"
         
+        if self.idle_window is not None:
+            self.environment['CONDUCTOR_DEADLINE_IDLE_WINDOW'] = str(self.idle_window)
+        
         if self.deadline_use_ssl:
             self.environment['DCONFIG_ProxySSLCertificate'] = ciocore.file_utils.strip_drive_letter(
                                                                 ciocore.file_utils.conform_platform_filepath(self.deadline_ssl_certificate)
@@ -89,16 +121,18 @@ class DeadlineWorkerJob(WorkerJob):
     
     def submit_job(self):
         
+        # A pool that already has enough workers doesn't need any more
+        if self.pool_name and not self.instance_count:
+            LOG.info("Pool '{}' already has enough workers. Nothing to submit".format(self.pool_name))
+            return None
+        
         if self.deadline_worker_package is None:
         
-            ciocore.data.init(product="deadline")          
-            software_tree = ciocore.data.data()["software"]
-    
-    
-            self.deadline_worker_package = software_tree.find_by_name("deadline {} linux".format(self.deadline_worker_version))
+            software_catalog = catalog.get_catalog()
+            self.deadline_worker_package = software_catalog.find_by_name("deadline {} linux".format(self.deadline_worker_version))
             
             if self.deadline_worker_package is None:                                               
-                available_deadline_packages = ", ".join([package.split(" ")[1] for package in software_tree.to_path_list() if package.split(" ")[0] == "deadline" ])
+                available_deadline_packages = ", ".join([package.split(" ")[1] for package in software_catalog.host_names("deadline")])
                 raise DeadlineWorkerJobError('Unable to find a package in Conductor for Deadline v{}.\nAvailable packages are {}:'.format(self.deadline_worker_version, 
                                                                                                                                           available_deadline_packages))
         
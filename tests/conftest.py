@@ -0,0 +1,23 @@
+'''
+The tests run offline, against the fakes in benchmarks/fakes.py
+'''
+
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+sys.path.insert(0, os.path.join(ROOT, "src"))
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+import fakes
+
+
+@pytest.fixture
+def repository():
+    '''
+    A fake RepositoryUtils, also used by 'import Deadline.Scripting'
+    '''
+    return fakes.install_deadline(fakes.FakeRepositoryUtils())
@@ -0,0 +1,124 @@
+import json
+import time
+
+import fakes
+from conductor_job import catalog
+
+
+class CountingFetch(object):
+
+    def __init__(self, packages=None):
+        self.packages = packages if packages is not None else fakes.make_catalog_packages(plugin_versions=2,
+                                                                                          extra_products=2)
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.packages
+
+
+def test_packages_are_indexed_by_id_name_and_product():
+
+    software_catalog = catalog.SoftwareCatalog(ttl=0, fetch=CountingFetch())
+
+    host = software_catalog.find_by_name("maya-io 2024 SP1 linux")
+
+    assert host["package_id"] == "maya-2024 SP1"
+    assert software_catalog.find_by_id("maya-2024 SP1") is host
+    assert software_catalog.find_by_name("maya-io 2099 linux") is None
+    assert len(software_catalog.packages_for_product("maya-io")) == len(fakes.MAYA_VERSIONS)
+    assert software_catalog.packages_for_product("houdini") == []
+    assert "maya-io 2024 SP1 linux" in software_catalog.host_names("maya-io")
+
+
+def test_hosts_are_linked_to_their_plugins():
+
+    software_catalog = catalog.SoftwareCatalog(ttl=0, fetch=CountingFetch())
+
+    children = software_catalog.children("maya-io 2024 SP1 linux")
+
+    assert sorted(set([plugin["product"] for plugin in children])) == sorted(fakes.RENDERERS)
+    assert all([plugin["plugin_host_product"] == "maya-io" for plugin in children])
+    assert software_catalog.children("maya-io 2099 linux") == []
+
+    arnold_versions = software_catalog.plugin_versions("maya-io 2024 SP1 linux", "arnold-maya")
+
+    assert len(arnold_versions.versions) == 2
+    assert software_catalog.plugin_versions("maya-io 2024 SP1 linux", "houdini").latest() is None
+
+
+def test_packages_are_fetched_once_until_refreshed():
+
+    fetch = CountingFetch()
+    software_catalog = catalog.SoftwareCatalog(ttl=0, fetch=fetch)
+
+    software_catalog.find_by_name("maya-io 2024 SP1 linux")
+    software_catalog.packages_for_product("maya-io")
+    assert fetch.calls == 1
+
+    software_catalog.refresh()
+    assert fetch.calls == 2
+
+
+def test_expired_catalogs_are_fetched_again(tmp_path, monkeypatch):
+
+    fetch = CountingFetch()
+    software_catalog = catalog.SoftwareCatalog(snapshot_path=str(tmp_path / "catalog.json"), ttl=60, fetch=fetch)
+    now = time.time()
+
+    software_catalog.get_revision()
+    assert not software_catalog.is_expired()
+
+    monkeypatch.setattr(time, "time", lambda: now + 61)
+
+    assert software_catalog.is_expired()
+    software_catalog.get_revision()
+    assert fetch.calls == 2
+
+
+def test_snapshots_are_shared_until_they_expire(tmp_path, monkeypatch):
+
+    snapshot_path = str(tmp_path / "catalog.json")
+    fetch = CountingFetch()
+    first_catalog = catalog.SoftwareCatalog(snapshot_path=snapshot_path, ttl=60, fetch=fetch)
+    revision = first_catalog.get_revision()
+
+    with open(snapshot_path) as fh:
+        assert json.load(fh)["packages"] == fetch.packages
+
+    # Another process reads the snapshot rather than fetching the packages
+    second_catalog = catalog.SoftwareCatalog(snapshot_path=snapshot_path, ttl=60, fetch=fetch)
+
+    assert second_catalog.get_revision() == revision
+    assert second_catalog.find_by_name("maya-io 2024 SP1 linux") == first_catalog.find_by_name("maya-io 2024 SP1 linux")
+    assert fetch.calls == 1
+
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 61)
+
+    catalog.SoftwareCatalog(snapshot_path=snapshot_path, ttl=60, fetch=fetch).get_revision()
+    assert fetch.calls == 2
+
+
+def test_unreadable_snapshots_are_ignored(tmp_path):
+
+    snapshot_path = tmp_path / "catalog.json"
+    snapshot_path.write_text("{not json")
+    fetch = CountingFetch()
+
+    software_catalog = catalog.SoftwareCatalog(snapshot_path=str(snapshot_path), ttl=60, fetch=fetch)
+
+    assert software_catalog.find_by_id("maya-2024 SP1") is not None
+    assert fetch.calls == 1
+
+
+def test_revision_changes_with_the_packages():
+
+    packages = fakes.make_catalog_packages(plugin_versions=1, extra_products=0)
+    revision = catalog.SoftwareCatalog(ttl=0, fetch=lambda: packages).get_revision()
+
+    updated_packages = [dict(package) for package in packages]
+    updated_packages[0]["updated_at"] = "2024-02-01T00:00:00"
+
+    assert catalog.SoftwareCatalog(ttl=0, fetch=lambda: list(packages)).get_revision() == revision
+    assert catalog.SoftwareCatalog(ttl=0, fetch=lambda: updated_packages).get_revision() != revision
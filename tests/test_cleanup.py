@@ -0,0 +1,83 @@
+import fakes
+
+from conductor_deadline import cleanup, submitter
+
+
+def make_killer():
+
+    api = fakes.FakeConductorApi()
+
+    return api, cleanup.ConductorJobKiller(kill_jobs=api.kill_jobs)
+
+
+def test_worker_mode_jobs_are_killed_in_one_call():
+
+    api, killer = make_killer()
+    deadline_job = fakes.FakeDeadlineJob("job1", group="conductorautogroup_job1")
+    cleanup.set_conductor_job_ids(deadline_job, ["00001", "00002"])
+
+    assert killer.kill_for(deadline_job, "has been deleted") == ["00001", "00002"]
+    assert api.requests == [["00001", "00002"]]
+
+
+def test_pool_jobs_are_left_alone():
+
+    api, killer = make_killer()
+    deadline_job = fakes.FakeDeadlineJob("job1", group="conductorpool_abc")
+    cleanup.set_conductor_job_ids(deadline_job, ["00001"])
+
+    assert killer.kill_for(deadline_job) == []
+    assert not api.requests
+
+
+def test_native_jobs_are_left_alone():
+
+    api, killer = make_killer()
+
+    # Recorded before native submissions stopped being recorded
+    deadline_job = fakes.FakeDeadlineJob("job1", group="none")
+    cleanup.set_conductor_job_ids(deadline_job, ["00001"])
+
+    assert killer.kill_for(deadline_job, "has been suspended") == []
+    assert not api.requests
+
+
+def test_native_submissions_are_not_recorded(repository):
+
+    deadline_job = repository.add_job(fakes.FakeDeadlineJob("job1"))
+    job_submitter = submitter.DeadlineJobSubmitter(repository=repository)
+
+    job_submitter.record_conductor_job(deadline_job, "00001", native=True)
+    assert cleanup.get_conductor_job_ids(repository.GetJob("job1", True)) == []
+
+    job_submitter.record_conductor_job(deadline_job, ["00001", "00002"])
+    assert cleanup.get_conductor_job_ids(repository.GetJob("job1", True)) == ["00001", "00002"]
+
+
+def test_every_worker_mode_conductor_job_is_killed_once():
+
+    api, killer = make_killer()
+    deadline_jobs = []
+    expected = set()
+
+    for number in range(100):
+
+        pooled = number % 10 == 0
+        group = "conductorpool_abc" if pooled else "conductorautogroup_job{}".format(number)
+        deadline_job = fakes.FakeDeadlineJob("job{}".format(number), group=group)
+
+        # Some Deadline jobs were split into several Conductor jobs
+        for part in range(1 + number % 3):
+            conductor_job_id = "{:05d}".format(number * 3 + part)
+            cleanup.add_conductor_job_id(deadline_job, conductor_job_id)
+
+            if not pooled:
+                expected.add(conductor_job_id)
+
+        deadline_jobs.append(deadline_job)
+
+    for deadline_job in deadline_jobs:
+        killer.kill_for(deadline_job, "has finished")
+
+    assert api.killed == expected
+    assert len(api.requests) == 90
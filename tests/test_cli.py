@@ -0,0 +1,33 @@
+import json
+
+from conductor_deadline import cli
+
+
+def test_missing_instance_type_is_reported_for_every_job(repository, monkeypatch, capsys):
+
+    monkeypatch.delenv("CONDUCTOR_DEADLINE_INSTANCE_TYPE", raising=False)
+    repository.add_job("job1")
+
+    assert cli.main(["job1", "job2"], repository=repository) == 1
+
+    output = json.loads(capsys.readouterr().out)
+
+    assert output["submitted"] == 0
+    assert output["failed"] == 2
+    assert [result["deadline_job_id"] for result in output["results"]] == ["job1", "job2"]
+
+    for result in output["results"]:
+        assert not result["succeeded"]
+        assert "instance type" in result["error"]
+
+
+def test_missing_jobs_are_reported(repository, monkeypatch, capsys):
+
+    monkeypatch.setattr(cli.submitter.DeadlineJobSubmitter, "submit_many", lambda self, jobs, max_workers=None: [])
+
+    assert cli.main(["job1", "--instance-type", "n1-standard-8"], repository=repository) == 1
+
+    output = json.loads(capsys.readouterr().out)
+
+    assert output["failed"] == 1
+    assert "Unable to find the Deadline job 'job1'" in output["results"][0]["error"]
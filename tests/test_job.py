@@ -0,0 +1,122 @@
+import time
+
+import pytest
+
+import conductor_job
+from conductor_job import job, payload, preflight
+
+
+class FakePlanner(object):
+
+    payload_size = None
+
+    def plan(self, data, groups=None):
+        return data["parts"]
+
+
+class SplitJob(job.Job):
+    '''
+    A job whose parts are submitted by returning their name as the job id, or
+    fail if they're called 'fail'
+    '''
+
+    def __init__(self, parts):
+        super(SplitJob, self).__init__()
+        self.parts = parts
+        self.preflight_enabled = False
+
+    def validate_job(self):
+        pass
+
+    def get_dependencies(self):
+        return []
+
+    def _get_environment(self):
+        return {}
+
+    def _get_submission_data(self, upload_paths, environment):
+        return {"parts": self.parts, "tasks_data": [], "software_package_ids": []}
+
+    def _get_submitter(self, data):
+        return data
+
+    def _send(self, submitter):
+
+        if submitter == "fail":
+            raise job.JobError("Submission Failure")
+
+        return submitter
+
+
+@pytest.fixture(autouse=True)
+def fake_payload(monkeypatch):
+
+    monkeypatch.setattr(payload, "PayloadPlanner", FakePlanner)
+    monkeypatch.setattr(payload, "share_manifest", lambda first, other: None)
+
+
+def test_failed_part_reports_the_parts_already_submitted():
+
+    split_job = SplitJob(["00001", "00002", "fail", "00004"])
+
+    with pytest.raises(conductor_job.PartialSubmissionError) as error_info:
+        split_job.submit_job()
+
+    assert error_info.value.conductor_job_ids == ["00001", "00002"]
+    assert split_job.conductor_job_ids == ["00001", "00002"]
+    assert split_job.telemetry.info["job_ids"] == ["00001", "00002"]
+    assert "Part 3 of 4" in str(error_info.value)
+
+
+def test_failed_first_part_raises_the_original_error():
+
+    with pytest.raises(job.JobError) as error_info:
+        SplitJob(["fail", "00002"]).submit_job()
+
+    assert not isinstance(error_info.value, conductor_job.PartialSubmissionError)
+
+
+def test_all_parts_submitted():
+
+    split_job = SplitJob(["00001", "00002"])
+
+    assert split_job.submit_job() == "00001"
+    assert split_job.conductor_job_ids == ["00001", "00002"]
+
+
+class ScanningJob(SplitJob):
+    '''
+    A job whose dependency scan takes a while and is checked before it's
+    submitted
+    '''
+
+    SCAN_TIME = 0.2
+
+    get_dependencies = job.Job.get_dependencies
+
+    def __init__(self, parts):
+        super(ScanningJob, self).__init__(parts)
+        self.preflight_enabled = True
+
+    def scan_for_dependencies(self):
+        time.sleep(self.SCAN_TIME)
+        return ["/scenes/shot.ma"]
+
+
+class FakePreflightRunner(object):
+
+    def run(self, checked_job):
+        checked_job.get_dependencies()
+        return preflight.PreflightReport()
+
+
+def test_dependency_scan_is_timed_when_the_preflight_reads_it(monkeypatch):
+
+    monkeypatch.setattr(preflight, "PreflightRunner", FakePreflightRunner)
+
+    scanning_job = ScanningJob(["00001"])
+    scanning_job.submit_job()
+
+    phases = scanning_job.telemetry.phases
+    assert phases["dependency_scan"] >= ScanningJob.SCAN_TIME
+    assert phases["preflight"] < ScanningJob.SCAN_TIME
@@ -0,0 +1,118 @@
+import os
+
+from conductor_job import maya_ascii
+
+
+def write_scene(path, *statements):
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text("//Maya ASCII 2024 scene\nrequires maya \"2024\";\n" + "".join(statements))
+
+    return str(path)
+
+
+def touch(*paths):
+
+    for path in paths:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("")
+
+    return [str(path) for path in paths]
+
+
+def texture(name, path):
+
+    return 'createNode file -n "{}";\n\tsetAttr ".ftn" -type "string" "{}";\n'.format(name, path)
+
+
+def reference(path):
+
+    return 'file -rdi 1 -ns "asset" -rfn "assetRN"\n\t\t-op "v=0;"\n\t\t-typ "mayaAscii" "{}";\n'.format(path)
+
+
+def test_references_over_several_lines(tmp_path):
+
+    scene_path = write_scene(tmp_path / "shot.ma",
+                             reference("/assets/chair.ma"),
+                             'file -r -ns "asset" -dr 1 -rfn "assetRN" -op "v=0;" -typ "mayaAscii" "/assets/chair.ma{1}";\n',
+                             'file -r -ns "table" -rfn "tableRN" -op "v=0;a;" -typ "mayaAscii"\n'
+                             '\t\t "/assets/ta;ble.ma";\n')
+
+    result = maya_ascii.MayaAsciiReader(scene_path).scan()
+
+    assert result.references == ["/assets/chair.ma", "/assets/ta;ble.ma"]
+    assert result.paths == []
+
+
+def test_node_attributes(tmp_path):
+
+    scene_path = write_scene(tmp_path / "shot.ma",
+                             texture("wood", "/tex/wood.exr"),
+                             'createNode aiStandIn -n "crowd";\n\tsetAttr ".dso" -type "string" "/cache/crowd.ass";\n',
+                             'createNode AlembicNode -n "sim";\n\tsetAttr ".fn" -type "string" "/cache/sim.abc";\n',
+                             'createNode mesh -n "shape";\n\tsetAttr ".ftn" -type "string" "/tex/not_a_texture.exr";\n',
+                             'createNode file -n "unused";\n\tsetAttr ".cs" -type "string" "sRGB";\n')
+
+    assert maya_ascii.MayaAsciiReader(scene_path).scan().paths == ["/tex/wood.exr", "/cache/crowd.ass",
+                                                                   "/cache/sim.abc"]
+
+
+def test_tokens_are_matched_on_disk(tmp_path):
+
+    tiles = touch(tmp_path / "tex" / "skin.1001.exr", tmp_path / "tex" / "skin.1002.exr")
+    frames = touch(tmp_path / "seq" / "fire.0001.exr", tmp_path / "seq" / "fire.0002.exr")
+    touch(tmp_path / "tex" / "skin_spec.1001.exr", tmp_path / "tex" / "skin.exr")
+
+    assert maya_ascii.resolve_path(str(tmp_path / "tex" / "skin.<UDIM>.exr"), []) == tiles
+    assert maya_ascii.resolve_path(str(tmp_path / "seq" / "fire.####.exr"), []) == frames
+    assert maya_ascii.resolve_path(str(tmp_path / "tex" / "skin.<UDIM>.tx"), []) == []
+
+
+def test_relative_paths_are_resolved_from_the_project_first(tmp_path):
+
+    project_texture, scene_texture = touch(tmp_path / "project" / "sourceimages" / "wood.exr",
+                                           tmp_path / "scenes" / "sourceimages" / "wood.exr")
+
+    search_paths = [str(tmp_path / "project"), str(tmp_path / "scenes")]
+
+    assert maya_ascii.resolve_path("sourceimages/wood.exr", search_paths) == [project_texture]
+    assert maya_ascii.resolve_path("sourceimages/wood.exr", search_paths[1:]) == [scene_texture]
+
+
+def test_referenced_scenes_are_scanned(tmp_path):
+
+    wood, metal = touch(tmp_path / "tex" / "wood.exr", tmp_path / "tex" / "metal.exr")
+    shot_path = str(tmp_path / "shot.ma")
+    chair_path = write_scene(tmp_path / "assets" / "chair.ma", texture("metal", metal), reference(shot_path))
+    write_scene(tmp_path / "shot.ma", reference(chair_path), texture("wood", wood),
+                texture("missing", str(tmp_path / "tex" / "missing.exr")))
+
+    cache = maya_ascii.ScanCache(str(tmp_path / "cache"))
+
+    # The chair references the shot back, which isn't scanned again
+    assert maya_ascii.collect_dependencies(shot_path, cache=cache) == [chair_path, wood, shot_path, metal]
+    assert maya_ascii.collect_dependencies(shot_path, cache=cache, recursive=False) == [chair_path, wood]
+
+
+def test_scans_are_cached_until_the_scene_changes(tmp_path, monkeypatch):
+
+    scene = tmp_path / "shot.ma"
+    scene_path = write_scene(scene, texture("wood", "/tex/wood.exr"))
+    cache = maya_ascii.ScanCache(str(tmp_path / "cache"))
+
+    assert maya_ascii.scan(scene_path, cache=cache).paths == ["/tex/wood.exr"]
+
+    # Another process reads the entry from disk rather than the scene
+    def fail(reader):
+        raise AssertionError("The scene was read again")
+
+    monkeypatch.setattr(maya_ascii.MayaAsciiReader, "scan", fail)
+    assert maya_ascii.scan(scene_path, cache=maya_ascii.ScanCache(cache.path)).paths == ["/tex/wood.exr"]
+    monkeypatch.undo()
+
+    # Same size, later mtime
+    write_scene(scene, texture("wood", "/tex/oak1.exr"))
+    stat = os.stat(scene_path)
+    os.utime(scene_path, (stat.st_atime, stat.st_mtime + 10))
+
+    assert maya_ascii.scan(scene_path, cache=cache).paths == ["/tex/oak1.exr"]
@@ -0,0 +1,120 @@
+import sqlite3
+
+import ciocore.api_client
+import ciocore.conductor_submit
+import jwt
+
+from conductor_job import md5_cache
+
+
+def make_file(tmp_path, name="scene.ma", text="data"):
+
+    path = tmp_path / name
+    path.write_text(text)
+
+    return str(path)
+
+
+def test_entries_are_scoped(tmp_path):
+
+    path = make_file(tmp_path)
+    hash_cache = md5_cache.FileHashCache(str(tmp_path / "cache.sqlite"))
+    scope = md5_cache.upload_scope("show", "london", account="https://studio.conductortech.com")
+
+    hash_cache.store({path: "abc"}, scope=scope)
+
+    assert hash_cache.lookup([path], scope=scope) == {path: "abc"}
+    assert hash_cache.lookup([path], scope=md5_cache.upload_scope("other", "london", account="https://studio.conductortech.com")) == {}
+    assert hash_cache.lookup([path], scope=md5_cache.upload_scope("show", "paris", account="https://studio.conductortech.com")) == {}
+    assert hash_cache.lookup([path], scope=md5_cache.upload_scope("show", "london", account="https://other.conductortech.com")) == {}
+
+
+def test_the_same_file_can_be_cached_in_several_scopes(tmp_path):
+
+    path = make_file(tmp_path)
+    hash_cache = md5_cache.FileHashCache(str(tmp_path / "cache.sqlite"))
+
+    hash_cache.store({path: "abc"}, scope="a")
+    hash_cache.store({path: "abc"}, scope="b")
+
+    assert sorted([entry["scope"] for entry in hash_cache.entries([path])]) == ["a", "b"]
+    assert hash_cache.prune(max_entries=1) == 1
+
+
+def test_changed_files_are_not_found(tmp_path):
+
+    path = make_file(tmp_path)
+    hash_cache = md5_cache.FileHashCache(str(tmp_path / "cache.sqlite"))
+    hash_cache.store({path: "abc"}, scope="a")
+
+    make_file(tmp_path, text="more data")
+
+    assert hash_cache.lookup([path], scope="a") == {}
+
+
+def test_unscoped_databases_are_cleared(tmp_path):
+
+    path = make_file(tmp_path)
+    database_path = str(tmp_path / "cache.sqlite")
+
+    connection = sqlite3.connect(database_path)
+    connection.execute("CREATE TABLE files (path TEXT PRIMARY KEY, size INTEGER, mtime REAL, inode INTEGER, "
+                       "md5 TEXT, uploaded_at REAL, last_used REAL)")
+    connection.execute("INSERT INTO files VALUES (?, 4, 0, 0, 'abc', 0, 0)", (path,))
+    connection.commit()
+    connection.close()
+
+    hash_cache = md5_cache.FileHashCache(database_path)
+
+    assert hash_cache.stats()["entries"] == 0
+    hash_cache.store({path: "abc"}, scope="a")
+    assert hash_cache.lookup([path], scope="a") == {path: "abc"}
+
+
+def sign_in(monkeypatch, account_id):
+
+    token = jwt.encode({"account": account_id}, "secret", algorithm="HS256") if account_id else None
+    monkeypatch.setattr(ciocore.api_client, "get_bearer_token", lambda refresh=False: token)
+
+
+def test_accounts_on_the_same_config_have_their_own_scope(tmp_path, monkeypatch):
+
+    path = make_file(tmp_path)
+    hash_cache = md5_cache.FileHashCache(str(tmp_path / "cache.sqlite"))
+
+    sign_in(monkeypatch, "1234")
+    first_scope = md5_cache.upload_scope("show", "london")
+    hash_cache.store({path: "abc"}, scope=first_scope)
+
+    sign_in(monkeypatch, "5678")
+    second_scope = md5_cache.upload_scope("show", "london")
+
+    assert first_scope != second_scope
+    assert hash_cache.lookup([path], scope=second_scope) == {}
+    assert hash_cache.lookup([path], scope=first_scope) == {path: "abc"}
+
+
+def test_the_cache_is_not_used_without_an_account(tmp_path, monkeypatch):
+
+    path = make_file(tmp_path)
+    hash_cache = md5_cache.FileHashCache(str(tmp_path / "cache.sqlite"))
+    hash_cache.store({path: "abc"}, scope="")
+
+    sign_in(monkeypatch, None)
+    assert md5_cache.upload_scope("show", "london") is None
+
+    hashed = []
+
+    def handle_local_upload(submit, file_map):
+        hashed.extend(file_map)
+        return {path: "def" for path in file_map}
+
+    monkeypatch.setattr(ciocore.conductor_submit.Submit, "_handle_local_upload", handle_local_upload)
+
+    submit = md5_cache.CachedSubmit.__new__(md5_cache.CachedSubmit)
+    submit.hash_cache = hash_cache
+    submit.scope = None
+
+    assert submit._handle_local_upload({path: None}) == {path: "def"}
+    assert hashed == [path]
+    assert [entry["scope"] for entry in hash_cache.entries([path])] == [""]
@@ -0,0 +1,72 @@
+import pytest
+
+from conductor_job import job, nuke, payload
+
+
+def make_job(split_write_nodes=True):
+
+    nuke_job = nuke.NukeRenderJob(scene_path="/projects/show/comp.nk")
+    nuke_job.start_frame = 1
+    nuke_job.end_frame = 10
+    nuke_job.chunk_size = 5
+    nuke_job.write_nodes = ["Write1", "Write2", "Write3"]
+    nuke_job.split_write_nodes = split_write_nodes
+
+    return nuke_job
+
+
+def test_split_write_node_tasks_keep_the_chunk_frames():
+
+    tasks = list(make_job().iter_task_data())
+
+    assert [task["frames"] for task in tasks] == ["1-5", "6-10"] * 3
+    assert ["-F 1-5x1" in task["command"] for task in tasks] == [True, False] * 3
+    assert [task["command"].split("-X ")[1].split(" ")[0] for task in tasks[::2]] == ["Write1", "Write2", "Write3"]
+
+
+def test_every_split_write_node_is_a_job_of_its_own():
+
+    nuke_job = make_job()
+    nuke_job.set_scout_policy("fml", 3)
+    data = {"tasks_data": list(nuke_job.iter_task_data()), "frame_range": "1-10",
+            "scout_frames": nuke_job.scout_frames, "job_title": "comp"}
+
+    parts = payload.PayloadPlanner(max_bytes=0).plan(data, groups=nuke_job.get_task_groups())
+
+    assert [part["job_title"] for part in parts] == ["comp [1/3]", "comp [2/3]", "comp [3/3]"]
+    assert [len(part["tasks_data"]) for part in parts] == [2, 2, 2]
+
+    for index, part in enumerate(parts):
+        assert part["scout_frames"] == nuke_job.scout_frames
+        assert [task["frames"] for task in part["tasks_data"]] == ["1-5", "6-10"]
+        assert "-X Write{} ".format(index + 1) in part["tasks_data"][0]["command"]
+
+
+def test_split_write_nodes_are_split_further_when_over_the_limits():
+
+    nuke_job = make_job()
+    nuke_job.chunk_size = 2
+    data = {"tasks_data": list(nuke_job.iter_task_data())}
+
+    parts = payload.PayloadPlanner(max_bytes=0, max_tasks=3).plan(data, groups=nuke_job.get_task_groups())
+
+    assert [len(part["tasks_data"]) for part in parts] == [3, 2] * 3
+
+
+def test_post_job_command_is_refused_with_split_write_nodes():
+
+    nuke_job = make_job()
+    nuke_job.post_job_cmd = "echo done"
+
+    with pytest.raises(job.JobError):
+        nuke_job.validate_job()
+
+
+def test_write_nodes_rendered_together_keep_the_chunk_frames():
+
+    nuke_job = make_job(split_write_nodes=False)
+    tasks = list(nuke_job.iter_task_data())
+
+    assert [task["frames"] for task in tasks] == ["1-5", "6-10"]
+    assert "-X Write1,Write2,Write3 " in tasks[0]["command"]
+    assert nuke_job.get_task_groups() is None
@@ -0,0 +1,67 @@
+import pytest
+
+import fakes
+
+from conductor_deadline import package_mapper
+from conductor_deadline.plugin_mappers import deadline_plugin_mapper
+
+Mapper = package_mapper.DeadlineToConductorPackageMapper
+
+
+class OverriddenMapper(deadline_plugin_mapper.DeadlinePluginMapper):
+    '''
+    Only overrides map()
+    '''
+
+    DEADLINE_PLUGINS = ["Custom"]
+    calls = 0
+
+    @classmethod
+    def map(cls, deadline_job):
+        cls.calls += 1
+        return [{"package_id": "host", "package": "custom 1"}, {"package_id": "plugin", "package": "plugin 1"}]
+
+    @classmethod
+    def get_output_path(cls, deadline_job):
+        return "/output"
+
+
+@pytest.fixture(autouse=True)
+def mappers(monkeypatch):
+
+    fakes.install_catalog()
+    Mapper.get_mapping_class(fakes.make_maya_job("job0"))
+    Mapper.clear_plans()
+
+    monkeypatch.setitem(Mapper.PLUGIN_TO_PACKAGE_MAPPING, "Custom", OverriddenMapper)
+    OverriddenMapper.calls = 0
+
+
+def test_resolve_uses_an_overridden_map():
+
+    deadline_job = fakes.FakeDeadlineJob("job1", plugin="Custom")
+    plan = Mapper.resolve(deadline_job)
+
+    assert plan.host_package["package_id"] == "host"
+    assert [package["package_id"] for package in plan.plugins] == ["plugin"]
+    assert plan.output_path == "/output"
+
+    # The packages are only mapped once
+    assert Mapper.resolve(fakes.FakeDeadlineJob("job2", plugin="Custom")).cached
+    assert OverriddenMapper.calls == 1
+
+
+def test_maya_jobs_map_to_maya_and_the_renderer():
+
+    plan = Mapper.resolve(fakes.make_maya_job("job1"))
+
+    assert plan.host_package["product"] == "maya-io"
+    assert [package["product"] for package in plan.plugins] == ["arnold-maya"]
+
+
+def test_generic_jobs_have_no_packages():
+
+    plan = Mapper.resolve(fakes.FakeDeadlineJob("job1", plugin="CommandLine"))
+
+    assert plan.host_package is None
+    assert plan.packages == []
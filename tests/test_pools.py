@@ -0,0 +1,81 @@
+import time
+
+import fakes
+
+from conductor_deadline import groups, pools
+
+GROUP = "conductorpool_abc"
+
+
+def add_pool_job(repository, job_id, group=GROUP, status="Active"):
+    return repository.add_job(fakes.FakeDeadlineJob(job_id, group=group, status=status))
+
+
+def test_available_workers_skip_unavailable_states(repository):
+
+    repository.add_worker("worker1", [GROUP], state="Idle")
+    repository.add_worker("worker2", [GROUP], state="Rendering")
+    repository.add_worker("worker3", [GROUP], state="Offline")
+    repository.add_worker("worker4", [GROUP], state="Stalled")
+    repository.add_worker("worker5", ["conductorpool_other"])
+
+    manager = pools.WorkerPoolManager(repository=repository)
+
+    assert sorted(manager.available_workers(GROUP)) == ["worker1", "worker2"]
+    assert repository.calls["GetSlaveInfo"] == 4
+
+
+def test_launches_are_seen_by_other_managers(repository):
+
+    add_pool_job(repository, "job1")
+    repository.add_worker("worker1", [GROUP])
+
+    first = pools.WorkerPoolManager(repository=repository)
+    assert first.instances_needed(GROUP, 4) == 3
+    first.record_launch(GROUP, 3, repository.GetJob("job1", True))
+
+    # Another submitter (ex: on another machine) doesn't launch them again
+    second = pools.WorkerPoolManager(repository=repository)
+    assert second.pool_size(GROUP) == 4
+    assert second.instances_needed(GROUP, 4) == 0
+    assert second.instances_needed(GROUP, 6) == 2
+
+    saved = repository.GetJob("job1", True)
+    assert saved.GetJobExtraInfoKeyValue(pools.POOL_SIZE_KEY) == "4"
+
+
+def test_launches_expire_after_the_launch_timeout(repository):
+
+    deadline_job = add_pool_job(repository, "job1")
+    deadline_job.SetJobExtraInfoKeyValue(pools.POOL_SIZE_KEY, "5")
+    deadline_job.SetJobExtraInfoKeyValue(pools.LAUNCHED_AT_KEY, str(time.time() - 3600))
+
+    manager = pools.WorkerPoolManager(repository=repository, launch_timeout=60)
+
+    assert manager.pool_size(GROUP) == 0
+
+
+def test_launches_of_finished_jobs_are_ignored(repository):
+
+    deadline_job = add_pool_job(repository, "job1", status="Completed")
+    deadline_job.SetJobExtraInfoKeyValue(pools.POOL_SIZE_KEY, "5")
+    deadline_job.SetJobExtraInfoKeyValue(pools.LAUNCHED_AT_KEY, str(time.time()))
+
+    assert pools.WorkerPoolManager(repository=repository).pool_size(GROUP) == 0
+
+
+def test_collector_deletes_idle_pool_groups(repository):
+
+    for group_name in ("conductorpool_live", "conductorpool_workers", "conductorpool_idle", "conductorautogroup_job9"):
+        repository.AddGroup(group_name)
+
+    add_pool_job(repository, "job1", group="conductorpool_live")
+    add_pool_job(repository, "job2", group="conductorpool_idle", status="Completed")
+    repository.add_worker("worker1", ["conductorpool_workers"])
+
+    collector = groups.AutogroupCollector(groups.GroupManager(repository=repository))
+    result = collector.collect()
+
+    assert result["deleted"] == ["conductorautogroup_job9", "conductorpool_idle"]
+    assert "conductorpool_live" in repository.GetGroupNames()
+    assert "conductorpool_workers" in repository.GetGroupNames()
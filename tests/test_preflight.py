@@ -0,0 +1,102 @@
+import time
+
+import pytest
+
+import fakes
+from conductor_job import catalog, job, preflight
+
+
+@pytest.fixture(autouse=True)
+def software_catalog(monkeypatch):
+
+    monkeypatch.setattr(catalog, "get_instance_types", lambda refresh=False: [{"name": "n1-standard-4"}])
+    yield fakes.install_catalog(fakes.make_catalog_packages(plugin_versions=2, extra_products=0))
+    catalog.set_catalog(None)
+
+
+def make_job(tmp_path, instance_type="n1-standard-4", package_ids=("maya-2024 SP1",)):
+
+    scene_path = tmp_path / "scene.ma"
+    scene_path.write_text("")
+
+    checked_job = job.Job()
+    checked_job.upload_paths = [str(scene_path)]
+    checked_job.instance_type = instance_type
+    checked_job.software_packages = [{"package_id": package_id} for package_id in package_ids]
+
+    return checked_job
+
+
+def test_valid_job(tmp_path):
+
+    report = preflight.PreflightRunner().run(make_job(tmp_path))
+
+    assert report.ok
+    assert report.issues == []
+    assert report.checks == ["upload_paths", "software_packages", "instance_type"]
+
+
+def test_missing_upload_paths(tmp_path):
+
+    checked_job = make_job(tmp_path)
+    checked_job.upload_paths += [str(tmp_path / "missing.exr"), str(tmp_path / "textures" / "*.tx")]
+
+    report = preflight.PreflightRunner().run(checked_job)
+
+    assert not report.ok
+    assert sorted([issue.subject for issue in report.errors]) == sorted(checked_job.upload_paths[1:])
+
+
+def test_missing_package(tmp_path):
+
+    report = preflight.PreflightRunner().run(make_job(tmp_path, package_ids=("maya-2024 SP1", "maya-2099")))
+
+    assert [(issue.check, issue.subject) for issue in report.errors] == [("software_packages", "maya-2099")]
+
+
+def test_unresolved_package(tmp_path):
+
+    checked_job = make_job(tmp_path)
+    checked_job.software_packages.append(None)
+
+    report = preflight.PreflightRunner().run(checked_job)
+
+    assert [issue.check for issue in report.errors] == ["software_packages"]
+    assert "None" in report.errors[0].message
+
+
+def test_missing_instance_type(tmp_path):
+
+    report = preflight.PreflightRunner().run(make_job(tmp_path, instance_type="n1-highmem-96"))
+
+    assert [(issue.check, issue.subject) for issue in report.errors] == [("instance_type", "n1-highmem-96")]
+
+
+def test_failed_check_is_an_error(tmp_path, monkeypatch):
+
+    def fail(refresh=False):
+        raise RuntimeError("Conductor is unreachable")
+
+    monkeypatch.setattr(catalog, "get_instance_types", fail)
+
+    report = preflight.PreflightRunner().run(make_job(tmp_path))
+
+    assert [issue.check for issue in report.errors] == ["instance_type"]
+    assert "Conductor is unreachable" in report.errors[0].message
+
+
+def test_checks_over_the_budget_are_warnings(tmp_path, monkeypatch):
+
+    def slow_instance_types(refresh=False):
+        time.sleep(0.5)
+        return []
+
+    monkeypatch.setattr(catalog, "get_instance_types", slow_instance_types)
+
+    report = preflight.PreflightRunner(time_budget=0.1).run(make_job(tmp_path))
+
+    assert report.ok
+    assert report.timed_out
+    assert report.duration < 0.5
+    assert [(issue.check, issue.severity) for issue in report.issues] == [("instance_type", preflight.WARNING)]
+    assert "0.1s time budget" in report.summary()
@@ -0,0 +1,66 @@
+import concurrent.futures
+
+from conductor_deadline import registration
+
+
+def register(repository, worker_name, job_id, task_id):
+
+    registrar = registration.WorkerRegistrar(repository)
+    return registrar.register(worker_name, job_id, environ={"CONDUCTOR_TASK_ID": str(task_id)})
+
+
+def add_workers(repository, job_count, worker_count):
+
+    workers = []
+
+    for job_number in range(job_count):
+        job_id = "job{:04d}".format(job_number)
+
+        # The job isn't in its group yet so the first worker has to move it
+        repository.add_job(job_id, "none")
+
+        for task_id in range(worker_count):
+            workers.append(("ip-10-0-{}-{}".format(job_number, task_id), job_id, task_id))
+
+    return workers
+
+
+def test_the_job_is_only_saved_once(repository):
+
+    workers = add_workers(repository, 3, 20)
+
+    for worker in workers:
+        register(repository, *worker)
+
+    assert set(repository.job_saves.values()) == {1}
+    assert repository.GetJob("job0000", True).JobGroup == "conductorautogroup_job0000"
+    assert repository.calls["SaveSlaveSettings"] == len(workers)
+
+
+def test_every_worker_gets_a_unique_name(repository):
+
+    workers = add_workers(repository, 3, 50)
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=16) as executor:
+        list(executor.map(lambda worker: register(repository, *worker), workers))
+
+    assert len(set(repository.worker_names)) == len(workers)
+
+    for worker_name in repository.worker_names:
+        assert repository.GetSlaveSettings(worker_name, True).SlaveGroups[0].startswith("conductorautogroup_job")
+
+
+def test_a_restarted_worker_writes_nothing(repository):
+
+    workers = add_workers(repository, 2, 10)
+
+    for worker in workers:
+        register(repository, *worker)
+
+    writes = repository.writes
+
+    for worker_name, job_id, task_id in workers:
+        assert register(repository, registration.get_worker_name(job_id, {"CONDUCTOR_TASK_ID": str(task_id)}),
+                        job_id, task_id) == 0
+
+    assert repository.writes == writes
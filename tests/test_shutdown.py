@@ -0,0 +1,204 @@
+import ctypes
+import threading
+import time
+
+import fakes
+
+from conductor_deadline import shutdown
+
+
+def make_active_job(repository, job_id, group, queued=0, pending=0):
+
+    deadline_job = repository.add_job(fakes.FakeDeadlineJob(job_id, group=group))
+    deadline_job.JobQueuedTasks = queued
+    deadline_job.JobPendingTasks = pending
+
+    return deadline_job
+
+
+def test_group_backlog_counts_queued_and_pending_tasks(repository):
+
+    make_active_job(repository, "job1", "conductorpool_a", queued=3, pending=2)
+    make_active_job(repository, "job2", "conductorpool_a", queued=1)
+    make_active_job(repository, "job3", "conductorpool_b", queued=7)
+
+    policy = shutdown.DrainPolicy(idle_window=0, repository=repository, max_age=0)
+
+    assert policy.group_backlog("conductorpool_a") == 6
+    assert policy.group_backlog("conductorpool_b") == 7
+    assert policy.group_backlog("conductorpool_c") == 0
+
+
+def test_group_backlog_is_shared_between_policies(repository):
+
+    for number in range(100):
+        make_active_job(repository, "job{}".format(number), "conductorpool_{}".format(number % 5), queued=1)
+
+    policies = [shutdown.DrainPolicy(idle_window=0, repository=repository, max_age=60) for _ in range(50)]
+
+    for policy in policies:
+        assert policy.group_backlog("conductorpool_0") == 20
+
+    assert repository.calls["GetJobsInState"] == 1
+
+
+def test_group_backlog_of_known_jobs_only_reads_them(repository):
+
+    make_active_job(repository, "job1", "conductorautogroup_job1", queued=4)
+    make_active_job(repository, "job2", "conductorpool_a", queued=1)
+
+    policy = shutdown.DrainPolicy(idle_window=0, repository=repository, job_ids=["job1"])
+
+    assert policy.group_backlog("conductorautogroup_job1") == 4
+    assert repository.calls["GetJobsInState"] == 0
+    assert repository.calls["GetJob"] == 1
+
+
+def test_monitor_shuts_down_once_drained():
+
+    class Policy(object):
+        idle_window = 10
+
+        def should_shutdown(self, group_name, idle_since, now):
+            return now - idle_since >= self.idle_window
+
+    calls = []
+    monitor = shutdown.DrainMonitor("group", Policy(), lambda: calls.append(True), poll_interval=1)
+    monitor.idle_since = 0
+
+    assert not monitor.check(now=5)
+    assert monitor.check(now=10)
+    assert calls == [True]
+
+
+def test_busy_worker_is_not_idle():
+
+    class Policy(object):
+        idle_window = 10
+
+        def should_shutdown(self, group_name, idle_since, now):
+            return now - idle_since >= self.idle_window
+
+    busy = [True]
+    monitor = shutdown.DrainMonitor("group", Policy(), lambda: None, poll_interval=1, is_busy=lambda: busy[0])
+    monitor.idle_since = 0
+
+    assert not monitor.check(now=20)
+    assert monitor.idle_since == 20
+
+    busy[0] = False
+    assert not monitor.check(now=25)
+    assert monitor.check(now=30)
+
+
+def test_monitor_can_be_restarted_after_being_cancelled():
+
+    class Policy(object):
+        idle_window = 0
+
+        def __init__(self):
+            self.checks = 0
+
+        def should_shutdown(self, group_name, idle_since, now):
+            self.checks += 1
+            return False
+
+    policy = Policy()
+    monitor = shutdown.DrainMonitor("group", policy, lambda: None, poll_interval=0.01)
+
+    # Idle, busy and idle again before the first thread has woken up
+    monitor.start()
+    first_thread = monitor._thread
+    monitor.cancel()
+    monitor.start()
+
+    assert monitor.running
+    assert monitor._thread is not first_thread
+
+    checks = policy.checks
+    time.sleep(0.1)
+    assert policy.checks > checks
+
+    monitor.cancel()
+    first_thread.join(1)
+    monitor._thread.join(1)
+    assert not monitor.running
+
+
+def test_watch_worker_stops_a_drained_worker(repository, monkeypatch):
+
+    make_active_job(repository, "job1", "conductorautogroup_job1")
+    repository.set_worker_state("Conductor_job1_001", "Idle")
+
+    stopped = []
+    monkeypatch.setattr(shutdown, "stop_worker", lambda worker_name, deadline_command: stopped.append(worker_name))
+
+    thread = threading.Thread(target=shutdown.watch_worker,
+                              args=("Conductor_job1_001", "conductorautogroup_job1", repository),
+                              kwargs={"idle_window": 0.05, "poll_interval": 0.01, "job_ids": ["job1"]})
+    thread.start()
+    thread.join(5)
+
+    assert not thread.is_alive()
+    assert stopped == ["Conductor_job1_001"]
+
+
+def test_watch_worker_returns_once_the_worker_is_offline(repository, monkeypatch):
+
+    make_active_job(repository, "job1", "conductorautogroup_job1", queued=10)
+    repository.set_worker_state("Conductor_job1_001", "Offline")
+
+    stopped = []
+    monkeypatch.setattr(shutdown, "stop_worker", lambda worker_name, deadline_command: stopped.append(worker_name))
+
+    thread = threading.Thread(target=shutdown.watch_worker,
+                              args=("Conductor_job1_001", "conductorautogroup_job1", repository),
+                              kwargs={"idle_window": 0.05, "poll_interval": 0.01, "job_ids": ["job1"]})
+    thread.start()
+    thread.join(5)
+
+    assert not thread.is_alive()
+    assert stopped == []
+
+
+class FakeKernel32(object):
+    '''
+    The Windows API calls used to check a process, for the given running
+    processes (pid: exit code) and processes of other users
+    '''
+
+    def __init__(self, exit_codes, denied=()):
+        self.exit_codes = exit_codes
+        self.denied = denied
+        self.closed = []
+        self.last_error = 0
+
+    def OpenProcess(self, access, inherit, pid):
+
+        if pid in self.exit_codes:
+            return pid
+
+        self.last_error = shutdown._ERROR_ACCESS_DENIED if pid in self.denied else 87
+        return 0
+
+    def GetExitCodeProcess(self, handle, exit_code):
+        exit_code._obj.value = self.exit_codes[handle]
+        return 1
+
+    def CloseHandle(self, handle):
+        self.closed.append(handle)
+
+
+def test_processes_are_checked_on_windows(monkeypatch):
+
+    kernel32 = FakeKernel32({100: shutdown._STILL_ACTIVE, 200: 0}, denied=(300,))
+
+    monkeypatch.setattr(shutdown.sys, "platform", "win32")
+    monkeypatch.setattr(ctypes, "WinDLL", lambda name, use_last_error=False: kernel32, raising=False)
+    monkeypatch.setattr(ctypes, "get_last_error", lambda: kernel32.last_error, raising=False)
+
+    assert shutdown._is_running(100)
+    assert not shutdown._is_running(200)
+    assert shutdown._is_running(300)
+    assert not shutdown._is_running(400)
+    assert kernel32.closed == [100, 200]
@@ -0,0 +1,67 @@
+import json
+
+import pytest
+
+from conductor_job import sidecar
+
+
+def write(tmp_path, data, name="scene.ma.cdepends"):
+
+    path = tmp_path / name
+    path.write_text(data if isinstance(data, str) else json.dumps(data))
+
+    return str(path)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 64])
+def test_values_split_across_chunks(tmp_path, chunk_size):
+
+    path = write(tmp_path, '{"version": 12345.5e2, "other": {"a": [1, "]"]}, '
+                           '"dependencies": [ "/show/a.exr" ,"/show/b \\"quoted\\".exr", 1234567 ], "after": null}')
+
+    reader = sidecar.SidecarReader(path, chunk_size=chunk_size)
+
+    assert list(reader.iter_entries()) == ["/show/a.exr", '/show/b "quoted".exr', 1234567]
+
+
+def test_duplicates_are_dropped(tmp_path):
+
+    path = write(tmp_path, {"dependencies": ["/show/a.exr", "\\show\\a.exr", "/show/./tex/../a.exr",
+                                             "C:/show/a.exr", "/show/b.exr", "", None]})
+
+    reader = sidecar.SidecarReader(path)
+
+    assert reader.read() == ["/show/a.exr", "/show/b.exr"]
+    assert reader.entry_count == 5
+    assert reader.duplicate_count == 3
+
+
+def test_entries_that_are_not_paths_are_skipped(tmp_path, caplog):
+
+    path = write(tmp_path, {"dependencies": ["/show/a.exr", 42, ["/show/b.exr"], "/show/c.exr"]})
+
+    assert sidecar.load_dependencies(path) == ["/show/a.exr", "/show/c.exr"]
+    assert "42" in caplog.text
+
+
+def test_crowded_directories_are_collapsed(tmp_path):
+
+    dependencies = ["/show/tex/{}.exr".format(index) for index in range(4)] + ["/show/a.exr", "/show/b.exr"]
+    path = write(tmp_path, {"dependencies": dependencies})
+
+    assert sorted(sidecar.load_dependencies(path, collapse_threshold=3)) == ["/show/a.exr", "/show/b.exr", "/show/tex"]
+    assert sorted(sidecar.load_dependencies(path, collapse_threshold=4)) == sorted(dependencies)
+
+
+@pytest.mark.parametrize("data", ["{}", '{"dependencies": null}', '{"dependencies": []}'])
+def test_no_dependencies(tmp_path, data):
+
+    assert sidecar.load_dependencies(write(tmp_path, data)) == []
+
+
+@pytest.mark.parametrize("data", ['{"dependencies": "/show/a.exr"}', '{"dependencies": ["/show/a.exr"',
+                                  '["/show/a.exr"]'])
+def test_invalid_sidecars(tmp_path, data):
+
+    with pytest.raises(sidecar.SidecarError):
+        sidecar.load_dependencies(write(tmp_path, data))
@@ -0,0 +1,35 @@
+import logging
+
+from conductor_job import sizing
+
+
+def test_budget_limits_the_instance_count():
+
+    plan = sizing.plan_fleet(100, task_duration=60, boot_overhead=240, budget=2)
+
+    assert plan.limited_by == "budget"
+    assert plan.instance_count == 5
+    assert plan.expected_instance_hours <= 2
+    assert plan.notes == []
+
+
+def test_budget_that_cannot_cover_the_job_is_reported(caplog):
+
+    with caplog.at_level(logging.WARNING, logger="conductor_job.sizing"):
+        plan = sizing.plan_fleet(100, task_duration=600, boot_overhead=240, budget=1)
+
+    assert plan.instance_count == 1
+    assert plan.limited_by == "budget"
+    assert len(plan.notes) == 1
+    assert "can't cover the job" in plan.notes[0]
+    assert plan.notes[0] in caplog.text
+    assert plan.as_dict()["notes"] == plan.notes
+    assert plan.notes[0] in plan.summary()
+
+
+def test_no_task_duration_launches_an_instance_per_task():
+
+    plan = sizing.plan_fleet(20, boot_overhead=240, max_instances=8)
+
+    assert plan.instance_count == 8
+    assert plan.limited_by == "cap"
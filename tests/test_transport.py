@@ -0,0 +1,99 @@
+import pytest
+
+from conductor_job import transport
+
+
+class FakeResponse(object):
+
+    def __init__(self, status_code, headers=None):
+
+        self.status_code = status_code
+        self.headers = dict(headers or {})
+
+    def raise_for_status(self):
+        pass
+
+
+class FakeSession(object):
+    '''
+    Answers with the given statuses, in order, then with 200
+    '''
+
+    def __init__(self, *responses):
+
+        self.responses = list(responses)
+        self.requests = []
+
+    def request(self, method, url, headers, params, data):
+
+        self.requests.append((method, url))
+
+        return self.responses.pop(0) if self.responses else FakeResponse(200)
+
+
+def make_client(session):
+
+    return transport.PooledApiClient(session=session,
+                                     rate_limiter=transport.RateLimiter(rate=0),
+                                     retry_policy=transport.RetryPolicy(attempts=5, backoff=0))
+
+
+@pytest.mark.parametrize("status", [500, 502, 504])
+def test_post_is_not_retried_on_server_errors(status):
+
+    session = FakeSession(FakeResponse(status))
+    response = make_client(session)._make_request("POST", "http://conductor/jobs/", {}, {}, "{}")
+
+    assert response.status_code == status
+    assert len(session.requests) == 1
+
+
+@pytest.mark.parametrize("status", [429, 503])
+def test_post_is_retried_when_it_was_not_carried_out(status):
+
+    session = FakeSession(FakeResponse(status), FakeResponse(status))
+    response = make_client(session)._make_request("POST", "http://conductor/jobs/", {}, {}, "{}")
+
+    assert response.status_code == 200
+    assert len(session.requests) == 3
+
+
+def test_post_is_retried_with_retry_after():
+
+    session = FakeSession(FakeResponse(502, {"Retry-After": "0"}))
+    response = make_client(session)._make_request("POST", "http://conductor/jobs/", {}, {}, "{}")
+
+    assert response.status_code == 200
+    assert len(session.requests) == 2
+
+
+@pytest.mark.parametrize("verb", ["GET", "PUT", "DELETE"])
+def test_idempotent_requests_are_retried_on_server_errors(verb):
+
+    session = FakeSession(FakeResponse(500), FakeResponse(502), FakeResponse(504))
+    response = make_client(session)._make_request(verb, "http://conductor/jobs/", {}, {}, None)
+
+    assert response.status_code == 200
+    assert len(session.requests) == 4
+
+
+def test_retries_stop_after_the_last_attempt():
+
+    session = FakeSession(*[FakeResponse(503) for _ in range(10)])
+    response = make_client(session)._make_request("POST", "http://conductor/jobs/", {}, {}, "{}")
+
+    assert response.status_code == 503
+    assert len(session.requests) == 5
+
+
+def test_pooled_client_submits_every_job_through_rate_limits():
+
+    # A local stand-in for the jobs endpoint that answers 429 or 503 to a
+    # share of the requests
+    import bench_submission
+
+    result = bench_submission.run("pooled", job_count=40, workers=4, latency=0, failure_rate=0.3, rate=0)
+
+    assert result["submitted"] == 40
+    assert result["requests"] > 40
+    assert result["connections"] <= 4
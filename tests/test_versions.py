@@ -0,0 +1,72 @@
+import pytest
+
+from conductor_job import versions
+
+
+def package(version):
+
+    parts = version.split(".") + [""] * 4
+    return dict(zip(("major_version", "minor_version", "release_version", "build_version"), parts))
+
+
+@pytest.mark.parametrize("older, newer", [
+    ("5.9", "5.10"),
+    ("2024.beta", "2024"),
+    ("2024", "2024.1"),
+    ("5.10.0.beta", "5.10.0.0"),
+    ("5.10.0.beta", "5.10"),
+    ("5.10.alpha", "5.10.beta"),
+    ("5.10.beta", "5.10.0.1"),
+    ("5.10", "5.10.0.1"),
+    ("1.0.beta.1", "1.0.beta.2"),
+    ("1.0.beta.2", "1.0"),
+])
+def test_pre_releases_sort_below_the_release(older, newer):
+    assert versions.version_key(older) < versions.version_key(newer)
+
+
+def test_trailing_zeros_are_ignored():
+    assert versions.version_key("5.3") == versions.version_key("5.3.0.0")
+
+
+def test_latest_is_the_release_rather_than_a_pre_release():
+
+    index = versions.VersionIndex([package("5.10.0.beta"), package("5.10.0.0"), package("5.9.1.0")])
+
+    assert index.versions == ["5.9.1.0", "5.10.0.beta", "5.10.0.0"]
+    assert versions.package_version(index.latest()) == "5.10.0.0"
+    assert versions.package_version(index.find("5.10")) == "5.10.0.0"
+    assert versions.package_version(index.find("<5.10")) == "5.10.0.beta"
+    assert versions.package_version(index.find("5.9.*")) == "5.9.1.0"
+
+
+def test_pinned_version_matches_only_that_version():
+
+    index = versions.VersionIndex([package("5.0.0.0"), package("5.3.2.0"), package("5.10.0.0")])
+
+    assert versions.package_version(index.find("5.0")) == "5.0.0.0"
+    assert versions.package_version(index.find("5")) == "5.0.0.0"
+    assert versions.package_version(index.find("5.10.0.0")) == "5.10.0.0"
+    assert versions.package_version(index.find("5.3.2.0")) == "5.3.2.0"
+    assert index.find("5.3.0.0") is None
+    assert index.find("5.1") is None
+
+
+def test_wildcard_matches_the_newest_version_with_those_parts():
+
+    index = versions.VersionIndex([package("5.0.0.0"), package("5.1.4.0"), package("5.3.2.0"),
+                                   package("5.10.0.0"), package("6.0.0.beta")])
+
+    assert versions.package_version(index.find("5.*")) == "5.10.0.0"
+    assert versions.package_version(index.find("5.0.*")) == "5.0.0.0"
+    assert versions.package_version(index.find("5.1.*")) == "5.1.4.0"
+    assert versions.package_version(index.find("5.3.*")) == "5.3.2.0"
+    assert versions.package_version(index.find("6.*")) == "6.0.0.beta"
+    assert index.find("5.2.*") is None
+    assert index.find("5.10.1.*") is None
+
+
+def test_invalid_versions():
+
+    with pytest.raises(versions.VersionError):
+        versions.VersionConstraint(">=5,=")